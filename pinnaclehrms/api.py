@@ -3,24 +3,38 @@ from pinnaclehrms.utility.salary_calculator import (
     createPaySlips,
     getEmpRecords,
     calculateMonthlySalary,
-    getEncashment,
+    loadOtherEarnings,
+    previewPaySlips as buildPaySlipPreview,
 )
-from collections import defaultdict
-from frappe.utils.xlsxutils import make_xlsx
+from pinnaclehrms.utility.attendance_record import packAttendanceRecords
+from pinnaclehrms.utility.payroll_changes import getChangedEmployees
+from pinnaclehrms.utility.pay_slip_writer import syncChildRows
+from pinnaclehrms.utility.pay_slip_print import enqueuePaySlipPrint
+from pinnaclehrms.utility.pay_slip_pdf import getPaySlipPdf
+from pinnaclehrms.utility.pay_slip_mailer import enqueuePaySlipMails
+from pinnaclehrms.utility.payroll_register import getRegisterRows
+from pinnaclehrms.utility.query_profiler import profileQueries
+from pinnaclehrms.utility.xlsx_export import (
+    AMOUNT,
+    TEXT,
+    iterQuery,
+    newWorkbook,
+    sendXlsx,
+    writeSheet,
+)
+from itertools import chain
+from openpyxl.utils import get_column_letter
 from frappe.desk.query_report import build_xlsx_data
-from frappe.utils import nowdate, flt
+from frappe.utils import nowdate, flt, cint
+from frappe.utils.response import json_handler
 from frappe import _
 from frappe.utils import format_datetime
-from frappe.utils.pdf import get_pdf
 import calendar
-from io import BytesIO
 from datetime import date
 import base64
 import calendar
 from datetime import date
 import frappe
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font
 
 
 # API to get pay slips in create pay slips
@@ -104,8 +118,10 @@ def get_pay_slip_list(parent_docname, month, year, company=None, employee=None):
 
 
 # API to e-mail pay slips
-@frappe.whitelist(allow_guest=True)
+@frappe.whitelist()
 def email_pay_slips(pay_slips=None, raw_data=None):
+    frappe.has_permission("Pay Slips", "email", throw=True)
+
     if pay_slips is None:
         pay_slips = []
 
@@ -119,51 +135,23 @@ def email_pay_slips(pay_slips=None, raw_data=None):
     else:
         raise ValueError("Either raw_data or pay_slips must be provided.")
 
-    for item in data:
-        record = frappe.db.get_value("Created Pay Slips", item, "pay_slip")
-        if record:
-            pay_slips.append(record)
-        if raw_data:
-            data = pay_slips
-
-    for pay_slip_name in data:
-        if pay_slip_name == "on":
-            continue
-        doc = frappe.get_doc("Pay Slips", pay_slip_name)
-
-        employee_name = doc.employee_name
-        month = doc.month
-        year = doc.year
-        doctype = doc.doctype
-        docname = doc.name
-        email = frappe.db.get_value("Employee", doc.employee, "company_email")
-
-        subject = f"Pay Slip for {employee_name} - {month} {year}"
-
-        # HTML email body with dynamic content
-        context = {"doc": doc}  # Pass data to the template
-        message = frappe.render_template(
-            "pinnaclehrms/public/templates/pay_slip.html", context
+    # raw_data lists Created Pay Slips rows, resolved in one query
+    if raw_data is not None:
+        data = frappe.get_all(
+            "Created Pay Slips",
+            filters={"name": ["in", data]},
+            pluck="pay_slip",
         )
 
-        # Attach the pay slip PDF
-        if email:
-            frappe.sendmail(
-                recipients=[email],
-                sender="hr@mygstcafe.in",
-                cc="records@mygstcafe.in",
-                subject=subject,
-                message=message,
-                # header=["Pay Slip Notification", "green"]
-            )
+    pay_slip_names = [name for name in data if name and name != "on"]
+    jobs = enqueuePaySlipMails(pay_slip_names)
 
-            return {"message": "success"}
-        else:
-            frappe.throw(f"No email address found for employee {employee_name}")
+    return {"message": "success", "queued": len(pay_slip_names), "jobs": jobs}
 
 
 # API to get pay slip report
 @frappe.whitelist(allow_guest=True)
+@profileQueries
 def get_pay_slip_report(year=None, month=None, curr_user=None, company=None):
     user_roles = frappe.get_roles(curr_user)
 
@@ -192,12 +180,18 @@ def get_pay_slip_report(year=None, month=None, curr_user=None, company=None):
             )
         if not employee:
             frappe.throw("No Employee Data found or you don't have access!")
-        filters["employee_id"] = employee[0].name
+        filters["employee"] = employee[0].name
 
-    # Step 2: Get pay slip names matching filters
-    pay_slip_names = frappe.get_all("Pay Slips", filters=filters, pluck="name")
+    # Step 2: Read the month's rows of the Payroll Register
+    pay_slips = getRegisterRows(
+        "Pay Slips",
+        year,
+        month,
+        company=filters.get("company"),
+        employee=filters.get("employee"),
+    )
 
-    if not pay_slip_names:
+    if not pay_slips:
         frappe.msgprint(
             "No records found for the specified year and month.", title="Warning!"
         )
@@ -205,35 +199,18 @@ def get_pay_slip_report(year=None, month=None, curr_user=None, company=None):
 
     pay_slips_data = []
 
-    # Step 3: Loop over each pay slip and fetch full document to get child tables
-    for name in pay_slip_names:
-        pay_slip = frappe.get_doc("Pay Slips", name)
-
-        # Collect salary_calculation data
-        salary_info = {
-            sal.particulars: {"day": sal.days, "amount": sal.amount}
-            for sal in pay_slip.salary_calculation
-        }
-
-        # Collect other_earnings data
-        other_earnings_info = {
-            earning.component: {"amount": earning.amount}
-            for earning in pay_slip.other_earnings
-        }
-
+    for pay_slip in pay_slips:
         # Prepare combined dict for this pay slip
         pay_slip_dict = {
-            "pay_slip_name": pay_slip.name,
+            "pay_slip_name": pay_slip.reference_name,
             "year": pay_slip.year,
-            "month": pay_slip.month_num,
+            "month": pay_slip.month,
             "employee": pay_slip.employee,
             "employee_name": pay_slip.employee_name,
             "company": pay_slip.company,
             "designation": pay_slip.designation,
             "department": pay_slip.department,
-            "email": frappe.db.get_value(
-                "Employee", pay_slip.employee, "company_email"
-            ),
+            "email": pay_slip.email,
             "standard_working_days": pay_slip.standard_working_days,
             "pan_number": pay_slip.pan_number,
             "date_of_joining": pay_slip.date_of_joining,
@@ -242,9 +219,15 @@ def get_pay_slip_report(year=None, month=None, curr_user=None, company=None):
             "actual_working_days": pay_slip.actual_working_days,
             "absent": pay_slip.absent,
             "total": pay_slip.total,
-            "net_payable_amount": pay_slip.net_payble_amount,
-            "salary_info": salary_info,
-            "other_earnings": other_earnings_info,
+            "net_payable_amount": pay_slip.net_payable_amount,
+            "salary_info": {
+                particulars: {"day": info.get("days"), "amount": info.get("amount")}
+                for particulars, info in pay_slip.salary_info.items()
+            },
+            "other_earnings": {
+                component: {"amount": amount}
+                for component, amount in pay_slip.other_earnings.items()
+            },
             "other_earnings_total": pay_slip.other_earnings_total,
         }
 
@@ -288,19 +271,13 @@ def print_pay_slip(pay_slips, year=None, month=None):
     with zipfile.ZipFile(
         zip_stream, mode="w", compression=zipfile.ZIP_DEFLATED
     ) as zipf:
+        generated_pay_slips = []
         for pay_slip in pay_slips:
             doc = frappe.get_doc("Pay Slips", pay_slip)
-            context = {"doc": doc}
 
-            # Render HTML from template
-            html = frappe.render_template(
-                "pinnaclehrms/public/templates/pay_slip.html", context
-            )
+            # Cached PDF of the pay slip template
+            pdf_bytes = getPaySlipPdf(doc)
 
-            # Generate PDF from HTML
-            pdf_bytes = get_pdf(html)
-
-            generated_pay_slips = []
             filename = f"{doc.employee_name}_{doc.month}_{doc.year}.pdf"
             if filename in generated_pay_slips:
                 filename = f"{doc.employee}_{doc.month}_{doc.year}.pdf"
@@ -317,6 +294,17 @@ def print_pay_slip(pay_slips, year=None, month=None):
     frappe.response.type = "binary"
 
 
+# API to print pay slips into a ZIP file in the background
+@frappe.whitelist()
+def enqueue_print_pay_slips(pay_slips, year=None, month=None):
+    frappe.has_permission("Pay Slips", "print", throw=True)
+
+    if not year or not month:
+        frappe.throw(_("Year and Month are required"))
+
+    return {"job_id": enqueuePaySlipPrint(json.loads(pay_slips), year, month)}
+
+
 # API get pay slip requests
 @frappe.whitelist(allow_guest=True)
 def getPaySlipRequests():
@@ -339,7 +327,7 @@ def approvePaySlipRequest(data):
     if frappe.db.exists(
         "Pay Slips",
         {
-            "employee_id": data["select_employee"],
+            "employee": data["select_employee"],
             "month_num": data["month"],
             "year": data["year"],
         },
@@ -348,7 +336,7 @@ def approvePaySlipRequest(data):
         paySlip = frappe.get_doc(
             "Pay Slips",
             {
-                "employee_id": data["select_employee"],
+                "employee": data["select_employee"],
                 "month_num": data["month"],
                 "year": data["year"],
             },
@@ -358,7 +346,7 @@ def approvePaySlipRequest(data):
         paySlip = frappe.get_doc(
             "Pay Slips",
             {
-                "employee_id": data["select_employee"],
+                "employee": data["select_employee"],
                 "month_num": data["month"],
                 "year": data["year"],
             },
@@ -367,8 +355,6 @@ def approvePaySlipRequest(data):
     employee_name = paySlip.employee_name
     month = paySlip.month
     year = paySlip.year
-    doctype = paySlip.doctype
-    docname = paySlip.name
     email = paySlip.email
     subject = f"Pay Slip for {employee_name} - {month} {year}"
     message = f"""
@@ -377,9 +363,7 @@ def approvePaySlipRequest(data):
     Best regards,
     Your Company
     """
-    pdf_attachment = frappe.attach_print(
-        doctype, docname, file_name=f"Pay Slip {docname}"
-    )
+    pdf_attachment = getPaySlipPdf(paySlip)
 
     if email:
         frappe.sendmail(
@@ -395,8 +379,37 @@ def approvePaySlipRequest(data):
         frappe.throw(f"No email address found for employee {employee_name}")
 
 
+# API to preview pay slips without creating them
+@frappe.whitelist()
+@profileQueries
+def previewPaySlips(data, start=0, page_length=100, output="json"):
+    frappe.has_permission("Pay Slips", "create", throw=True)
+
+    if isinstance(data, str):
+        data = json.loads(data)
+
+    preview = buildPaySlipPreview(
+        data, start=cint(start), pageLength=min(cint(page_length) or 100, 500)
+    )
+
+    if output != "ndjson":
+        return preview
+
+    # One JSON object per line: the page summary, then one line per pay slip
+    paySlips = preview.pop("pay_slips")
+    lines = [json.dumps(preview, default=json_handler)]
+    lines.extend(json.dumps(paySlip, default=json_handler) for paySlip in paySlips)
+
+    frappe.response.filename = (
+        f"pay_slip_preview_{data.get('year')}_{data.get('month')}_{preview['start']}.ndjson"
+    )
+    frappe.response.filecontent = "\n".join(lines) + "\n"
+    frappe.response.type = "binary"
+
+
 # API to regenerate pay slip
 @frappe.whitelist(allow_guest=True)
+@profileQueries
 def regeneratePaySlip(data, parent=None):
 
     data = json.loads(data)
@@ -404,12 +417,64 @@ def regeneratePaySlip(data, parent=None):
     year = int(data.get("year"))
     month = data.get("month")
 
+    generatedOn = frappe.utils.now_datetime()
     empRecords = getEmpRecords(data)
 
+    # Draft Pay Slips to update and their other earnings, for all employees at once
+    existingPaySlips = frappe.get_all(
+        "Pay Slips",
+        filters={
+            "employee": ["in", list(empRecords)],
+            "month_num": month,
+            "year": year,
+            "docstatus": 0,
+        },
+        fields=["name", "employee", "generated_on"],
+        order_by="modified asc",
+    )
+    paySlipByEmployee = {
+        paySlip.employee: paySlip.name for paySlip in existingPaySlips
+    }
+
+    # Incremental mode only recomputes employees whose inputs changed
+    if data.get("incremental"):
+        changedEmployees = getChangedEmployees(
+            empRecords,
+            year,
+            month,
+            {paySlip.employee: paySlip.generated_on for paySlip in existingPaySlips},
+        )
+        empRecords = {
+            emp_id: record
+            for emp_id, record in empRecords.items()
+            if emp_id in changedEmployees
+        }
+        if not empRecords:
+            return {"message": ("Success")}
+
     employeeData = calculateMonthlySalary(empRecords, year, month)
 
     # frappe.throw(str(employeeData))
 
+    otherEarningsByEmployee = loadOtherEarnings(
+        employeeData, year, month, paySlipByEmployee
+    )
+
+    # Created Pay Slips rows already listing these employees' slips
+    createdPaySlips = (
+        set(
+            frappe.db.sql(
+                """
+                    SELECT employee_id, pay_slip FROM `tabCreated Pay Slips`
+                    WHERE employee_id IN %s
+                """,
+                (tuple(employeeData),),
+            )
+        )
+        if employeeData
+        else set()
+    )
+
     for emp_id, data in employeeData.items():
         otherEarningsAmount = 0.0
         month_mapping = {
@@ -428,10 +493,7 @@ def regeneratePaySlip(data, parent=None):
         }
         month_name = month_mapping.get(month)
         salaryInfo = data.get("salary_information", {})
-        attendanceRecord = frappe.render_template(
-            "pinnaclehrms/public/templates/attendance_record.html",
-            {"attendance_record": data.get("attendance_records")},
-        )
+        attendanceData = packAttendanceRecords(data.get("attendance_records"))
 
         fullDayWorkingAmount = round(
             (salaryInfo.get("full_days", 0) * salaryInfo.get("per_day_salary", 0)),
@@ -475,24 +537,13 @@ def regeneratePaySlip(data, parent=None):
         othersDayAmount = salaryInfo.get("others_day_salary")
 
         # Check if a Pay Slip already exists for the employee
-        existing_doc = frappe.get_all(
-            "Pay Slips",
-            filters={
-                "employee": data.get("employee"),
-                "month_num": month,
-                "year": year,
-                "docstatus": 0,
-            },
-            fields=["name"],
-        )
-
-        if existing_doc:
+        if paySlipByEmployee.get(emp_id):
             # If a Pay Slip exists, update it
-            pay_slip = frappe.get_doc("Pay Slips", existing_doc[0]["name"])
+            pay_slip = frappe.get_doc("Pay Slips", paySlipByEmployee[emp_id])
         else:
             # If no Pay Slip exists, create a new one
             pay_slip = frappe.new_doc("Pay Slips")
-        otherEarnings = _getOtherEarnings(pay_slip.employee, year, month, pay_slip.name)
+        otherEarnings = otherEarningsByEmployee.get(emp_id)
         print(otherEarnings)
         if otherEarnings:
             for component, earning in otherEarnings.items():
@@ -557,16 +608,14 @@ def regeneratePaySlip(data, parent=None):
                 ),
             }
         )
-        pay_slip.attendance_record = attendanceRecord
-
-        sal_calculations = pay_slip.salary_calculation
-        pay_slip.salary_calculation = []
-        for sal_cal in sal_calculations:
+        pay_slip.attendance_data = attendanceData
+        pay_slip.attendance_record = None
+        pay_slip.generated_on = generatedOn
 
-            frappe.delete_doc("Salary Calculation", sal_cal.name)
+        # Rows are matched on particulars so unchanged rows keep their names
+        salaryCalculation = []
         if salaryInfo.get("full_days"):
-            pay_slip.append(
-                "salary_calculation",
+            salaryCalculation.append(
                 {
                     "particulars": "Full Day",
                     "days": salaryInfo.get("full_days"),
@@ -574,11 +623,10 @@ def regeneratePaySlip(data, parent=None):
                     "effective_percentage": "100",
                     "amount": fullDayWorkingAmount,
                     "parent": pay_slip.name,
-                },
+                }
             )
         if salaryInfo.get("lates"):
-            pay_slip.append(
-                "salary_calculation",
+            salaryCalculation.append(
                 {
                     "particulars": "Lates",
                     "days": salaryInfo.get("lates"),
@@ -586,11 +634,10 @@ def regeneratePaySlip(data, parent=None):
                     "effective_percentage": "10",
                     "amount": latesAmount,
                     "parent": pay_slip.name,
-                },
+                }
             )
         if salaryInfo.get("three_four_quarter_days"):
-            pay_slip.append(
-                "salary_calculation",
+            salaryCalculation.append(
                 {
                     "particulars": "3/4 Quarter Day",
                     "days": salaryInfo.get("three_four_quarter_days"),
@@ -598,11 +645,10 @@ def regeneratePaySlip(data, parent=None):
                     "effective_percentage": "75",
                     "amount": threeFourQuarterDaysWorkingAmount,
                     "parent": pay_slip.name,
-                },
+                }
             )
         if salaryInfo.get("half_days"):
-            pay_slip.append(
-                "salary_calculation",
+            salaryCalculation.append(
                 {
                     "particulars": "Half Day",
                     "days": salaryInfo.get("half_days"),
@@ -610,11 +656,10 @@ def regeneratePaySlip(data, parent=None):
                     "effective_percentage": "50",
                     "amount": halfDayWorkingAmount,
                     "parent": pay_slip.name,
-                },
+                }
             )
         if salaryInfo.get("quarter_days"):
-            pay_slip.append(
-                "salary_calculation",
+            salaryCalculation.append(
                 {
                     "particulars": "Quarter Day",
                     "days": salaryInfo.get("quarter_days"),
@@ -622,11 +667,10 @@ def regeneratePaySlip(data, parent=None):
                     "effective_percentage": "25",
                     "amount": quarterDayWorkingAmount,
                     "parent": pay_slip.name,
-                },
+                }
             )
         if salaryInfo.get("others_day"):
-            pay_slip.append(
-                "salary_calculation",
+            salaryCalculation.append(
                 {
                     "particulars": "Others Day",
                     "days": salaryInfo.get("others"),
@@ -634,51 +678,49 @@ def regeneratePaySlip(data, parent=None):
                     "amount": othersDayAmount,
                     "effective_percentage": "-",
                     "parent": pay_slip.name,
-                },
+                }
             )
         if salaryInfo.get("sundays_working_days"):
-            pay_slip.append(
-                "salary_calculation",
+            salaryCalculation.append(
                 {
                     "particulars": "Sunday Workings",
                     "days": salaryInfo.get("sundays_working_days"),
                     "rate": salaryInfo.get("per_day_salary"),
                     "amount": salaryInfo.get("sundays_salary"),
                     "parent": pay_slip.name,
-                },
+                }
             )
+        syncChildRows(pay_slip, "salary_calculation", salaryCalculation, "particulars")
 
         # Update child table for "other_earnings"
-        pay_slip.other_earnings = []
+        otherEarningRows = []
         print(otherEarnings)
         if otherEarnings:
             for component, earning in otherEarnings.items():
                 if component != "Leave Encashment":
-                    pay_slip.append(
-                        "other_earnings",
+                    otherEarningRows.append(
                         {
                             "component": component,
                             "type": earning.get("type"),
                             "amount": earning.get("amount"),
                             "component_reference": "Recurring Salary Component",
                             "reference_name": earning.get("doc_no"),
-                        },
+                        }
                     )
                 else:
-                    pay_slip.append(
-                        "other_earnings",
+                    otherEarningRows.append(
                         {
                             "component": component,
                             "type": earning.get("type"),
                             "amount": earning.get("amount"),
                             "component_reference": "Pinnacle Leave Encashment",
                             "reference_name": earning.get("doc_no"),
-                        },
+                        }
                     )
+        syncChildRows(pay_slip, "other_earnings", otherEarningRows, "component")
 
         # Save or submit the document
         pay_slip.save()
-        encashment = getEncashment(emp_id, year, month)
 
         if salaryInfo.get("other_earnings"):
             for component, earning in salaryInfo.get("other_earnings").items():
@@ -687,24 +729,18 @@ def regeneratePaySlip(data, parent=None):
                         "Recurring Salary Component",
                         earning.get("doc_no"),
                         {"status": "Cleared", "pay_slip": pay_slip.name},
+                        # keep the change watermark of incremental runs
+                        update_modified=False,
                     )
                 else:
                     frappe.db.set_value(
                         "Pinnacle Leave Encashment",
                         earning.get("doc_no"),
                         {"status": "Paid", "pay_slip": pay_slip.name},
+                        update_modified=False,
                     )
 
-        createdPaySlip = frappe.db.sql(
-            """
-                                       select name from `tabCreated Pay Slips`
-                                       where employee_id = %s and pay_slip = %s
-                                       """,
-            (data.get("employee"), pay_slip.name),
-            as_dict=True,
-        )
-
-        if createdPaySlip:
+        if (data.get("employee"), pay_slip.name) in createdPaySlips:
             frappe.db.sql(
                 """UPDATE `tabCreated Pay Slips` 
                 SET salary = %s, parent = %s 
@@ -773,8 +809,11 @@ def download_bank_upld_bulk_report(year=None, month=None, encodedCompany=None):
     try:
         m = int(month)
         if 1 <= m <= 12:
-            conditions.append("tps.month_num = %(month)s AND tps.year = %(year)s")
-            params.update({"month": m, "year": int(year)})
+            conditions.append(
+                "tpr.reference_doctype = 'Pay Slips'"
+                " AND tpr.start_date = %(start_date)s"
+            )
+            params["start_date"] = date(int(year), m, 1)
             report_name = (
                 f"{company.replace(' ', '_')}_ICICI_SFTP_{calendar.month_name[m]}{year}"
             )
@@ -784,7 +823,7 @@ def download_bank_upld_bulk_report(year=None, month=None, encodedCompany=None):
         frappe.throw("Invalid month format")
 
     if company:
-        conditions.append("tps.company = %(company)s")
+        conditions.append("tpr.company = %(company)s")
         params["company"] = company
 
     where_sql = " AND ".join(conditions) or "1=1"
@@ -794,15 +833,13 @@ def download_bank_upld_bulk_report(year=None, month=None, encodedCompany=None):
             te.ifsc_code AS IFSC,
             te.bank_ac_no AS `Beneficiary Account No`,
             te.employee_name AS `Beneficiary Name`,
-            tps.net_payble_amount AS `Amount (₹)`
+            tpr.net_payable_amount AS `Amount (₹)`
         FROM `tabEmployee` AS te
-        JOIN `tabPay Slips` AS tps ON tps.employee = te.name
+        JOIN `tabPayroll Register` AS tpr ON tpr.employee = te.name
         WHERE {where_sql}
     """
 
-    data = frappe.db.sql(query, params, as_dict=True)
-
-    # Define columns and rows for export
+    # Define columns and stream rows for export
     columns = [
         {"header": "IFSC", "key": "IFSC", "width": 20},
         {
@@ -813,18 +850,13 @@ def download_bank_upld_bulk_report(year=None, month=None, encodedCompany=None):
         {"header": "Beneficiary Name", "key": "Beneficiary Name", "width": 30},
         {"header": "Amount (₹)", "key": "Amount (₹)", "width": 15},
     ]
-    rows = [[r[col["key"]] for col in columns] for r in data]
+    rows = ([r[col["key"]] for col in columns] for r in iterQuery(query, params))
 
-    xlsx_file = make_xlsx(
-        [[col["header"] for col in columns]] + rows,
-        report_name,
-        column_widths=[col["width"] for col in columns],
-    )
+    workbook = newWorkbook()
+    writeSheet(workbook, report_name, columns, rows)
 
     # Return file as response
-    frappe.response.filename = f"{report_name}.xlsx"
-    frappe.response.filecontent = xlsx_file.getvalue()
-    frappe.response.type = "binary"
+    sendXlsx(workbook, f"{report_name}.xlsx")
 
 
 # API to download sft upload report
@@ -856,14 +888,17 @@ def download_sft_report(year=None, month=None, encodedCompany=None):
         frappe.throw("Invalid month format")
 
     # Prepare parameters
-    params = {"month": m, "year": int(year)}
+    params = {"start_date": date(int(year), m, 1)}
     report_name = (
         f"{company.replace(' ', '_')}_ICICI_BulkPayment_{calendar.month_name[m]}_{year}"
     )
-    conditions = ["tps.month_num = %(month)s", "tps.year = %(year)s"]
+    conditions = [
+        "tpr.reference_doctype = 'Pay Slips'",
+        "tpr.start_date = %(start_date)s",
+    ]
 
     if company:
-        conditions.append("tps.company = %(company)s")
+        conditions.append("tpr.company = %(company)s")
         params["company"] = company
 
     where_sql = " AND ".join(conditions)
@@ -875,7 +910,7 @@ def download_sft_report(year=None, month=None, encodedCompany=None):
             te.employee_name AS `Beneficiary Name`,
             te.bank_ac_no AS `Beneficiary Account No`,
             te.ifsc_code AS `IFSC`,
-            tps.net_payble_amount AS `Amount (₹)`,
+            tpr.net_payable_amount AS `Amount (₹)`,
             'N' AS `Pay Mode`,
             CONCAT(
                 DATE_FORMAT(CURDATE(), '%%d-'),
@@ -883,13 +918,14 @@ def download_sft_report(year=None, month=None, encodedCompany=None):
                 DATE_FORMAT(CURDATE(), '-%%Y')
             ) AS `Date`
         FROM `tabEmployee` AS te
-        JOIN `tabPay Slips` AS tps ON tps.employee = te.name
+        JOIN `tabPayroll Register` AS tpr ON tpr.employee = te.name
         WHERE {where_conditions}
     """.format(where_conditions=where_sql)
 
-    data = frappe.db.sql(query, params, as_dict=True)
+    data = iterQuery(query, params)
+    first = next(data, None)
 
-    if not data:
+    if first is None:
         frappe.msgprint(
             _("No data found to update"), title=_("Notification"), indicator="green"
         )
@@ -909,17 +945,11 @@ def download_sft_report(year=None, month=None, encodedCompany=None):
         {"header": "Date", "key": "Date", "width": 15},
     ]
 
-    rows = [[row[col["key"]] for col in columns] for row in data]
+    rows = ([row[col["key"]] for col in columns] for row in chain([first], data))
 
-    xlsx_file = make_xlsx(
-        [[col["header"] for col in columns]] + rows,
-        report_name,
-        column_widths=[col["width"] for col in columns],
-    )
-
-    frappe.response.filename = f"{report_name}.xlsx"
-    frappe.response.filecontent = xlsx_file.getvalue()
-    frappe.response.type = "binary"
+    workbook = newWorkbook()
+    writeSheet(workbook, report_name, columns, rows)
+    sendXlsx(workbook, f"{report_name}.xlsx")
 
 
 # API to download to pay slip records.
@@ -1054,6 +1084,7 @@ def download_sft_report(year=None, month=None, encodedCompany=None):
 
 
 @frappe.whitelist()
+@profileQueries
 def download_pay_slip_report(year=None, month=None, encodedCompany=None):
     company = base64.b64decode(encodedCompany).decode("utf-8")
     curr_user = frappe.session.user
@@ -1135,14 +1166,12 @@ def download_pay_slip_report(year=None, month=None, encodedCompany=None):
         header_row_2.append(f"{key} - Amount")
 
     # Prepare data rows
-    data_rows = []
-
-    for r in records:
+    def build_row(r):
         row = [
             r.get("pay_slip_name"),
             r.get("year"),
             r.get("month"),
-            r.get("employee_id"),
+            r.get("employee"),
             r.get("employee_name"),
             r.get("company"),
             r.get("designation"),
@@ -1172,17 +1201,20 @@ def download_pay_slip_report(year=None, month=None, encodedCompany=None):
             earning = other_earnings.get(key, {})
             row.append(earning.get("amount", 0))
 
-        data_rows.append(row)
+        return row
 
     # Generate Excel
-    xlsx_data = make_xlsx(
-        data=[header_row_1, header_row_2] + data_rows, sheet_name="Pay Slip Report"
+    workbook = newWorkbook()
+    writeSheet(
+        workbook,
+        "Pay Slip Report",
+        [{"header": header} for header in header_row_1],
+        (build_row(r) for r in records),
+        headerRows=[header_row_1, header_row_2],
     )
 
     filename = f"{company.replace(' ', '_')}_Pay_Slip_Report_{calendar.month_name[int(month)]}_{year}.xlsx"
-    frappe.response.filename = filename
-    frappe.response.filecontent = xlsx_data.getvalue()
-    frappe.response.type = "binary"
+    sendXlsx(workbook, filename)
 
 
 # API to send attendance notification
@@ -1262,10 +1294,13 @@ def download_idfc_blkpay(year=None, month=None, encodedCompany=None):
     formatted_date_for_filename = last_date.strftime("%d%m%Y")
 
     # --- Build query ---
-    conditions = ["tps.month_num = %(month)s", "tps.year = %(year)s"]
-    params = {"month": m, "year": year}
+    conditions = [
+        "tpr.reference_doctype = 'Pay Slips'",
+        "tpr.start_date = %(start_date)s",
+    ]
+    params = {"start_date": date(year, m, 1)}
     if company:
-        conditions.append("tps.company = %(company)s")
+        conditions.append("tpr.company = %(company)s")
         params["company"] = company
     where_sql = " AND ".join(conditions) or "1=1"
 
@@ -1275,12 +1310,11 @@ def download_idfc_blkpay(year=None, month=None, encodedCompany=None):
             te.bank_ac_no AS `Beneficiary Account No`,
             te.employee_name AS `Beneficiary Name`,
             te.company,
-            tps.net_payble_amount AS `Amount (₹)`
+            tpr.net_payable_amount AS `Amount (₹)`
         FROM `tabEmployee` AS te
-        JOIN `tabPay Slips` AS tps ON tps.employee = te.name
+        JOIN `tabPayroll Register` AS tpr ON tpr.employee = te.name
         WHERE {where_sql}
     """
-    data = frappe.db.sql(query, params, as_dict=True)
 
     # --- Debit account map ---
     company_debit_map = {
@@ -1288,111 +1322,48 @@ def download_idfc_blkpay(year=None, month=None, encodedCompany=None):
         "Pinnacle Finserv Advisors Pvt. Ltd.": "10237782223",
     }
 
-    today = date.today()
+    today = date.today().strftime("%d/%m/%Y")
 
     # --- Column configuration ---
     columns = [
-        {"header": "Beneficiary Name", "key": "Beneficiary Name", "width": 30},
-        {
-            "header": "Beneficiary Account No",
-            "key": "Beneficiary Account No",
-            "width": 25,
-        },
-        {"header": "IFSC", "key": "IFSC", "width": 20},
-        {"header": "Transaction Type", "key": "Transaction Type", "width": 20},
-        {"header": "Debit Account Number", "key": "Debit Account Number", "width": 30},
-        {"header": "Transaction Date", "key": "Transaction Date", "width": 20},
-        {"header": "Amount (₹)", "key": "Amount (₹)", "width": 15},
-        {"header": "Currency", "key": "Currency", "width": 10},
+        {"header": "Beneficiary Name", "width": 30, "style": TEXT},
+        {"header": "Beneficiary Account No", "width": 25, "style": TEXT},
+        {"header": "IFSC", "width": 20, "style": TEXT},
+        {"header": "Transaction Type", "width": 20, "style": TEXT},
+        {"header": "Debit Account Number", "width": 30, "style": TEXT},
+        {"header": "Transaction Date", "width": 20, "style": TEXT},
+        {"header": "Amount (₹)", "width": 15, "style": AMOUNT},
+        {"header": "Currency", "width": 10, "style": TEXT},
     ]
 
-    # --- Prepare row data ---
-    rows = []
-    for r in data:
-        debit_account = company_debit_map.get(r["company"], "N/A")
-        amount_value = r["Amount (₹)"]
-        rows.append(
-            [
-                r["Beneficiary Name"],
-                r["Beneficiary Account No"],
-                r["IFSC"],
-                "NEFT",
-                debit_account,
-                today.strftime("%d/%m/%Y"),
-                amount_value,
-                "INR",
-            ]
-        )
-
-    # --- Build Excel file ---
-    wb = Workbook()
-    ws = wb.active
-
-    # --- Write header row (Merged cells A1:A2, B1:B2, etc.) ---
-    for col_num, col in enumerate(columns, 1):
-        col_letter = ws.cell(row=1, column=col_num).column_letter
-        ws.merge_cells(f"{col_letter}1:{col_letter}2")
-        cell = ws.cell(row=1, column=col_num, value=col["header"])
-        ws.column_dimensions[col_letter].width = col["width"]
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.font = Font(bold=True)
-
-    # --- Write data rows starting from row 3 ---
-    start_row = 3
-    for row_idx, row_data in enumerate(rows, start_row):
-        for col_idx, value in enumerate(row_data, 1):
-            header = columns[col_idx - 1]["header"]
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-
-            if header == "Amount (₹)":
-                cell.number_format = "General"
-                cell.alignment = Alignment(horizontal="right")
-            else:
-                cell.number_format = "@"
-                cell.alignment = Alignment(horizontal="left")
-
-    # --- Save workbook to memory ---
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-
-    # --- Set filename & response ---
-    frappe.response.filename = f"{company_abbr}{formatted_date_for_filename}.xlsx"
-    frappe.response.filecontent = output.getvalue()
-    frappe.response.type = "binary"
-
-
-def _getOtherEarnings(empID, year, month, pay_slip):
-    otherEarnings = {}
-    # get last day of the month
-    last_day = calendar.monthrange(year, month)[1]
-    due_date = f"{year}-{month:02d}-{last_day:02d}"
+    # --- Stream row data ---
+    rows = (
+        [
+            r["Beneficiary Name"],
+            r["Beneficiary Account No"],
+            r["IFSC"],
+            "NEFT",
+            company_debit_map.get(r["company"], "N/A"),
+            today,
+            r["Amount (₹)"],
+            "INR",
+        ]
+        for r in iterQuery(query, params)
+    )
 
-    # fetch recurring salary components
-    rsc_list = frappe.get_list(
-        "Recurring Salary Component",
-        filters={
-            "employee": empID,
-            "docstatus": 1,
-        },
-        or_filters=[
-            {"pay_slip": pay_slip},
-            {"due_date": due_date, "pay_slip": ["in", ["", None]]},
+    # --- Build Excel file, header cells merged over two rows (A1:A2, B1:B2, ...) ---
+    workbook = newWorkbook()
+    writeSheet(
+        workbook,
+        "Sheet",
+        columns,
+        rows,
+        headerRows=[[col["header"] for col in columns], [None] * len(columns)],
+        merges=[
+            f"{get_column_letter(index)}1:{get_column_letter(index)}2"
+            for index in range(1, len(columns) + 1)
         ],
-        fields=["name"],
     )
-    for rsc in rsc_list:
-        doc = frappe.get_doc("Recurring Salary Component", rsc.name)
-        otherEarnings[doc.component] = {
-            "type": doc.type,
-            "amount": float(doc.amount) if doc.amount else 0.0,
-            "doc_no": doc.name,
-        }
-    leaveEncashmentData = getEncashment(empID, year, month)
-    if len(leaveEncashmentData) > 0:
-        otherEarnings["Leave Encashment"] = {
-            "type": "Earning",
-            "amount": float(leaveEncashmentData[0].get("amount", 0)),
-            "doc_no": leaveEncashmentData[0].get("name"),
-        }
-    return otherEarnings
+
+    # --- Set filename & response ---
+    sendXlsx(workbook, f"{company_abbr}{formatted_date_for_filename}.xlsx")
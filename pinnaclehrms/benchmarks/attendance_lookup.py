@@ -0,0 +1,114 @@
+"""
+Micro-benchmark for the per-day attendance and holiday lookups done by
+`calculateMonthlySalary`.
+
+It compares the old pattern (scan every attendance record and holiday for
+each calendar day) with the date-indexed lookups, on a synthetic month.
+It does not need a site:
+
+    python -m pinnaclehrms.benchmarks.attendance_lookup
+    bench --site <site> execute pinnaclehrms.benchmarks.attendance_lookup.run
+"""
+
+import calendar
+import random
+import time
+from datetime import date, datetime
+
+
+def makeSyntheticMonth(employees=5000, year=2025, month=1, seed=42):
+    """Return {employee: {"attendance_records": [...], "holidays": [...]}}."""
+    rng = random.Random(seed)
+    totalDays = calendar.monthrange(year, month)[1]
+    sundays = [
+        date(year, month, day)
+        for day in range(1, totalDays + 1)
+        if date(year, month, day).weekday() == 6
+    ]
+
+    employeeData = {}
+    for index in range(employees):
+        attendanceRecords = []
+        for day in range(1, totalDays + 1):
+            today = date(year, month, day)
+            if today in sundays or rng.random() < 0.08:
+                continue
+            attendanceRecords.append(
+                {
+                    "attendance_date": today,
+                    "in_time": datetime(year, month, day, 9, rng.randint(0, 40)),
+                    "out_time": datetime(year, month, day, 18, rng.randint(0, 40)),
+                }
+            )
+        rng.shuffle(attendanceRecords)
+        employeeData[f"EMP-{index:05d}"] = {
+            "attendance_records": attendanceRecords,
+            "holidays": [{"holiday_date": sunday} for sunday in sundays],
+        }
+    return employeeData
+
+
+def scanLookup(employeeData, year, month):
+    totalDays = calendar.monthrange(year, month)[1]
+    found = 0
+    for data in employeeData.values():
+        attendanceRecords = data["attendance_records"]
+        holidays = data["holidays"]
+        for day in range(1, totalDays + 1):
+            today = datetime(year, month, day).date()
+            attendanceRecord = next(
+                (
+                    record
+                    for record in attendanceRecords
+                    if record["attendance_date"] == today
+                ),
+                None,
+            )
+            if attendanceRecord or any(
+                holiday["holiday_date"] == today for holiday in holidays
+            ):
+                found += 1
+    return found
+
+
+def indexedLookup(employeeData, year, month):
+    totalDays = calendar.monthrange(year, month)[1]
+    found = 0
+    for data in employeeData.values():
+        holidayDates = {holiday.get("holiday_date") for holiday in data["holidays"]}
+        attendanceByDate = {}
+        for record in data["attendance_records"]:
+            attendanceByDate.setdefault(record["attendance_date"], record)
+        for day in range(1, totalDays + 1):
+            today = datetime(year, month, day).date()
+            if attendanceByDate.get(today) or today in holidayDates:
+                found += 1
+    return found
+
+
+def run(employees=5000, year=2025, month=1):
+    employees, year, month = int(employees), int(year), int(month)
+    employeeData = makeSyntheticMonth(employees, year, month)
+
+    results = {}
+    for label, lookup in (("scan", scanLookup), ("indexed", indexedLookup)):
+        start = time.perf_counter()
+        found = lookup(employeeData, year, month)
+        results[label] = {"seconds": time.perf_counter() - start, "found": found}
+
+    if results["scan"]["found"] != results["indexed"]["found"]:
+        raise AssertionError("Indexed lookup does not match the scan")
+
+    results["speedup"] = results["scan"]["seconds"] / results["indexed"]["seconds"]
+
+    print(
+        f"{employees} employees x {calendar.monthrange(year, month)[1]} days: "
+        f"scan {results['scan']['seconds']:.3f}s, "
+        f"indexed {results['indexed']['seconds']:.3f}s, "
+        f"{results['speedup']:.1f}x faster"
+    )
+    return results
+
+
+if __name__ == "__main__":
+    run()
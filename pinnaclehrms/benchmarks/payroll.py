@@ -0,0 +1,382 @@
+"""
+End-to-end payroll benchmark on a synthetic month.
+
+Inserts a deterministic synthetic payroll month into the site, then times
+`getEmpRecords`, `calculateMonthlySalary`, `createPaySlips` and
+`regeneratePaySlip` at each size. For every stage it reports wall time, the
+number of queries and the peak Python memory traced by tracemalloc. The
+synthetic month includes shifts, holiday lists, Salary History with
+mid-month increments, Shift Variations, Recurring Salary Components, Leave
+Encashments and full-month attendance. Nothing is committed: every size is
+rolled back once measured.
+
+Run it against a local test site only:
+
+    bench --site test_site execute pinnaclehrms.benchmarks.payroll.run
+    bench --site test_site execute pinnaclehrms.benchmarks.payroll.run --kwargs "{'sizes': '100,1000'}"
+"""
+
+import calendar
+import copy
+import json
+import random
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+import frappe
+
+from pinnaclehrms.utility.query_profiler import QueryProfiler
+
+COMPANY = "_Bench Company"
+PREFIX = "_BENCH"
+
+SHIFTS = {
+    f"{PREFIX} General": (timedelta(hours=9), timedelta(hours=18)),
+    f"{PREFIX} Morning": (timedelta(hours=7, minutes=30), timedelta(hours=16)),
+}
+HOLIDAY_LISTS = (f"{PREFIX} Holidays A", f"{PREFIX} Holidays B")
+
+
+def makeSyntheticPayroll(employees=100, year=2025, month=1, seed=42):
+    """
+    Return the rows of a synthetic payroll month as {doctype: [row, ...]}.
+
+    The same arguments always produce the same rows.
+    """
+    rng = random.Random(seed)
+    totalDays = calendar.monthrange(year, month)[1]
+    monthStart = date(year, month, 1)
+    monthEnd = date(year, month, totalDays)
+    days = [monthStart + timedelta(days=offset) for offset in range(totalDays)]
+    sundays = [day for day in days if day.weekday() == 6]
+
+    rows = {
+        "Shift Type": [
+            {"name": name, "start_time": start, "end_time": end}
+            for name, (start, end) in SHIFTS.items()
+        ],
+        "Holiday List": [
+            {
+                "name": name,
+                "holiday_list_name": name,
+                "from_date": date(year, 1, 1),
+                "to_date": date(year, 12, 31),
+            }
+            for name in HOLIDAY_LISTS
+        ],
+        "Holiday": [],
+        "Employee": [],
+        "Attendance": [],
+        "Assign Salary": [],
+        "Salary History": [],
+        "Shift Variation": [],
+        "Shift for employee": [],
+        "Recurring Salary Component": [],
+        "Pinnacle Leave Encashment": [],
+    }
+
+    for listIndex, holidayList in enumerate(HOLIDAY_LISTS):
+        holidays = sundays + ([days[14]] if listIndex else [])
+        for index, holiday in enumerate(holidays, start=1):
+            rows["Holiday"].append(
+                _child(
+                    f"{holidayList}-{index}", holidayList, "Holiday List", "holidays"
+                )
+                | {"holiday_date": holiday, "description": "Holiday"}
+            )
+
+    shiftVariations = rows["Shift Variation"]
+    shiftVariations.append(
+        {
+            "name": f"{PREFIX} Company Variation",
+            "shift_name": f"{PREFIX} Company Variation",
+            "company": COMPANY,
+            "shift_date": days[9],
+            "shift_start": datetime.combine(days[9], datetime.min.time())
+            + timedelta(hours=8),
+            "shift_end": datetime.combine(days[9], datetime.min.time())
+            + timedelta(hours=17),
+        }
+    )
+    employeeVariation = f"{PREFIX} Employee Variation"
+    shiftVariations.append(
+        {
+            "name": employeeVariation,
+            "shift_name": employeeVariation,
+            "company": COMPANY,
+            "shift_date": days[19],
+            "shift_start": datetime.combine(days[19], datetime.min.time())
+            + timedelta(hours=9, minutes=30),
+            "shift_end": datetime.combine(days[19], datetime.min.time())
+            + timedelta(hours=17),
+        }
+    )
+
+    for index in range(employees):
+        employee = f"{PREFIX}-EMP-{index:05d}"
+        employeeName = f"Bench Employee {index}"
+        shift = rng.choice(list(SHIFTS))
+        shiftStart, shiftEnd = SHIFTS[shift]
+        holidayList = HOLIDAY_LISTS[index % len(HOLIDAY_LISTS)]
+        holidayDates = set(sundays) | ({days[14]} if index % 2 else set())
+
+        rows["Employee"].append(
+            {
+                "name": employee,
+                "employee": employee,
+                "first_name": employeeName,
+                "employee_name": employeeName,
+                "company": COMPANY,
+                "status": "Active",
+                "company_email": f"bench.{index}@example.com",
+                "date_of_joining": date(year - 1, 1, 1),
+                "attendance_device_id": str(index),
+                "default_shift": shift,
+                "holiday_list": holidayList,
+            }
+        )
+
+        for day in days:
+            if day in holidayDates or rng.random() < 0.05:
+                continue
+            start = datetime.combine(day, datetime.min.time()) + shiftStart
+            inTime = start + timedelta(seconds=rng.randint(-900, 5400))
+            outTime = datetime.combine(day, datetime.min.time()) + shiftEnd
+            outTime += timedelta(seconds=rng.randint(-7200, 3600))
+            rows["Attendance"].append(
+                {
+                    "name": f"{employee}-{day.isoformat()}",
+                    "employee": employee,
+                    "employee_name": employeeName,
+                    "company": COMPANY,
+                    "attendance_date": day,
+                    "status": "Present",
+                    "shift": shift,
+                    "in_time": inTime,
+                    "out_time": outTime,
+                    "docstatus": 1,
+                }
+            )
+
+        assignSalary = f"ASS-SAL-{employee}"
+        salary = rng.randrange(12000, 90000, 500)
+        rows["Assign Salary"].append(
+            {
+                "name": assignSalary,
+                "employee_id": employee,
+                "employee_name": employeeName,
+                "eligible_for_overtime_salary": rng.choice([0, 1]),
+                "current_salary": salary,
+            }
+        )
+        history = [(date(year - 1, 1, 1), salary)]
+        if rng.random() < 0.1:
+            # Increment in the middle of the benchmarked month
+            history.append((days[14], salary + 5000))
+        for historyIndex, (fromDate, amount) in enumerate(history, start=1):
+            rows["Salary History"].append(
+                _child(
+                    f"{assignSalary}-{historyIndex}",
+                    assignSalary,
+                    "Assign Salary",
+                    "salary_history",
+                )
+                | {"from_date": fromDate, "salary": amount}
+            )
+
+        if rng.random() < 0.05:
+            rows["Shift for employee"].append(
+                _child(
+                    f"{employeeVariation}-{index}",
+                    employeeVariation,
+                    "Shift Variation",
+                    "shift_applied_to_employee",
+                )
+                | {"employee": employee, "employee_name": employeeName}
+            )
+
+        if rng.random() < 0.2:
+            rows["Recurring Salary Component"].append(
+                {
+                    "name": f"{PREFIX}-RSC-{index:05d}",
+                    "employee": employee,
+                    "employee_name": employeeName,
+                    "component": rng.choice(["Bonus", "Advance"]),
+                    "type": rng.choice(["Earning", "Deduction"]),
+                    "amount": rng.randrange(500, 5000, 100),
+                    "month": calendar.month_name[month],
+                    "year": year,
+                    "due_date": monthEnd,
+                    "status": "Due",
+                    "docstatus": 1,
+                }
+            )
+
+        if rng.random() < 0.05:
+            rows["Pinnacle Leave Encashment"].append(
+                {
+                    "name": f"{PREFIX}-LEV-{index:05d}",
+                    "employee": employee,
+                    "employee_name": employeeName,
+                    "from_date": date(year - 1, month, 1),
+                    "to_date": monthEnd,
+                    "amount": rng.randrange(1000, 20000, 100),
+                    "docstatus": 1,
+                }
+            )
+
+    return rows
+
+
+def insertSyntheticPayroll(rows):
+    """Bulk insert the rows of `makeSyntheticPayroll` without committing."""
+    timestamp = frappe.utils.now()
+    for doctype, docs in rows.items():
+        if not docs:
+            continue
+        fields = sorted({field for doc in docs for field in doc})
+        fields += ["owner", "modified_by", "creation", "modified"]
+        values = [
+            tuple(doc.get(field) for field in fields[:-4])
+            + ("Administrator", "Administrator", timestamp, timestamp)
+            for doc in docs
+        ]
+        frappe.db.bulk_insert(doctype, fields, values, chunk_size=5000)
+
+
+def measure(stage, employees, function, *args, traceMemory=True):
+    """Run `function(*args)` and return its result and a result row."""
+    # Each stage starts as a fresh request would
+    _clearCaches()
+
+    if traceMemory:
+        tracemalloc.start()
+    with QueryProfiler() as profiler:
+        start = time.perf_counter()
+        result = function(*args)
+        seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if traceMemory else 0
+    if traceMemory:
+        tracemalloc.stop()
+
+    return result, {
+        "employees": employees,
+        "stage": stage,
+        "seconds": round(seconds, 3),
+        "queries": len(profiler.queries),
+        "peak_mb": round(peak / 1024 / 1024, 1),
+    }
+
+
+def benchmarkSize(employees, year, month, traceMemory=True):
+    """Insert a synthetic month of `employees`, measure every stage, roll back."""
+    from pinnaclehrms.api import regeneratePaySlip
+    from pinnaclehrms.utility.salary_calculator import (
+        calculateMonthlySalary,
+        createPaySlips,
+        getEmpRecords,
+    )
+
+    data = {
+        "year": year,
+        "month": month,
+        "select_company": COMPANY,
+        "allowed_lates": 3,
+    }
+    results = []
+
+    try:
+        insertSyntheticPayroll(makeSyntheticPayroll(employees, year, month))
+
+        empRecords, result = measure(
+            "getEmpRecords", employees, getEmpRecords, data, traceMemory=traceMemory
+        )
+        results.append(result)
+        results.append(
+            measure(
+                "calculateMonthlySalary",
+                employees,
+                calculateMonthlySalary,
+                copy.deepcopy(empRecords),
+                year,
+                month,
+                traceMemory=traceMemory,
+            )[1]
+        )
+        results.append(
+            measure(
+                "createPaySlips",
+                employees,
+                createPaySlips,
+                dict(data),
+                traceMemory=traceMemory,
+            )[1]
+        )
+        results.append(
+            measure(
+                "regeneratePaySlip",
+                employees,
+                regeneratePaySlip,
+                json.dumps(data),
+                traceMemory=traceMemory,
+            )[1]
+        )
+        results.append(
+            measure(
+                "regeneratePaySlip incremental",
+                employees,
+                regeneratePaySlip,
+                json.dumps(dict(data, incremental=1)),
+                traceMemory=traceMemory,
+            )[1]
+        )
+    finally:
+        frappe.db.rollback()
+        _clearCaches()
+
+    return results
+
+
+def run(sizes="100,1000,10000", year=2025, month=1, trace_memory=1):
+    if not (frappe.conf.get("allow_tests") or frappe.conf.get("developer_mode")):
+        frappe.throw("The payroll benchmark only runs on test or developer sites")
+
+    if isinstance(sizes, str):
+        sizes = sizes.split(",")
+    year, month = int(year), int(month)
+
+    results = []
+    for employees in sizes:
+        results.extend(
+            benchmarkSize(int(employees), year, month, bool(int(trace_memory)))
+        )
+
+    print(
+        f"{'employees':>9}  {'stage':<30} {'seconds':>9} {'queries':>8} {'peak MB':>8}"
+    )
+    for result in results:
+        print(
+            f"{result['employees']:>9}  {result['stage']:<30} "
+            f"{result['seconds']:>9.3f} {result['queries']:>8} {result['peak_mb']:>8.1f}"
+        )
+    return results
+
+
+def _child(name, parent, parenttype, parentfield):
+    return {
+        "name": name,
+        "parent": parent,
+        "parenttype": parenttype,
+        "parentfield": parentfield,
+    }
+
+
+def _clearCaches():
+    from pinnaclehrms.pinnacle_hr.helpers.shift_type_cache import (
+        clear_shift_type_cache,
+    )
+
+    clear_shift_type_cache()
+    if getattr(frappe.local, "request_cache", None) is not None:
+        frappe.local.request_cache.clear()
@@ -154,8 +154,20 @@ doc_events = {
         "before_submit": "pinnaclehrms.pinnacle_hr.helpers.set_particulars.before_save_set_particulars"
     },
     "Employee Checkin": {"after_insert": "pinnaclehrms.api.attendance_notification"},
+    "Shift Type": {
+        "on_update": "pinnaclehrms.pinnacle_hr.helpers.shift_type_cache.clear_shift_type_cache",
+        "on_trash": "pinnaclehrms.pinnacle_hr.helpers.shift_type_cache.clear_shift_type_cache",
+    },
     "Salary Slip":{
-        "on_submit": "pinnaclehrms.pinnacle_payroll.doctype.salary_slip.salary_slip.update_leave_encashment_status"
+        "on_update": "pinnaclehrms.utility.payroll_register.syncPayrollRegister",
+        "on_submit": [
+            "pinnaclehrms.pinnacle_payroll.doctype.salary_slip.salary_slip.update_leave_encashment_status",
+            "pinnaclehrms.utility.payroll_register.syncPayrollRegister",
+        ],
+        "on_cancel": "pinnaclehrms.utility.payroll_register.syncPayrollRegister",
+        "on_update_after_submit": "pinnaclehrms.utility.payroll_register.syncPayrollRegister",
+        "on_trash": "pinnaclehrms.utility.payroll_register.removeFromPayrollRegister",
+        "after_rename": "pinnaclehrms.utility.payroll_register.renameInPayrollRegister",
     }
 }
 
@@ -180,6 +192,13 @@ doc_events = {
 # 	],
 # }
 
+scheduler_events = {
+    "hourly": [
+        "pinnaclehrms.utility.pay_slip_pdf.evictPdfCache",
+        "pinnaclehrms.utility.pay_slip_mailer.refreshEmailStatus",
+    ],
+}
+
 # Testing
 # -------
 
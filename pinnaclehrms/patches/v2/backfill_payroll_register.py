@@ -0,0 +1,19 @@
+import frappe
+
+from pinnaclehrms.utility.payroll_register import (
+    PAY_SLIPS,
+    SALARY_SLIP,
+    rebuildPayrollRegister,
+)
+
+
+def execute():
+    """
+    Fill the Payroll Register from the existing Pay Slips and Salary Slips.
+    """
+
+    frappe.reload_doc("pinnacle_payroll", "doctype", "payroll_register")
+
+    for doctype in (PAY_SLIPS, SALARY_SLIP):
+        written = rebuildPayrollRegister(doctype)
+        print(f"Wrote {written} Payroll Register rows for {doctype}")
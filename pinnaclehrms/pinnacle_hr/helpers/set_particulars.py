@@ -1,6 +1,8 @@
 import frappe
 from datetime import timedelta
 from frappe.utils import get_datetime
+from pinnaclehrms.pinnacle_hr.helpers.shift_type_cache import get_shift_type
+from pinnaclehrms.utility.deduction_slabs import getSlabTable
 
 
 def before_save_set_particulars(doc, method=None):
@@ -25,11 +27,11 @@ def before_save_set_particulars(doc, method=None):
 
         return
 
-    shift_doc = frappe.get_doc("Shift Type", doc.shift)
+    shift_type = get_shift_type(doc.shift) or {}
 
     # These are the correct fields used by ERPNext shift type
-    shift_start = shift_doc.start_time
-    shift_end = shift_doc.end_time
+    shift_start = shift_type.get("start_time")
+    shift_end = shift_type.get("end_time")
 
     if not shift_start or not shift_end:
         doc.particulars = "Full Day"
@@ -47,71 +49,18 @@ def before_save_set_particulars(doc, method=None):
     ideal_working_time = shift_end - shift_start
     total_minutes = ideal_working_time.total_seconds() / 60 or 1
 
-    # ----- Step 4: Slab definitions -----
-    slabs = {
-        "check_in": [
-            (
-                shift_start,
-                shift_start + timedelta(minutes=round(total_minutes * 0.112)),
-                0.10,
-            ),
-            (
-                shift_start + timedelta(minutes=round(total_minutes * 0.112)),
-                shift_start + timedelta(minutes=round(total_minutes * 0.334)),
-                0.25,
-            ),
-            (
-                shift_start + timedelta(minutes=round(total_minutes * 0.334)),
-                shift_start + timedelta(minutes=round(total_minutes * 0.667)),
-                0.50,
-            ),
-            (
-                shift_start + timedelta(minutes=round(total_minutes * 0.667)),
-                shift_start + timedelta(minutes=round(total_minutes)),
-                0.75,
-            ),
-        ],
-        "check_out": [
-            (
-                shift_end - timedelta(minutes=round(total_minutes)),
-                shift_end - timedelta(minutes=round(total_minutes * 0.664)),
-                0.75,
-            ),
-            (
-                shift_end - timedelta(minutes=round(total_minutes * 0.664)),
-                shift_end - timedelta(minutes=round(total_minutes * 0.331)),
-                0.50,
-            ),
-            (
-                shift_end - timedelta(minutes=round(total_minutes * 0.331)),
-                shift_end - timedelta(minutes=round(total_minutes * 0.109)),
-                0.25,
-            ),
-            (
-                shift_end - timedelta(minutes=round(total_minutes * 0.109)),
-                shift_end,
-                0.10,
-            ),
-        ],
-    }
-
-    deduction = 0.0
-
-    # ----- Step 5: Check-In Slab -----
-    for start, end, rate in slabs["check_in"]:
-        if start < get_datetime(doc.in_time) <= end:
-            deduction += rate
-            break
-
-    # ----- Step 6: Check-Out Slab -----
-    for start, end, rate in slabs["check_out"]:
-        if start <= get_datetime(doc.out_time) < end:
-            deduction += rate
-            break
+    # ----- Step 4: Look up the shift's slabs -----
+    slab_table = getSlabTable(total_minutes)
+
+    # ----- Step 5: Check-In / Check-Out slabs -----
+    deduction = slab_table.deduction(
+        get_datetime(doc.in_time) - shift_start,
+        shift_end - get_datetime(doc.out_time),
+    )
 
     deduction = min(deduction, 1.0)
 
-    # ----- Step 7: Set particulars -----
+    # ----- Step 6: Set particulars -----
     doc.particulars = map_deduction_to_status(deduction)
 
 
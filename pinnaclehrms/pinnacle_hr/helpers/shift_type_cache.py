@@ -0,0 +1,65 @@
+import frappe
+from datetime import timedelta
+from frappe.utils import to_timedelta
+
+
+SHIFT_TYPE_CACHE_KEY = "pinnaclehrms:shift_type_timings"
+
+
+def get_shift_types():
+    """
+    Return {shift type: timings} for every Shift Type.
+
+    The map is kept in the site cache, so every worker shares it, and it is
+    memoised for the rest of the request after the first read. It is cleared
+    by the Shift Type `on_update` / `on_trash` hooks.
+    """
+    return frappe.cache().get_value(SHIFT_TYPE_CACHE_KEY, generator=_load_shift_types)
+
+
+def get_shift_type(shift):
+    """Return the cached timings of a Shift Type, or None if it does not exist."""
+    if not shift:
+        return None
+    return get_shift_types().get(shift)
+
+
+def clear_shift_type_cache(doc=None, method=None):
+    frappe.cache().delete_value(SHIFT_TYPE_CACHE_KEY)
+
+
+def _load_shift_types():
+    shift_types = {}
+
+    for shift in frappe.get_all(
+        "Shift Type", fields=["name", "start_time", "end_time"]
+    ):
+        start_time = _to_timedelta(shift.start_time)
+        end_time = _to_timedelta(shift.end_time)
+
+        is_night_shift = bool(
+            start_time is not None and end_time is not None and end_time < start_time
+        )
+
+        ideal_minutes = None
+        if start_time is not None and end_time is not None:
+            ideal_working_time = end_time - start_time
+            if is_night_shift:
+                ideal_working_time += timedelta(days=1)
+            ideal_minutes = ideal_working_time.total_seconds() / 60
+
+        shift_types[shift.name] = {
+            "start_time": start_time,
+            "end_time": end_time,
+            "is_night_shift": is_night_shift,
+            "ideal_minutes": ideal_minutes,
+            "ideal_hours": ideal_minutes / 60 if ideal_minutes is not None else None,
+        }
+
+    return shift_types
+
+
+def _to_timedelta(value):
+    if value is None or isinstance(value, timedelta):
+        return value
+    return to_timedelta(value)
@@ -19,6 +19,8 @@ from hrms.hr.doctype.shift_assignment.shift_assignment import (
 )
 from hrms.hr.doctype.attendance.attendance import Attendance
 
+from pinnaclehrms.utility.deduction_slabs import getSlabTable
+
 
 EMPLOYEE_CHUNK_SIZE = 50
 
@@ -27,45 +29,10 @@ EMPLOYEE_CHUNK_SIZE = 50
 # Time Slab Helpers
 # --------------------------------------------------
 
-def create_time_slabs(shift_start, shift_end):
-    ideal_working_time = shift_end - shift_start
-    total_minutes = ideal_working_time.total_seconds() / 60 or 1
-
-    return {
-        "check_in": [
-            (shift_start, shift_start + timedelta(minutes=round(total_minutes * 0.112)), 0.10),
-            (shift_start + timedelta(minutes=round(total_minutes * 0.112)),
-             shift_start + timedelta(minutes=round(total_minutes * 0.334)), 0.25),
-            (shift_start + timedelta(minutes=round(total_minutes * 0.334)),
-             shift_start + timedelta(minutes=round(total_minutes * 0.667)), 0.50),
-            (shift_start + timedelta(minutes=round(total_minutes * 0.667)),
-             shift_start + timedelta(minutes=round(total_minutes)), 0.75),
-        ],
-        "check_out": [
-            (shift_end - timedelta(minutes=round(total_minutes)),
-             shift_end - timedelta(minutes=round(total_minutes * 0.664)), 0.75),
-            (shift_end - timedelta(minutes=round(total_minutes * 0.664)),
-             shift_end - timedelta(minutes=round(total_minutes * 0.331)), 0.50),
-            (shift_end - timedelta(minutes=round(total_minutes * 0.331)),
-             shift_end - timedelta(minutes=round(total_minutes * 0.109)), 0.25),
-            (shift_end - timedelta(minutes=round(total_minutes * 0.109)),
-             shift_end, 0.10),
-        ],
-    }
-
-
-def calculate_deduction(check_in, check_out, slabs):
-    deduction = 0.0
-
-    for start, end, rate in slabs["check_in"]:
-        if start < check_in <= end:
-            deduction += rate
-            break
-
-    for start, end, rate in slabs["check_out"]:
-        if start <= check_out < end:
-            deduction += rate
-            break
+def calculate_deduction(check_in, check_out, shift_start, shift_end):
+    total_minutes = (shift_end - shift_start).total_seconds() / 60 or 1
+    slab_table = getSlabTable(total_minutes)
+    deduction = slab_table.deduction(check_in - shift_start, shift_end - check_out)
 
     return min(deduction, 1.0)
 
@@ -132,8 +99,7 @@ def custom_get_attendance(self, logs):
     if in_time and out_time:
         shift_start = logs[0].shift_start
         shift_end = logs[0].shift_end
-        slabs = create_time_slabs(shift_start, shift_end)
-        deduction = calculate_deduction(in_time, out_time, slabs)
+        deduction = calculate_deduction(in_time, out_time, shift_start, shift_end)
         particulars = map_deduction_to_status(deduction)
     else:
         particulars = "Absent"
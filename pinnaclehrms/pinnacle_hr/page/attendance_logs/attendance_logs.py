@@ -5,20 +5,9 @@ from datetime import timedelta
 from openpyxl import Workbook
 from frappe.utils.file_manager import save_file
 from io import BytesIO
+from pinnaclehrms.pinnacle_hr.helpers.shift_type_cache import get_shift_type
 
 
-def load_shifts():
-    global shifts
-
-    shift_docs = frappe.get_all("Shift Type", fields=["name", "start_time", "end_time"])
-    shifts = {}
-
-    for s in shift_docs:
-        shifts[s.name] = {"start_time": s.start_time, "end_time": s.end_time}
-    return shifts
-
-load_shifts()
-
 @frappe.whitelist()
 def get_data(company=None, employee=None, from_date=None, to_date=None):
 
@@ -123,7 +112,7 @@ def calculate_particulars(att):
     if not att.get("shift"):
         return "Full Day"
 
-    shift_doc = shifts.get(att.shift)
+    shift_doc = get_shift_type(att.shift)
 
     shift_start = shift_doc.get("start_time")
     shift_end = shift_doc.get("end_time")
@@ -136,8 +125,7 @@ def calculate_particulars(att):
     if shift_end < shift_start:
         shift_end += timedelta(days=1)
 
-    ideal_working_time = shift_end - shift_start
-    total_minutes = ideal_working_time.total_seconds() / 60 or 1
+    total_minutes = shift_doc.get("ideal_minutes") or 1
 
     in_time = get_datetime(att.in_time)
     out_time = get_datetime(att.out_time)
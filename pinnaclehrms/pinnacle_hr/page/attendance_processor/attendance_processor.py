@@ -231,7 +231,7 @@ def get_app_attendance(employee_list, payrollFrom, payrollTo):
             `tabEmployee Checkin`
         WHERE
             employee IN %(employee_list)s
-            AND DATE(`time`) BETWEEN %(from_date)s AND %(to_date)s
+            AND `time` >= %(from_date)s AND `time` < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
             AND skip_auto_attendance = 0
         ORDER BY
             employee, `time`
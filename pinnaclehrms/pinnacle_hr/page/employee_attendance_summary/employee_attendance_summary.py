@@ -5,25 +5,7 @@ from datetime import timedelta
 from openpyxl import Workbook
 from frappe.utils.file_manager import save_file
 from io import BytesIO
-
-
-def load_shifts():
-    global shifts
-
-    shift_docs = frappe.get_all("Shift Type", fields=["name", "start_time", "end_time"])
-
-    shifts = {}
-
-    for s in shift_docs:
-        shifts[s.name] = {
-            "start_time": s.start_time,
-            "end_time": s.end_time,
-        }
-
-    return shifts
-
-
-load_shifts()
+from pinnaclehrms.pinnacle_hr.helpers.shift_type_cache import get_shift_type
 
 
 @frappe.whitelist()
@@ -151,7 +133,7 @@ def calculate_particulars(att):
     if not att.get("shift"):
         return "Full Day"
 
-    shift_doc = shifts.get(att.shift)
+    shift_doc = get_shift_type(att.shift)
 
     if not shift_doc:
         return "Full Day"
@@ -169,9 +151,7 @@ def calculate_particulars(att):
     if shift_end < shift_start:
         shift_end += timedelta(days=1)
 
-    ideal_working_time = shift_end - shift_start
-
-    total_minutes = (ideal_working_time.total_seconds() / 60) or 1
+    total_minutes = shift_doc.get("ideal_minutes") or 1
 
     in_time = get_datetime(att.in_time)
     out_time = get_datetime(att.out_time)
@@ -293,7 +293,111 @@ def add_paid_leaves_field():
 
     frappe.clear_cache()
 # ---------------------------------------------------------
-# PART 4: RUN PATCHES
+# PART 4: INDEXES FOR PAYROLL AND REPORT QUERIES
+# ---------------------------------------------------------
+QUERY_INDEXES = (
+    ("Attendance", ("employee", "attendance_date", "docstatus")),
+    ("Holiday", ("parent", "holiday_date")),
+    ("Salary History", ("parent", "from_date")),
+    ("Employee Checkin", ("employee", "time")),
+    ("Pinnacle Leave Encashment", ("employee", "to_date")),
+    ("Payroll Register", ("reference_doctype", "company", "start_date")),
+)
+
+
+def add_query_indexes():
+    """
+    Create the composite indexes behind the month range queries.
+
+    An index already starting with the same columns is reused. Returns and
+    prints, for each index, whether it was created or already existed.
+    """
+    report = []
+
+    for doctype, columns in QUERY_INDEXES:
+        if not frappe.db.table_exists(doctype):
+            status = "skipped, no table"
+        else:
+            existing = find_index(doctype, columns)
+            if existing:
+                status = f"exists as {existing}"
+            else:
+                frappe.db.add_index(doctype, list(columns))
+                status = "created"
+
+        report.append({"doctype": doctype, "columns": columns, "status": status})
+        print(f"Index on {doctype}({', '.join(columns)}): {status}")
+
+    return report
+
+
+def find_index(doctype, columns, unique=False):
+    """Return the name of an index of `doctype` starting with `columns`."""
+    indexed = {}
+    for row in frappe.db.sql(f"SHOW INDEX FROM `tab{doctype}`", as_dict=True):
+        if unique and row.Non_unique:
+            continue
+        indexed.setdefault(row.Key_name, {})[row.Seq_in_index] = row.Column_name
+
+    for name, sequence in indexed.items():
+        index_columns = tuple(sequence[position] for position in sorted(sequence))
+        if index_columns[: len(columns)] == tuple(columns):
+            return name
+
+
+# ---------------------------------------------------------
+# PART 5: ONE PAY SLIP PER EMPLOYEE AND MONTH
+# ---------------------------------------------------------
+PAY_SLIP_UNIQUE_COLUMNS = ("employee", "month_num", "year")
+
+
+def add_pay_slip_unique_constraint():
+    """
+    Add a unique constraint on Pay Slips (employee, month_num, year).
+
+    Pay slip runs check existing slips from a map loaded once per run; the
+    constraint keeps concurrent runs from inserting a second slip for the
+    same month. Existing duplicates are printed and the constraint is left
+    out until they are resolved.
+    """
+    if not frappe.db.table_exists("Pay Slips"):
+        return "skipped, no table"
+
+    existing = find_index("Pay Slips", PAY_SLIP_UNIQUE_COLUMNS, unique=True)
+    if existing:
+        status = f"exists as {existing}"
+    else:
+        duplicates = frappe.db.sql(
+            """
+                SELECT employee, month_num, year, COUNT(*) AS count
+                FROM `tabPay Slips`
+                GROUP BY employee, month_num, year
+                HAVING COUNT(*) > 1
+            """,
+            as_dict=True,
+        )
+        if duplicates:
+            status = f"skipped, {len(duplicates)} duplicated employee months"
+            for row in duplicates:
+                print(
+                    f"Duplicate Pay Slips: {row.employee} {row.month_num}/{row.year} "
+                    f"({row.count})"
+                )
+        else:
+            frappe.db.add_unique(
+                "Pay Slips",
+                list(PAY_SLIP_UNIQUE_COLUMNS),
+                constraint_name="unique_employee_month_year",
+            )
+            status = "created"
+
+    columns = ", ".join(PAY_SLIP_UNIQUE_COLUMNS)
+    print(f"Unique constraint on Pay Slips({columns}): {status}")
+    return status
+
+
+# ---------------------------------------------------------
+# PART 6: RUN PATCHES
 # ---------------------------------------------------------
 def setup_salary_breakup_feature():
     """
@@ -303,5 +407,7 @@ def setup_salary_breakup_feature():
     add_salary_breakup_field_to_salary_slip()
     add_hr_settings_fields()
     add_paid_leaves_field()
+    add_query_indexes()
+    add_pay_slip_unique_constraint()
 
     frappe.logger().info("✅ Salary Breakup + HR Settings fields added successfully.")
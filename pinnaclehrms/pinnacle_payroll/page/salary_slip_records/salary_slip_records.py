@@ -4,14 +4,24 @@ import base64
 import json
 
 from datetime import date, timedelta
-from io import BytesIO
+from itertools import chain
 
 from frappe import _
 from frappe.utils import get_datetime
-from frappe.utils.xlsxutils import make_xlsx
 
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font
+from pinnaclehrms.utility.payroll_register import getRegisterRows
+from pinnaclehrms.utility.query_profiler import profileQueries
+from pinnaclehrms.utility.xlsx_export import (
+    AMOUNT_2DP,
+    LEFT,
+    TEXT,
+    iterQuery,
+    newWorkbook,
+    sendXlsx,
+    writeSheet,
+)
+
+from openpyxl.utils import get_column_letter
 from frappe.utils import flt
 
 
@@ -20,95 +30,49 @@ def getSalarySlipRecords(company, year, month, employee=None):
     year = int(year)
     month = int(month)
 
-    start_date = date(year, month, 1)
-    last_day = calendar.monthrange(year, month)[1]
-    end_date = date(year, month, last_day)
-
-    filters = {
-        "company": company,
-        "start_date": [">=", start_date],
-        "end_date": ["<=", end_date],
-    }
-
-    if employee:
-        filters["employee"] = employee
-
-    salary_slips = frappe.get_all("Salary Slip", filters=filters, pluck="name")
+    # One range scan on the Payroll Register instead of a document per slip
+    rows = getRegisterRows(
+        "Salary Slip", year, month, company=company, employee=employee
+    )
 
     result = []
 
-    for slip_name in salary_slips:
-        pay_slip = frappe.get_doc("Salary Slip", slip_name)
-
-        # Salary Breakup
-        salary_info = {}
-        for sal in pay_slip.salary_breakup:
-            salary_info[sal.particulars] = {
-                "days": sal.days,
-                "amount": sal.amount,
-            }
-
-        # Earnings
-        basic_salary = 0
-        other_earnings_total = 0
-        other_earnings_info = []
-
-        for e in pay_slip.earnings:
-            if e.salary_component == "Basic":
-                basic_salary += e.amount
-            else:
-                other_earnings_total += e.amount
-                other_earnings_info.append(
-                    {"component": e.salary_component, "amount": e.amount}
-                )
-
-        # Employee info
-        emp = (
-            frappe.db.get_value(
-                "Employee",
-                pay_slip.employee,
-                ["company_email", "pan_number", "date_of_joining"],
-                as_dict=True,
-            )
-            or {}
-        )
-
+    for row in rows:
         pay_slip_dict = {
-            "pay_slip_name": pay_slip.name,
-            "status": pay_slip.status,
+            "pay_slip_name": row.reference_name,
+            "status": row.status,
             "year": year,
             "month": month,
-            "employee": pay_slip.employee,
-            "employee_name": pay_slip.employee_name,
-            "company": pay_slip.company,
-            "designation": pay_slip.designation,
-            "department": pay_slip.department,
-            "email": emp.get("company_email"),
-            "standard_working_days": pay_slip.total_working_days,
-            "pan_number": emp.get("pan_number"),
-            "date_of_joining": emp.get("date_of_joining"),
-            "basic_salary": basic_salary,
-            "per_day_salary": (
-                basic_salary / pay_slip.total_working_days
-                if pay_slip.total_working_days
-                else 0
-            ),
-            "actual_working_days": pay_slip.payment_days,
-            "absent": pay_slip.absent_days,
-            "total": pay_slip.gross_pay,
-            "net_payable_amount": pay_slip.net_pay,
-            "salary_info": salary_info,
-            "other_earnings": other_earnings_info,
-            "other_earnings_total": other_earnings_total,
+            "employee": row.employee,
+            "employee_name": row.employee_name,
+            "company": row.company,
+            "designation": row.designation,
+            "department": row.department,
+            "email": row.email,
+            "standard_working_days": row.standard_working_days,
+            "pan_number": row.pan_number,
+            "date_of_joining": row.date_of_joining,
+            "basic_salary": row.basic_salary,
+            "per_day_salary": row.per_day_salary,
+            "actual_working_days": row.actual_working_days,
+            "absent": row.absent,
+            "total": row.total,
+            "net_payable_amount": row.net_payable_amount,
+            "salary_info": row.salary_info,
+            "other_earnings": [
+                {"component": component, "amount": amount}
+                for component, amount in row.other_earnings.items()
+            ],
+            "other_earnings_total": row.other_earnings_total,
         }
 
-        print(pay_slip_dict)
         result.append(pay_slip_dict)
 
     return result
 
 
 @frappe.whitelist()
+@profileQueries
 def download_pay_slip_report(year=None, month=None, encodedCompany=None):
     company = base64.b64decode(encodedCompany).decode("utf-8")
 
@@ -182,9 +146,7 @@ def download_pay_slip_report(year=None, month=None, encodedCompany=None):
     for key in other_earning_keys:
         header_row_2.append(f"{key} - Amount")
 
-    data_rows = []
-
-    for r in records:
+    def build_row(r):
         row = [
             r.get("pay_slip_name"),
             r.get("year"),
@@ -221,18 +183,20 @@ def download_pay_slip_report(year=None, month=None, encodedCompany=None):
         for key in other_earning_keys:
             row.append(earnings_map.get(key, 0))
 
-        data_rows.append(row)
+        return row
 
-    xlsx_data = make_xlsx(
-        data=[header_row_1, header_row_2] + data_rows,
-        sheet_name="Pay Slip Report",
+    workbook = newWorkbook()
+    writeSheet(
+        workbook,
+        "Pay Slip Report",
+        [{"header": header} for header in header_row_1],
+        (build_row(r) for r in records),
+        headerRows=[header_row_1, header_row_2],
     )
 
     filename = f"{company.replace(' ', '_')}_Pay_Slip_Report_{calendar.month_name[int(month)]}_{year}.xlsx"
 
-    frappe.response.filename = filename
-    frappe.response.filecontent = xlsx_data.getvalue()
-    frappe.response.type = "binary"
+    sendXlsx(workbook, filename)
 
 
 @frappe.whitelist()
@@ -241,11 +205,8 @@ def download_idfc_blkpay(year=None, month=None, encodedCompany=None):
     import base64
     import calendar
     from datetime import date
-    from io import BytesIO
 
     import frappe
-    from openpyxl import Workbook
-    from openpyxl.styles import Alignment, Font
 
     # --- Decode and validate company ---
     company = base64.b64decode(encodedCompany).decode("utf-8")
@@ -284,34 +245,36 @@ def download_idfc_blkpay(year=None, month=None, encodedCompany=None):
     formatted_date_for_filename = last_date.strftime("%d%m%Y")
 
     # ---------------------------------------------------
-    # FETCH DATA FROM SALARY SLIP INSTEAD OF PAY SLIPS
+    # FETCH SALARY SLIP ROWS FROM THE PAYROLL REGISTER
     # ---------------------------------------------------
     query = """
         SELECT
             emp.ifsc_code AS ifsc,
             emp.bank_ac_no AS beneficiary_account_no,
-            ss.employee_name AS beneficiary_name,
-            ss.company,
-            ss.net_pay AS amount
-        FROM `tabSalary Slip` ss
+            pr.employee_name AS beneficiary_name,
+            pr.company,
+            pr.net_payable_amount AS amount
+        FROM `tabPayroll Register` pr
         INNER JOIN `tabEmployee` emp
-            ON emp.name = ss.employee
+            ON emp.name = pr.employee
         WHERE
-            MONTH(ss.end_date) = %(month)s
-            AND YEAR(ss.end_date) = %(year)s
-            AND ss.company = %(company)s
-            AND IFNULL(ss.net_pay, 0) > 0
+            pr.reference_doctype = 'Salary Slip'
+            AND pr.company = %(company)s
+            AND pr.end_date >= %(month_start)s
+            AND pr.end_date < %(next_month_start)s
+            AND IFNULL(pr.net_payable_amount, 0) > 0
     """
 
     params = {
-        "month": m,
-        "year": year,
+        "month_start": date(year, m, 1),
+        "next_month_start": last_date + timedelta(days=1),
         "company": company,
     }
 
-    data = frappe.db.sql(query, params, as_dict=True)
+    data = iterQuery(query, params)
+    first = next(data, None)
 
-    if not data:
+    if first is None:
         frappe.throw("No submitted Salary Slips found for selected month and company")
 
     # --- Debit account map ---
@@ -320,96 +283,48 @@ def download_idfc_blkpay(year=None, month=None, encodedCompany=None):
         "Pinnacle Finserv Advisors Pvt. Ltd.": "10237782223",
     }
 
-    today = date.today()
+    today = date.today().strftime("%d/%m/%Y")
 
     # --- Column configuration ---
     columns = [
-        {"header": "Beneficiary Name", "width": 30},
-        {"header": "Beneficiary Account No", "width": 25},
-        {"header": "IFSC", "width": 20},
-        {"header": "Transaction Type", "width": 20},
-        {"header": "Debit Account Number", "width": 30},
-        {"header": "Transaction Date", "width": 20},
-        {"header": "Amount (₹)", "width": 15},
-        {"header": "Currency", "width": 10},
+        {"header": "Beneficiary Name", "width": 30, "style": LEFT},
+        {"header": "Beneficiary Account No", "width": 25, "style": TEXT},
+        {"header": "IFSC", "width": 20, "style": TEXT},
+        {"header": "Transaction Type", "width": 20, "style": LEFT},
+        {"header": "Debit Account Number", "width": 30, "style": LEFT},
+        {"header": "Transaction Date", "width": 20, "style": LEFT},
+        {"header": "Amount (₹)", "width": 15, "style": AMOUNT_2DP},
+        {"header": "Currency", "width": 10, "style": LEFT},
     ]
 
-    # --- Prepare row data ---
-    rows = []
-
-    for r in data:
-        debit_account = company_debit_map.get(r.company, "")
-
-        rows.append(
-            [
-                r.beneficiary_name or "",
-                str(r.beneficiary_account_no or ""),
-                r.ifsc or "",
-                "NEFT",
-                debit_account,
-                today.strftime("%d/%m/%Y"),
-                flt(r.amount, 2),
-                "INR",
-            ]
-        )
-
-    # --- Build Excel file ---
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "IDFC BLKPAY"
-
-    # --- Header Row ---
-    for col_num, col in enumerate(columns, 1):
-        col_letter = ws.cell(row=1, column=col_num).column_letter
-
-        ws.merge_cells(f"{col_letter}1:{col_letter}2")
-
-        cell = ws.cell(row=1, column=col_num, value=col["header"])
-
-        ws.column_dimensions[col_letter].width = col["width"]
-
-        cell.alignment = Alignment(
-            horizontal="center",
-            vertical="center",
-        )
-
-        cell.font = Font(bold=True)
-
-    # --- Write data rows ---
-    start_row = 3
-
-    for row_idx, row_data in enumerate(rows, start_row):
-
-        for col_idx, value in enumerate(row_data, 1):
-
-            header = columns[col_idx - 1]["header"]
-
-            cell = ws.cell(
-                row=row_idx,
-                column=col_idx,
-                value=value,
-            )
-
-            # Keep account numbers as text
-            if header in ["Beneficiary Account No", "IFSC"]:
-                cell.number_format = "@"
-
-            elif header == "Amount (₹)":
-                cell.number_format = "0.00"
-                cell.alignment = Alignment(horizontal="right")
-
-            else:
-                cell.alignment = Alignment(horizontal="left")
-
-    # --- Save workbook to memory ---
-    output = BytesIO()
-
-    wb.save(output)
+    # --- Stream row data ---
+    rows = (
+        [
+            r.beneficiary_name or "",
+            str(r.beneficiary_account_no or ""),
+            r.ifsc or "",
+            "NEFT",
+            company_debit_map.get(r.company, ""),
+            today,
+            flt(r.amount, 2),
+            "INR",
+        ]
+        for r in chain([first], data)
+    )
 
-    output.seek(0)
+    # --- Build Excel file, header cells merged over two rows ---
+    workbook = newWorkbook()
+    writeSheet(
+        workbook,
+        "IDFC BLKPAY",
+        columns,
+        rows,
+        headerRows=[[col["header"] for col in columns], [None] * len(columns)],
+        merges=[
+            f"{get_column_letter(index)}1:{get_column_letter(index)}2"
+            for index in range(1, len(columns) + 1)
+        ],
+    )
 
     # --- Set response ---
-    frappe.response.filename = f"{company_abbr}{formatted_date_for_filename}.xlsx"
-
-    frappe.response.filecontent = output.getvalue()
-    frappe.response.type = "binary"
+    sendXlsx(workbook, f"{company_abbr}{formatted_date_for_filename}.xlsx")
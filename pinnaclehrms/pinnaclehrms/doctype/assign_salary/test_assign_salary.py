@@ -1,9 +1,113 @@
 # Copyright (c) 2025, OTPL and Contributors
 # See license.txt
 
-# import frappe
+from datetime import date
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from pinnaclehrms.utility.salary_timeline import SalaryTimeline
+
+EMPLOYEE = "_T-EMP-0001"
+
+
+def salary_history(*rows):
+	return SalaryTimeline(
+		[
+			frappe._dict(
+				employee=EMPLOYEE,
+				from_date=from_date,
+				salary=salary,
+				eligible_for_overtime_salary=overtime,
+			)
+			for from_date, salary, overtime in rows
+		]
+	)
+
 
 class TestAssignSalary(FrappeTestCase):
-	pass
+	def test_salary_on_from_date_boundaries(self):
+		timeline = salary_history((date(2025, 1, 1), 20000, 0), (date(2025, 4, 16), 30000, 1))
+
+		self.assertIsNone(timeline.salaryOn(EMPLOYEE, date(2024, 12, 31)))
+		self.assertEqual(timeline.salaryOn(EMPLOYEE, date(2025, 1, 1)).salary, 20000)
+		self.assertEqual(timeline.salaryOn(EMPLOYEE, date(2025, 4, 15)).salary, 20000)
+		self.assertEqual(timeline.salaryOn(EMPLOYEE, date(2025, 4, 16)).salary, 30000)
+		self.assertIsNone(timeline.salaryOn("_T-EMP-OTHER", date(2025, 4, 16)))
+
+	def test_salary_structure_lists_changes_in_period(self):
+		timeline = salary_history(
+			(date(2025, 1, 1), 20000, 0),
+			(date(2025, 4, 16), 30000, 1),
+			(date(2025, 7, 1), 35000, 1),
+		)
+
+		self.assertEqual(
+			timeline.getSalaryStructure(EMPLOYEE, date(2025, 2, 1), date(2025, 7, 1)),
+			{date(2025, 2, 1): 20000, date(2025, 4, 16): 30000, date(2025, 7, 1): 35000},
+		)
+		self.assertEqual(
+			timeline.getSalaryStructure(EMPLOYEE, date(2024, 6, 1), date(2024, 12, 31)),
+			{date(2024, 6, 1): 0},
+		)
+
+	def test_month_without_increment_uses_previous_salary(self):
+		timeline = salary_history((date(2025, 1, 1), 20000, 1))
+
+		self.assertEqual(
+			timeline.getSalaryDetails(EMPLOYEE, 2025, 3),
+			{"basicSalary": 20000, "overtimeEligibility": 1},
+		)
+		self.assertEqual(
+			timeline.getSalaryDetails(EMPLOYEE, 2024, 12),
+			{"basicSalary": 0.0, "overtimeEligibility": 0},
+		)
+
+	def test_mid_month_increment_is_pro_rated(self):
+		timeline = salary_history((date(2025, 1, 1), 30000, 0), (date(2025, 4, 16), 36000, 1))
+
+		# 15 days at 30000 / 30 and 15 days at 36000 / 30
+		self.assertEqual(
+			timeline.getSalaryDetails(EMPLOYEE, 2025, 4),
+			{"basicSalary": 33000, "overtimeEligibility": 1},
+		)
+
+	def test_same_day_increments_keep_the_last(self):
+		timeline = salary_history(
+			(date(2025, 1, 1), 30000, 0),
+			(date(2025, 4, 16), 36000, 0),
+			(date(2025, 4, 16), 42000, 1),
+		)
+
+		details = timeline.getSalaryDetails(EMPLOYEE, 2025, 4)
+		self.assertAlmostEqual(details["basicSalary"], 15 * 1000 + 15 * 1400)
+		self.assertEqual(details["overtimeEligibility"], 1)
+
+	def test_first_increment_without_previous_salary_covers_the_month(self):
+		timeline = salary_history((date(2025, 4, 16), 36000, 1))
+
+		self.assertEqual(
+			timeline.getSalaryDetails(EMPLOYEE, 2025, 4),
+			{"basicSalary": 36000, "overtimeEligibility": 1},
+		)
+
+	def test_increment_on_new_year_starts_in_january(self):
+		timeline = salary_history((date(2024, 6, 1), 20000, 0), (date(2025, 1, 1), 25000, 1))
+
+		self.assertEqual(
+			timeline.getSalaryDetails(EMPLOYEE, 2024, 12),
+			{"basicSalary": 20000, "overtimeEligibility": 0},
+		)
+		self.assertEqual(
+			timeline.getSalaryDetails(EMPLOYEE, 2025, 1),
+			{"basicSalary": 25000, "overtimeEligibility": 1},
+		)
+
+	def test_december_increment_is_pro_rated_over_31_days(self):
+		timeline = salary_history((date(2024, 6, 1), 31000, 0), (date(2024, 12, 11), 62000, 1))
+
+		# 10 days at 31000 / 31 and 21 days at 62000 / 31
+		self.assertEqual(
+			timeline.getSalaryDetails(EMPLOYEE, 2024, 12),
+			{"basicSalary": 52000, "overtimeEligibility": 1},
+		)
@@ -16,6 +16,7 @@ frappe.ui.form.on("Create Pay Slips", {
       });
     }
     add_email_btn(frm);
+    add_job_buttons(frm);
     if (frm.genrate_for_all) {
       frm.set_df_property("select_company", "hidden", 1);
       frm.set_df_property("company_abbr", "hidden", 1);
@@ -80,6 +81,14 @@ frappe.ui.form.on("Create Pay Slips", {
               default: 3,
               reqd: true,
             },
+            {
+              label: "Only Employees With Changes",
+              fieldname: "incremental",
+              fieldtype: "Check",
+              default: 1,
+              description:
+                "Skip employees whose attendance, salary, shift variations and other earnings are unchanged since their pay slip was generated.",
+            },
             // {
             //   label: "Auto Calculate Leave Encashment",
             //   fieldname: "auto_calculate_leave_encashment",
@@ -161,7 +170,13 @@ frappe.ui.form.on("Create Pay Slips", {
   },
 
   after_save(frm) {
-    createPaySlipList(frm);
+    frappe.show_alert(
+      {
+        message: __("Pay slip generation has been queued."),
+        indicator: "blue",
+      },
+      5
+    );
   },
 
   select_month(frm) {
@@ -307,7 +322,9 @@ function add_email_btn(frm) {
             raw_data: selected_rows,
           },
           callback: function (res) {
-            frappe.msgprint("Pay slip emailed successfully!");
+            frappe.msgprint(
+              `${res.message.queued} pay slips queued for email. Their Email Status is updated as they are sent.`
+            );
           },
           error: function (r) {
             frappe.msgprint(r.message);
@@ -321,25 +338,18 @@ function add_email_btn(frm) {
   );
 }
 
-function createPaySlipList(frm) {
-  if (frm.doc.created_pay_slips.length > 0) {
-    frappe.msgprint("Pay Slips have already been created for this record.");
+function add_job_buttons(frm) {
+  if (frm.is_new()) {
     return;
   }
-  frappe.call({
-    method: "pinnaclehrms.api.get_pay_slip_list",
-    args: {
-      month: frm.doc.month,
-      year: frm.doc.year,
-      parent_docname: frm.docname,
-      company: frm.doc.select_company,
-      employee: frm.doc.select_employee,
-    },
-    callback: function (res) {
-      frm.reload_doc();
-    },
-    error: function (r) {
-      frappe.msgprint(r.message);
-    },
-  });
+  if (["Queued", "Running"].includes(frm.doc.job_status)) {
+    frm.add_custom_button("Cancel Generation", () => {
+      frm.call("cancel_pay_slip_job").then(() => frm.reload_doc());
+    });
+  }
+  if (["Failed", "Cancelled"].includes(frm.doc.job_status)) {
+    frm.add_custom_button("Resume Generation", () => {
+      frm.call("resume_pay_slip_job").then(() => frm.reload_doc());
+    });
+  }
 }
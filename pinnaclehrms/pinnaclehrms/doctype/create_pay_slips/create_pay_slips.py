@@ -4,7 +4,22 @@
 import frappe
 from frappe.model.document import Document
 from collections import defaultdict
-from pinnaclehrms.utility.salary_calculator import createPaySlips
+from pinnaclehrms.utility.pay_slip_job import (
+    ACTIVE_STATUSES,
+    cancelPaySlipJob,
+    enqueuePaySlipJob,
+    resumePaySlipJob,
+)
+
+# Fields that change which pay slips are generated, or their amounts
+PAYROLL_INPUT_FIELDS = (
+    "year",
+    "month",
+    "select_company",
+    "genrate_for_all",
+    "allowed_lates",
+    "auto_calculate_leave_encashment",
+)
 
 
 class CreatePaySlips(Document):
@@ -13,6 +28,47 @@ class CreatePaySlips(Document):
             self.name = f"For-all-pay-slip-{self.year}-{self.month}"
 
     def before_save(self):
+        self.get_payroll_data()
+
+        # Generation runs in a background job, queued once the save commits.
+        # Saving without new inputs keeps the job and its checkpoint; failed
+        # and cancelled jobs are continued with resume_pay_slip_job.
+        if self.job_status not in ACTIVE_STATUSES and (
+            self.is_new() or self.payroll_inputs_changed()
+        ):
+            self.job_status = "Queued"
+            self.job_error = None
+            self.last_processed_employee = None
+            self.processed_employees = 0
+            self.created_pay_slip_count = 0
+            self.flags.enqueue_pay_slip_job = True
+
+    def payroll_inputs_changed(self):
+        before = self.get_doc_before_save()
+        if not before:
+            return True
+
+        if any(self.has_value_changed(field) for field in PAYROLL_INPUT_FIELDS):
+            return True
+        return [row.select_employee for row in self.employee_list] != [
+            row.select_employee for row in before.employee_list
+        ]
+
+    def on_update(self):
+        if self.flags.enqueue_pay_slip_job:
+            enqueuePaySlipJob(self.name)
+
+    @frappe.whitelist()
+    def resume_pay_slip_job(self):
+        self.check_permission("write")
+        resumePaySlipJob(self.name)
+
+    @frappe.whitelist()
+    def cancel_pay_slip_job(self):
+        self.check_permission("write")
+        cancelPaySlipJob(self.name)
+
+    def get_payroll_data(self):
         data = {}
         year = self.year
         month = int(self.month) if self.month else None
@@ -49,7 +105,7 @@ class CreatePaySlips(Document):
                     employee_list.append(employee.select_employee)
                 data["employee_list"] = employee_list
 
-        createPaySlips(data)
+        return data
 
     def on_trash(self):
         for pay_slip in self.created_pay_slips:
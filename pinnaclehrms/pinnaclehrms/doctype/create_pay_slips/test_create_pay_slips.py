@@ -1,9 +1,285 @@
 # Copyright (c) 2025, OTPL and Contributors
 # See license.txt
 
-# import frappe
+import copy
+import random
+import unittest
+from datetime import date, datetime, time, timedelta
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_to_date, cint, now_datetime
+
+from pinnaclehrms.utility import payroll_kernel
+from pinnaclehrms.utility.deduction_slabs import calculateDeduction, getSlabTable
+from pinnaclehrms.utility.pay_slip_writer import insertPaySlips
+from pinnaclehrms.utility.payroll_changes import getChangedEmployees
+from pinnaclehrms.utility.shift_variation_index import ShiftVariationIndex
+
+try:
+	from pinnaclehrms.utility import payroll_grid
+except ImportError:
+	payroll_grid = None
+
+
+SHIFT_TYPES = {
+	"General": {"start_time": timedelta(hours=9), "end_time": timedelta(hours=18)},
+	"Morning": {"start_time": timedelta(hours=7, minutes=30), "end_time": timedelta(hours=16)},
+	"Night": {"start_time": timedelta(hours=21), "end_time": timedelta(hours=6)},
+}
+
+
+def make_employee_data(employees, year, month, seed):
+	rng = random.Random(seed)
+	holidays = [{"holiday_date": date(year, month, day)} for day in (5, 15, 26)]
+	employee_data = {}
+	variations = [
+		{
+			"company": "_Test Company",
+			"shift_date": date(year, month, 10),
+			"shift_start": time(8, 0),
+			"shift_end": time(17, 0),
+			"employee": None,
+		}
+	]
+
+	for index in range(employees):
+		employee = f"_T-EMP-{index:04d}"
+		shift = rng.choice(list(SHIFT_TYPES))
+		records = []
+		for day in range(1, 29):
+			if rng.random() < 0.1:
+				continue
+			start = datetime.combine(date(year, month, day), time()) + SHIFT_TYPES[shift]["start_time"]
+			in_time = start + timedelta(seconds=rng.randint(-1800, 14000))
+			out_time = in_time + timedelta(seconds=rng.choice([10818, 10819, rng.randint(0, 40000)]))
+			if out_time.date() != in_time.date():
+				out_time = datetime.combine(in_time.date(), time(23, 59))
+			records.append(
+				{"attendance_date": in_time.date(), "shift": shift, "in_time": in_time, "out_time": out_time}
+			)
+
+		if rng.random() < 0.1:
+			variations.append(
+				{
+					"company": "_Test Company",
+					"shift_date": date(year, month, rng.randint(1, 28)),
+					"shift_start": time(9, 30),
+					"shift_end": time(17, 0),
+					"employee": employee,
+				}
+			)
+
+		employee_data[employee] = {
+			"company": "_Test Company",
+			"employee": employee,
+			"basic_salary": rng.uniform(8000, 90000),
+			"attendance_records": records,
+			"is_overtime": rng.choice([0, 1]),
+			"lates": rng.choice([0, 1, 3, -1]),
+			"holidays": holidays,
+			"total_working_days": 28,
+			"date_of_joining": date(2020, 1, 1),
+			"relieving_date": None,
+		}
+
+	return employee_data, ShiftVariationIndex(variations)
+
+
+def old_time_slabs(check_in_time, check_out_time):
+	"""The slab table calculateMonthlySalary built before deduction_slabs."""
+	iwh = (check_out_time - check_in_time).total_seconds() / 60
+
+	def after_check_in(fraction):
+		return check_in_time + timedelta(minutes=round(iwh * fraction))
+
+	def before_check_out(fraction):
+		return check_out_time - timedelta(minutes=round(iwh * fraction))
+
+	return {
+		"check_in": [
+			(check_in_time, after_check_in(0.112), 0.10),
+			(after_check_in(0.112), after_check_in(0.334), 0.25),
+			(after_check_in(0.334), after_check_in(0.667), 0.50),
+			(after_check_in(0.667), after_check_in(1), 0.75),
+		],
+		"check_out": [
+			(before_check_out(1), before_check_out(0.664), 0.75),
+			(before_check_out(0.664), before_check_out(0.331), 0.50),
+			(before_check_out(0.331), before_check_out(0.109), 0.25),
+			(before_check_out(0.109), check_out_time, 0.10),
+		],
+	}
+
+
+def old_deduction(check_in, check_out, slabs):
+	deduction = 0.0
+	for start, end, rate in slabs["check_in"]:
+		if start < check_in <= end:
+			deduction += rate
+			break
+	for start, end, rate in slabs["check_out"]:
+		if start <= check_out < end:
+			deduction += rate
+			break
+	return deduction
 
 
 class TestCreatePaySlips(FrappeTestCase):
-	pass
+	@unittest.skipIf(payroll_grid is None, "NumPy is not installed")
+	def test_numpy_engine_matches_scalar_kernel(self):
+		employee_data, shift_variations = make_employee_data(200, 2025, 2, seed=7)
+		other_earnings = {
+			employee: {"Bonus": {"type": "Earning", "amount": 1500.5, "doc_no": "RSC-0001"}}
+			for employee in list(employee_data)[::4]
+		}
+
+		expected = payroll_kernel.calculateMonthlySalary(
+			copy.deepcopy(employee_data), 2025, 2, SHIFT_TYPES, shift_variations, other_earnings
+		)
+		actual = payroll_grid.calculateMonthlySalary(
+			copy.deepcopy(employee_data), 2025, 2, SHIFT_TYPES, shift_variations, other_earnings
+		)
+
+		for employee in employee_data:
+			self.assertEqual(
+				actual[employee]["salary_information"], expected[employee]["salary_information"]
+			)
+			self.assertEqual(
+				actual[employee]["attendance_records"], expected[employee]["attendance_records"]
+			)
+
+	@unittest.skipIf(payroll_grid is None, "NumPy is not installed")
+	def test_engines_agree_on_unset_allowed_lates(self):
+		employee_data, shift_variations = make_employee_data(40, 2025, 2, seed=11)
+
+		for allowed_lates in (None, ""):
+			# getEmpRecords reads an unset allowed_lates as 0
+			for employee in employee_data:
+				employee_data[employee]["lates"] = cint(allowed_lates)
+
+			expected = payroll_kernel.calculateMonthlySalary(
+				copy.deepcopy(employee_data), 2025, 2, SHIFT_TYPES, shift_variations, {}
+			)
+			actual = payroll_grid.calculateMonthlySalary(
+				copy.deepcopy(employee_data), 2025, 2, SHIFT_TYPES, shift_variations, {}
+			)
+
+			for employee in employee_data:
+				self.assertEqual(
+					actual[employee]["salary_information"], expected[employee]["salary_information"]
+				)
+
+	def test_fresh_pay_slips_report_no_changed_employees(self):
+		employee = "_T-EMP-PAID"
+		generated_on = add_to_date(now_datetime(), minutes=-1)
+		inputs_modified = add_to_date(generated_on, minutes=-1)
+
+		component = frappe.get_doc(
+			{
+				"doctype": "Recurring Salary Component",
+				"employee": employee,
+				"component": "Bonus",
+				"type": "Earning",
+				"amount": 1000,
+				"due_date": date(2025, 2, 28),
+				"status": "Pending",
+				"modified": inputs_modified,
+			}
+		)
+		component.db_insert()
+		encashment = frappe.get_doc(
+			{
+				"doctype": "Pinnacle Leave Encashment",
+				"employee": employee,
+				"from_date": date(2024, 3, 1),
+				"to_date": date(2025, 2, 28),
+				"amount": 500,
+				"modified": inputs_modified,
+			}
+		)
+		encashment.db_insert()
+
+		insertPaySlips(
+			[
+				{
+					"doctype": "Pay Slips",
+					"year": 2025,
+					"month": "February",
+					"month_num": 2,
+					"company": "_Test Company",
+					"employee": employee,
+					"generated_on": generated_on,
+					"other_earnings": [
+						{
+							"component": "Bonus",
+							"type": "Earning",
+							"amount": 1000,
+							"component_reference": "Recurring Salary Component",
+							"reference_name": component.name,
+						},
+						{
+							"component": "Leave Encashment",
+							"type": "Earning",
+							"amount": 500,
+							"component_reference": "Pinnacle Leave Encashment",
+							"reference_name": encashment.name,
+						},
+					],
+				}
+			]
+		)
+
+		self.assertEqual(
+			frappe.db.get_value("Recurring Salary Component", component.name, "status"), "Cleared"
+		)
+		self.assertEqual(
+			frappe.db.get_value("Pinnacle Leave Encashment", encashment.name, "status"), "Paid"
+		)
+		self.assertEqual(
+			getChangedEmployees(
+				{employee: {"company": "_Test Company"}}, 2025, 2, {employee: generated_on}
+			),
+			set(),
+		)
+
+	def test_deduction_slabs_match_old_bounds(self):
+		minute = timedelta(minutes=1)
+		shifts = {
+			"day": (datetime(2025, 2, 3, 9, 30), datetime(2025, 2, 3, 18, 0)),
+			"night": (datetime(2025, 2, 3, 21, 0), datetime(2025, 2, 4, 6, 0)),
+		}
+
+		for shift, (ideal_check_in, ideal_check_out) in shifts.items():
+			slabs = old_time_slabs(ideal_check_in, ideal_check_out)
+			table = getSlabTable((ideal_check_out - ideal_check_in).total_seconds() / 60)
+			# Every slab boundary, one minute either side of it, and the ideal times
+			check_ins = sorted(
+				{
+					bound + offset
+					for start, end, _ in slabs["check_in"]
+					for bound in (start, end)
+					for offset in (-minute, timedelta(0), minute)
+				}
+			)
+			check_outs = sorted(
+				{
+					bound + offset
+					for start, end, _ in slabs["check_out"]
+					for bound in (start, end)
+					for offset in (-minute, timedelta(0), minute)
+				}
+			)
+
+			for check_in in check_ins:
+				for check_out in check_outs:
+					with self.subTest(shift=shift, check_in=check_in, check_out=check_out):
+						expected = old_deduction(check_in, check_out, slabs)
+						self.assertEqual(
+							calculateDeduction(check_in, check_out, ideal_check_in, ideal_check_out),
+							expected,
+						)
+						self.assertEqual(
+							table.deduction(check_in - ideal_check_in, ideal_check_out - check_out),
+							expected,
+						)
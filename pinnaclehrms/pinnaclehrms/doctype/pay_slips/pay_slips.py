@@ -3,7 +3,31 @@
 
 # import frappe
 from frappe.model.document import Document
+from pinnaclehrms.utility.attendance_record import renderAttendanceRecord
+from pinnaclehrms.utility.payroll_register import (
+	removeFromPayrollRegister,
+	renameInPayrollRegister,
+	syncPayrollRegister,
+)
 
 
 class PaySlips(Document):
-	pass
+	def onload(self):
+		self.attendance_record = self.get_attendance_record_html()
+
+	def validate(self):
+		# Attendance is rendered from attendance_data on load, never stored
+		if self.attendance_data:
+			self.attendance_record = None
+
+	def on_update(self):
+		syncPayrollRegister(self)
+
+	def on_trash(self):
+		removeFromPayrollRegister(self)
+
+	def after_rename(self, old, new, merge=False):
+		renameInPayrollRegister(self, old=old, new=new, merge=merge)
+
+	def get_attendance_record_html(self):
+		return renderAttendanceRecord(self)
@@ -5,7 +5,7 @@ import frappe, json, calendar
 from frappe import _
 from frappe.model.document import Document
 from datetime import datetime
-from pinnaclehrms.utility.salary_calculator import getSalaryDetails
+from pinnaclehrms.utility.salary_timeline import getSalaryTimeline
 from datetime import datetime, timedelta, date
 from dateutil.relativedelta import relativedelta
 
@@ -230,7 +230,7 @@ def _calAvgSalary(empID, from_date, end_date):
 
     This function retrieves the salary history for the given employee (`empID`) between `from_date` and `end_date`.
     It computes the average daily salary over the period, accounting for any salary changes that may have occurred.
-    If salary data is missing for the start date, it fetches the basic salary using `getSalaryDetails`.
+    The salary in effect on each day is read from the request-wide salary timeline.
 
     Args:
         empID (str): The employee ID for whom the average salary is to be calculated.
@@ -243,57 +243,11 @@ def _calAvgSalary(empID, from_date, end_date):
     startDate = from_date.date()
     endDate = end_date.date()
 
-    salaryData = frappe.db.sql(
-        """
-                            SELECT 
-                                tsh.from_date,
-                                tsh.salary
-                            FROM 
-                                `tabSalary History` AS tsh
-                            JOIN 
-                                `tabAssign Salary` AS tas
-                            ON 
-                                tsh.parent = tas.name
-                            WHERE 
-                                tas.employee_id = %s
-                                AND tsh.from_date BETWEEN %s AND %s;
-                               """,
-        (empID, startDate, endDate),
-        as_dict=True,
+    salaryStructure = getSalaryTimeline((empID,)).getSalaryStructure(
+        empID, startDate, endDate
     )
-    salaryStructure = {}
-
-    for data in salaryData:
-        salaryStructure[data.get("from_date")] = data.get("salary")
-
-    salary = salaryStructure.get(startDate)
-
-    if not salary:
-        salary = frappe.db.sql(
-            """
-                                    SELECT 
-                                        tsh.salary
-                                    FROM 
-                                        `tabSalary History` AS tsh
-                                    JOIN 
-                                        `tabAssign Salary` AS tas
-                                        ON tsh.parent = tas.name
-                                    WHERE 
-                                        tas.employee_id = %s
-                                        AND tsh.from_date <= %s
-                                    ORDER BY 
-                                        tsh.from_date DESC
-                                    LIMIT 1
-                                    """,
-            (empID, startDate),
-            as_dict=True,
-        )
-        if len(salary) > 0:
-            salary = salary[0].get("salary")
-        else:
-            salary = 0
+    salary = salaryStructure[startDate]
 
-    salaryStructure[startDate] = salary or 0
     salaryStructure = dict(sorted(salaryStructure.items()))
     total_salary = 0
     day_count = 0
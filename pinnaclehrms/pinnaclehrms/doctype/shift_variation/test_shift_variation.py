@@ -1,9 +1,46 @@
 # Copyright (c) 2025, OTPL and Contributors
 # See license.txt
 
-# import frappe
+from datetime import date, time
+
 from frappe.tests.utils import FrappeTestCase
 
+from pinnaclehrms.utility.shift_variation_index import ShiftVariationIndex
+
+DAY = date(2025, 2, 10)
+
+
+def variation(company, employee, shift_start, shift_end, shift_date=DAY):
+	return {
+		"company": company,
+		"employee": employee,
+		"shift_date": shift_date,
+		"shift_start": shift_start,
+		"shift_end": shift_end,
+	}
+
 
 class TestShiftVariation(FrappeTestCase):
-	pass
+	def test_employee_variation_wins_over_company_variation(self):
+		index = ShiftVariationIndex(
+			[
+				variation("_Test Company", "_T-EMP-0001", time(10, 0), time(19, 0)),
+				variation("_Test Company", None, time(8, 0), time(17, 0)),
+			]
+		)
+
+		self.assertEqual(index.get("_Test Company", DAY, "_T-EMP-0001"), (time(10, 0), time(19, 0)))
+		self.assertEqual(index.get("_Test Company", DAY, "_T-EMP-0002"), (time(8, 0), time(17, 0)))
+
+	def test_company_variation_applies_to_its_company_only(self):
+		index = ShiftVariationIndex(
+			[
+				variation("_Test Company", None, time(8, 0), time(17, 0)),
+				variation("_Test Company 1", None, time(11, 0), time(20, 0)),
+			]
+		)
+
+		self.assertEqual(index.get("_Test Company", DAY, "_T-EMP-0001"), (time(8, 0), time(17, 0)))
+		self.assertEqual(index.get("_Test Company 1", DAY, "_T-EMP-0001"), (time(11, 0), time(20, 0)))
+		self.assertIsNone(index.get("_Test Company 2", DAY, "_T-EMP-0001"))
+		self.assertIsNone(index.get("_Test Company", date(2025, 2, 11), "_T-EMP-0001"))
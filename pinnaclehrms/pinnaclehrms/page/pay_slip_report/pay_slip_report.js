@@ -294,7 +294,9 @@ frappe.pages["pay-slip-report"].on_page_load = function (wrapper) {
           args: { pay_slips: selected },
           callback: function (res) {
             if (res.message?.message === "success") {
-              frappe.msgprint("Pay slips emailed successfully!");
+              frappe.msgprint(
+                `${res.message.queued} pay slips queued for email. Their Email Status is updated as they are sent.`
+              );
             } else {
               frappe.msgprint("Failed to send email. Please try again.");
             }
@@ -310,11 +312,37 @@ frappe.pages["pay-slip-report"].on_page_load = function (wrapper) {
 
   $form.on("click", "#print_pay_slips", function () {
     const paySlips = get_selected();
+    if (!paySlips.length) {
+      frappe.msgprint("Please select at least one pay slip to print.");
+      return;
+    }
     const y = parseInt($form.find("#year").val(), 10);
     const m = parseInt($form.find("#month").val(), 10);
-    window.location.href = `/api/method/pinnaclehrms.api.print_pay_slip?year=${y}&month=${m}&pay_slips=${encodeURIComponent(
-      JSON.stringify(paySlips)
-    )}`;
+
+    // The ZIP is built in the background; a link is shown once it is ready
+    frappe.realtime.off("pay_slip_print_ready");
+    frappe.realtime.on("pay_slip_print_ready", function (data) {
+      frappe.realtime.off("pay_slip_print_ready");
+      if (data.error) {
+        frappe.msgprint("Failed to print pay slips. Please try again.");
+        return;
+      }
+      frappe.msgprint(
+        `${data.count} pay slips are ready. <a href="${data.file_url}" target="_blank">Download ZIP</a>`,
+        "Pay Slips Printed"
+      );
+    });
+
+    frappe.call({
+      method: "pinnaclehrms.api.enqueue_print_pay_slips",
+      args: { pay_slips: JSON.stringify(paySlips), year: y, month: m },
+      callback: function () {
+        frappe.show_alert({
+          message: "Printing pay slips in the background",
+          indicator: "blue",
+        });
+      },
+    });
   });
 
   // Download / Print actions
@@ -1,6 +1,9 @@
 import frappe
 import json
 import io
+import calendar
+from datetime import date
+from dateutil.relativedelta import relativedelta
 from frappe import _
 from frappe.utils.xlsxutils import make_xlsx
 from frappe.utils import format_datetime
@@ -49,33 +52,7 @@ def execute(filters=None):
         conditions.append("employee = %s")
         values.append(filters.get("employee"))
 
-    if filters.get("date"):
-        conditions.append("DATE(`time`) = %s")
-        values.append(filters.get("date"))
-    else:
-        if filters.get("year"):
-            conditions.append("YEAR(`time`) = %s")
-            values.append(filters.get("year"))
-
-        if filters.get("month"):
-            month_map = {
-                "January": 1,
-                "February": 2,
-                "March": 3,
-                "April": 4,
-                "May": 5,
-                "June": 6,
-                "July": 7,
-                "August": 8,
-                "September": 9,
-                "October": 10,
-                "November": 11,
-                "December": 12,
-            }
-            month_num = month_map.get(filters.get("month"))
-            if month_num:
-                conditions.append("MONTH(`time`) = %s")
-                values.append(month_num)
+    add_time_conditions(filters, conditions, values)
 
     condition_str = " AND ".join(conditions)
     if condition_str:
@@ -135,9 +112,9 @@ def bulk_approve_attendance(records):
             """
             SELECT name
             FROM `tabEmployee Checkin`
-            WHERE employee = %s AND DATE(`time`) = %s
+            WHERE employee = %s AND `time` >= %s AND `time` < DATE_ADD(%s, INTERVAL 1 DAY)
         """,
-            (employee, date),
+            (employee, date, date),
             as_dict=True,
         )
         
@@ -167,33 +144,7 @@ def download_final_attendance_excel(filters):
         conditions.append("employee = %s")
         values.append(filters.get("employee"))
 
-    if filters.get("date"):
-        conditions.append("DATE(`time`) = %s")
-        values.append(filters.get("date"))
-    else:
-        if filters.get("year"):
-            conditions.append("YEAR(`time`) = %s")
-            values.append(filters.get("year"))
-
-        if filters.get("month"):
-            month_map = {
-                "January": 1,
-                "February": 2,
-                "March": 3,
-                "April": 4,
-                "May": 5,
-                "June": 6,
-                "July": 7,
-                "August": 8,
-                "September": 9,
-                "October": 10,
-                "November": 11,
-                "December": 12,
-            }
-            month_num = month_map.get(filters.get("month"))
-            if month_num:
-                conditions.append("MONTH(`time`) = %s")
-                values.append(month_num)
+    add_time_conditions(filters, conditions, values)
 
     conditions.append("skip_auto_attendance = 0")
 
@@ -286,3 +237,29 @@ def attendance_notification(log):
 
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), "Attendance Notification Error")
+
+
+def add_time_conditions(filters, conditions, values):
+    """Filter Employee Checkin by date, year and month as ranges on `time`."""
+    if filters.get("date"):
+        conditions.append("`time` >= %s AND `time` < DATE_ADD(%s, INTERVAL 1 DAY)")
+        values.extend([filters.get("date"), filters.get("date")])
+        return
+
+    month_num = None
+    if filters.get("month") in calendar.month_name[1:]:
+        month_num = list(calendar.month_name).index(filters.get("month"))
+
+    if filters.get("year"):
+        year = int(filters.get("year"))
+        if month_num:
+            start = date(year, month_num, 1)
+            end = start + relativedelta(months=1)
+        else:
+            start, end = date(year, 1, 1), date(year + 1, 1, 1)
+        conditions.append("`time` >= %s AND `time` < %s")
+        values.extend([start, end])
+    elif month_num:
+        # Without a year the month cannot be expressed as one range
+        conditions.append("MONTH(`time`) = %s")
+        values.append(month_num)
@@ -68,7 +68,7 @@ def get_data(filters):
             from_date = f"{year}-{month_index:02d}-01"
             last_day = calendar.monthrange(year, month_index)[1]
             to_date = f"{year}-{month_index:02d}-{last_day}"
-            conditions += " AND DATE(ec.time) BETWEEN %(from_date)s AND %(to_date)s"
+            conditions += " AND ec.time >= %(from_date)s AND ec.time < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)"
             params["from_date"] = from_date
             params["to_date"] = to_date
 
@@ -77,7 +77,7 @@ def get_data(filters):
             and filters.get("to_date")
             and not filters.get("month")
         ):
-            conditions += " AND DATE(ec.time) BETWEEN %(from_date)s AND %(to_date)s"
+            conditions += " AND ec.time >= %(from_date)s AND ec.time < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)"
             params["from_date"] = filters.get("from_date")
             params["to_date"] = filters.get("to_date")
 
@@ -130,6 +130,9 @@ def eligible_employee_for_leave_encashment(data):
         int(year), int(month), calendar.monthrange(year, month)[1]
     )
 
+    month_start = date(int(year), int(month), 1)
+    next_month_start = month_start + relativedelta(months=1)
+
     eligible_employee_list = []
     filters = {"status": "Active"}
 
@@ -178,9 +181,9 @@ def eligible_employee_for_leave_encashment(data):
                 eligibility = "No"
             encashment_data = frappe.db.sql(
                 """
-                                       SELECT tple.name FROM `tabPinnacle Leave Encashment` tple WHERE tple.employee = %s AND MONTH(to_date) = %s AND  YEAR(to_date) = %s
+                                       SELECT tple.name FROM `tabPinnacle Leave Encashment` tple WHERE tple.employee = %s AND tple.to_date >= %s AND tple.to_date < %s
                                        """,
-                (emp.get("employee"), month, year),
+                (emp.get("employee"), month_start, next_month_start),
             )
             print(f"Encashment Data: {encashment_data}")
             if encashment_data:
@@ -208,7 +208,7 @@ def get_app_attendance(employee_list, payrollFrom, payrollTo):
             MAX(CASE WHEN log_type = 'OUT' THEN `time` END)  AS out_time
         FROM `tabEmployee Checkin`
         WHERE employee IN %(employee_list)s
-          AND DATE(`time`) BETWEEN %(from_date)s AND %(to_date)s
+          AND `time` >= %(from_date)s AND `time` < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
         GROUP BY employee, DATE(`time`)
         ORDER BY employee, attendance_date
     """
@@ -0,0 +1,53 @@
+import frappe
+import json
+
+TEMPLATE = "pinnaclehrms/public/templates/attendance_record.html"
+
+# Keys of a calculated attendance record, in packed column order
+COLUMNS = ("date", "deductionPercentage", "salary", "status", "check_in", "check_out")
+
+CACHE_PREFIX = "pay_slip_attendance_record"
+CACHE_EXPIRY = 24 * 60 * 60
+
+
+def packAttendanceRecords(records):
+    """
+    Serialize calculated attendance records as compact JSON.
+
+    Each record becomes a list of its COLUMNS values. Dates and times are
+    stored as the strings the template would print for them.
+    """
+    rows = [[record.get(column) for column in COLUMNS] for record in records or []]
+    return json.dumps(
+        {"columns": COLUMNS, "rows": rows}, separators=(",", ":"), default=str
+    )
+
+
+def unpackAttendanceRecords(packed):
+    """Return the attendance records stored by `packAttendanceRecords`."""
+    if not packed:
+        return []
+    data = json.loads(packed)
+    return [frappe._dict(zip(data["columns"], row)) for row in data["rows"]]
+
+
+def renderAttendanceRecord(paySlip):
+    """
+    Return the attendance table HTML of a Pay Slips document.
+
+    Rendered HTML is cached per Pay Slip and `modified` timestamp, so an
+    edited slip is rendered again. Slips generated before attendance was
+    packed keep their stored HTML.
+    """
+    if not paySlip.get("attendance_data"):
+        return paySlip.get("attendance_record")
+
+    key = f"{CACHE_PREFIX}:{paySlip.name}:{paySlip.modified}"
+    html = frappe.cache().get_value(key)
+    if html is None:
+        html = frappe.render_template(
+            TEMPLATE,
+            {"attendance_record": unpackAttendanceRecords(paySlip.attendance_data)},
+        )
+        frappe.cache().set_value(key, html, expires_in_sec=CACHE_EXPIRY)
+    return html
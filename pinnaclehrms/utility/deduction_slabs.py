@@ -0,0 +1,68 @@
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+from functools import lru_cache
+
+
+# Fractions of the ideal working time at which each slab ends (check-in) or
+# starts (check-out), with the deduction applied inside that slab.
+CHECK_IN_SLABS = ((0.112, 0.10), (0.334, 0.25), (0.667, 0.50), (1, 0.75))
+CHECK_OUT_SLABS = ((1, 0.75), (0.664, 0.50), (0.331, 0.25), (0.109, 0.10))
+
+
+class SlabTable:
+    """
+    Late check-in / early check-out deduction slabs of a shift.
+
+    Boundaries are stored as sorted offsets from the ideal check-in and
+    check-out, so one table serves every day of every shift with the same
+    ideal working time and a lookup is a binary search over five entries.
+    """
+
+    def __init__(self, idealMinutes):
+        # An overnight shift given as same-day times has no slabs at all
+        idealMinutes = max(idealMinutes, 0)
+
+        self.checkInBounds = [timedelta(0)] + [
+            timedelta(minutes=round(idealMinutes * fraction))
+            for fraction, _ in CHECK_IN_SLABS
+        ]
+        self.checkInRates = [rate for _, rate in CHECK_IN_SLABS]
+
+        self.checkOutBounds = [
+            -timedelta(minutes=round(idealMinutes * fraction))
+            for fraction, _ in CHECK_OUT_SLABS
+        ] + [timedelta(0)]
+        self.checkOutRates = [rate for _, rate in CHECK_OUT_SLABS]
+
+    def checkInDeduction(self, lateBy):
+        """Deduction for checking in `lateBy` after the ideal check-in."""
+        # Slabs are (start, end]; empty slabs are skipped by bisect_left
+        index = bisect_left(self.checkInBounds, lateBy)
+        if 0 < index < len(self.checkInBounds):
+            return self.checkInRates[index - 1]
+        return 0.0
+
+    def checkOutDeduction(self, earlyBy):
+        """Deduction for checking out `earlyBy` before the ideal check-out."""
+        # Slabs are [start, end); empty slabs are skipped by bisect_right
+        index = bisect_right(self.checkOutBounds, -earlyBy)
+        if 0 < index < len(self.checkOutBounds):
+            return self.checkOutRates[index - 1]
+        return 0.0
+
+    def deduction(self, lateBy, earlyBy):
+        return self.checkInDeduction(lateBy) + self.checkOutDeduction(earlyBy)
+
+
+@lru_cache(maxsize=None)
+def getSlabTable(idealMinutes):
+    """Return the slab table for a shift of `idealMinutes`, built once."""
+    return SlabTable(idealMinutes)
+
+
+def calculateDeduction(checkIn, checkOut, idealCheckIn, idealCheckOut):
+    """Deduction for a day worked from `checkIn` to `checkOut`."""
+    idealMinutes = (idealCheckOut - idealCheckIn).total_seconds() / 60
+    return getSlabTable(idealMinutes).deduction(
+        checkIn - idealCheckIn, idealCheckOut - checkOut
+    )
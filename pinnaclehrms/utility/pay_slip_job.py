@@ -0,0 +1,165 @@
+import frappe
+from frappe.utils import cint, create_batch
+from pinnaclehrms.utility.salary_calculator import (
+    buildPaySlip,
+    calculatePayroll,
+    getEmpRecords,
+)
+from pinnaclehrms.utility.payroll_data import loadExistingPaySlips
+from pinnaclehrms.utility.pay_slip_writer import DEFAULT_CHUNK_SIZE, insertPaySlips
+from pinnaclehrms.utility.query_profiler import profileQueries
+
+DOCTYPE = "Create Pay Slips"
+
+# Site config keys:
+#   pay_slip_job_chunk_size  employees written and committed per checkpoint
+ACTIVE_STATUSES = ("Queued", "Running")
+RESUMABLE_STATUSES = ("Failed", "Cancelled")
+
+
+def enqueuePaySlipJob(docname):
+    """Queue pay slip generation for a Create Pay Slips document."""
+    frappe.enqueue(
+        "pinnaclehrms.utility.pay_slip_job.runPaySlipJob",
+        queue="long",
+        job_id=f"create_pay_slips::{docname}",
+        deduplicate=True,
+        enqueue_after_commit=True,
+        docname=docname,
+    )
+
+
+def resumePaySlipJob(docname):
+    """Queue a failed or cancelled job again, keeping its checkpoint."""
+    if frappe.db.get_value(DOCTYPE, docname, "job_status") not in RESUMABLE_STATUSES:
+        frappe.throw("Only failed or cancelled jobs can be resumed")
+
+    frappe.db.set_value(
+        DOCTYPE,
+        docname,
+        {"job_status": "Queued", "job_error": None},
+        update_modified=False,
+    )
+    enqueuePaySlipJob(docname)
+
+
+def cancelPaySlipJob(docname):
+    """Ask a queued or running job to stop after the chunk it is writing."""
+    if frappe.db.get_value(DOCTYPE, docname, "job_status") in ACTIVE_STATUSES:
+        frappe.db.set_value(
+            DOCTYPE, docname, "job_status", "Cancelled", update_modified=False
+        )
+
+
+@profileQueries
+def runPaySlipJob(docname):
+    """
+    Generate the Pay Slips of a Create Pay Slips document in chunks.
+
+    Employees are processed in ID order. Each chunk is calculated and its Pay
+    Slips committed together with the checkpoint (last employee, counts), so a
+    failed or cancelled run resumes from the first employee without a Pay Slip.
+    """
+    doc = frappe.get_doc(DOCTYPE, docname)
+    if doc.job_status == "Cancelled":
+        return
+
+    data = doc.get_payroll_data()
+    year = int(data.get("year"))
+    month = data.get("month")
+    chunkSize = cint(frappe.conf.get("pay_slip_job_chunk_size")) or DEFAULT_CHUNK_SIZE
+
+    _setStatus(docname, "Running")
+
+    try:
+        generatedOn = frappe.utils.now_datetime()
+        empRecords = getEmpRecords(data)
+        total = len(empRecords)
+        processed = cint(doc.processed_employees)
+        created = cint(doc.created_pay_slip_count)
+
+        pending = sorted(
+            emp_id
+            for emp_id in empRecords
+            if not doc.last_processed_employee or emp_id > doc.last_processed_employee
+        )
+        existingPaySlips = loadExistingPaySlips(pending, year, month)
+
+        for chunk in create_batch(pending, chunkSize):
+            if _isCancelled(docname):
+                return
+
+            chunkRecords = {
+                emp_id: empRecords[emp_id]
+                for emp_id in chunk
+                if emp_id not in existingPaySlips
+            }
+            employeeData = (
+                calculatePayroll(chunkRecords, year, month) if chunkRecords else {}
+            )
+            paySlips = [
+                buildPaySlip(employeeData[emp_id], year, month, generatedOn)
+                for emp_id in chunkRecords
+            ]
+            insertPaySlips(paySlips, chunkSize=chunkSize)
+
+            processed += len(chunk)
+            created += len(paySlips)
+            frappe.db.set_value(
+                DOCTYPE,
+                docname,
+                {
+                    "last_processed_employee": chunk[-1],
+                    "processed_employees": processed,
+                    "created_pay_slip_count": created,
+                },
+                update_modified=False,
+            )
+            frappe.db.commit()
+
+            frappe.publish_progress(
+                int(processed / total * 100) if total else 100,
+                title="Creating Pay Slips",
+                description=f"Created Pay Slips up to {chunk[-1]}",
+                doctype=DOCTYPE,
+                docname=docname,
+            )
+
+        _fillCreatedPaySlips(doc, data)
+        _setStatus(docname, "Completed")
+    except Exception:
+        frappe.db.rollback()
+        frappe.log_error(
+            frappe.get_traceback(), f"Pay Slip generation failed for {docname}"
+        )
+        _setStatus(docname, "Failed", frappe.get_traceback())
+        raise
+    finally:
+        frappe.get_doc(DOCTYPE, docname).notify_update()
+
+
+def _isCancelled(docname):
+    return frappe.db.get_value(DOCTYPE, docname, "job_status") == "Cancelled"
+
+
+def _setStatus(docname, status, error=None):
+    frappe.db.set_value(
+        DOCTYPE,
+        docname,
+        {"job_status": status, "job_error": error},
+        update_modified=False,
+    )
+    frappe.db.commit()
+
+
+def _fillCreatedPaySlips(doc, data):
+    from pinnaclehrms.api import get_pay_slip_list
+
+    frappe.db.delete("Created Pay Slips", {"parent": doc.name, "parenttype": DOCTYPE})
+    get_pay_slip_list(
+        doc.name,
+        data.get("month"),
+        data.get("year"),
+        company=data.get("select_company"),
+        employee=data.get("select_employee"),
+    )
@@ -0,0 +1,213 @@
+"""
+Background bulk mailing of pay slips.
+
+Pay slips are mailed by one background job per batch. A job loads its
+batch with one query per table, reads the employees' emails in one query
+and renders every message with the same compiled template. Messages go to
+the Email Queue with a `send_after` spread over minutes, so no more than
+`pay_slip_mails_per_minute` leave per minute. Each Pay Slip records its
+Email Queue entry and an email status, refreshed hourly from the queue.
+
+Site config keys:
+    pay_slip_mails_per_minute   messages released to the Email Queue per minute
+    pay_slip_mail_batch_size    pay slips per background job
+"""
+
+import frappe
+from frappe.utils import add_to_date, cint, create_batch, now_datetime
+from pinnaclehrms.utility.payroll_register import attachChildRows
+
+TEMPLATE = "pinnaclehrms/public/templates/pay_slip.html"
+SENDER = "hr@mygstcafe.in"
+CC = "records@mygstcafe.in"
+
+DEFAULT_MAILS_PER_MINUTE = 60
+DEFAULT_BATCH_SIZE = 100
+
+# Email Queue status -> Pay Slips email_status
+QUEUE_STATUSES = {
+    "Not Sent": "Queued",
+    "Sending": "Queued",
+    "Sent": "Sent",
+    "Partially Sent": "Sent",
+    "Error": "Failed",
+    "Expired": "Failed",
+    "Cancelled": "Failed",
+}
+
+
+def enqueuePaySlipMails(paySlips):
+    """Queue one mailing job per batch of `paySlips`; returns the job count."""
+    paySlips = list(dict.fromkeys(paySlips))
+    if not paySlips:
+        return 0
+
+    frappe.db.set_value(
+        "Pay Slips",
+        {"name": ["in", paySlips]},
+        {"email_status": "Queued", "email_queue": None},
+        update_modified=False,
+    )
+
+    batchSize = cint(frappe.conf.get("pay_slip_mail_batch_size")) or DEFAULT_BATCH_SIZE
+    startAt = now_datetime()
+    jobs = 0
+    for index, batch in enumerate(create_batch(paySlips, batchSize)):
+        frappe.enqueue(
+            "pinnaclehrms.utility.pay_slip_mailer.sendPaySlipMails",
+            queue="long",
+            enqueue_after_commit=True,
+            paySlips=list(batch),
+            startAt=startAt,
+            offset=index * batchSize,
+        )
+        jobs += 1
+    return jobs
+
+
+def sendPaySlipMails(paySlips, startAt=None, offset=0):
+    """
+    Queue the pay slip emails of one batch.
+
+    `offset` is the position of the batch in the whole mail-out; message n
+    is released `n // pay_slip_mails_per_minute` minutes after `startAt`.
+    """
+    startAt = startAt or now_datetime()
+    perMinute = (
+        cint(frappe.conf.get("pay_slip_mails_per_minute")) or DEFAULT_MAILS_PER_MINUTE
+    )
+    template = frappe.get_jenv().get_template(TEMPLATE)
+
+    docs = loadPaySlips(paySlips)
+    emails = {
+        employee.name: employee.company_email
+        for employee in frappe.get_all(
+            "Employee",
+            filters={"name": ["in", list({doc.employee for doc in docs})]},
+            fields=["name", "company_email"],
+        )
+    }
+
+    statuses = {}
+    for position, doc in enumerate(docs, start=offset):
+        email = emails.get(doc.employee)
+        if not email:
+            statuses[doc.name] = "No Email"
+            continue
+
+        try:
+            frappe.sendmail(
+                recipients=[email],
+                sender=SENDER,
+                cc=CC,
+                subject=f"Pay Slip for {doc.employee_name} - {doc.month} {doc.year}",
+                message=template.render({"doc": doc}),
+                reference_doctype="Pay Slips",
+                reference_name=doc.name,
+                send_after=add_to_date(startAt, minutes=position // perMinute),
+            )
+        except Exception:
+            frappe.log_error(title=f"Pay slip email failed for {doc.name}")
+            statuses[doc.name] = "Failed"
+            continue
+
+        statuses[doc.name] = "Queued"
+
+    queued = [name for name, status in statuses.items() if status == "Queued"]
+    _setEmailStatus(statuses, getEmailQueues(queued))
+    frappe.db.commit()
+
+
+def loadPaySlips(names):
+    """Return the Pay Slips `names` with their child tables, in that order."""
+    paySlips = frappe.get_all(
+        "Pay Slips", filters={"name": ["in", names]}, fields=["*"]
+    )
+    attachChildRows(
+        paySlips,
+        "Pay Slips",
+        {
+            "salary_calculation": (
+                "Salary Calculation",
+                ["particulars", "days", "rate", "effective_percentage", "amount"],
+            ),
+            "other_earnings": ("Other Earnings", ["component", "type", "amount"]),
+        },
+    )
+    byName = {paySlip.name: paySlip for paySlip in paySlips}
+    return [byName[name] for name in names if name in byName]
+
+
+def getEmailQueues(paySlips):
+    """
+    Return {pay slip: Email Queue} of the latest queued email of `paySlips`.
+
+    The queue entries are looked up by reference, as `frappe.sendmail` does
+    not always return the Email Queue it created.
+    """
+    if not paySlips:
+        return {}
+    return {
+        row.reference_name: row.name
+        for row in frappe.get_all(
+            "Email Queue",
+            filters={
+                "reference_doctype": "Pay Slips",
+                "reference_name": ["in", paySlips],
+            },
+            fields=["name", "reference_name"],
+            order_by="creation asc",
+        )
+    }
+
+
+def refreshEmailStatus():
+    """Copy the Email Queue status onto Pay Slips whose email is still queued."""
+    rows = frappe.db.sql(
+        """
+            SELECT ps.name, eq.status
+            FROM `tabPay Slips` AS ps
+            JOIN `tabEmail Queue` AS eq ON eq.name = ps.email_queue
+            WHERE ps.email_status = 'Queued'
+        """,
+        as_dict=True,
+    )
+
+    byStatus = {}
+    for row in rows:
+        status = QUEUE_STATUSES.get(row.status, "Queued")
+        if status != "Queued":
+            byStatus.setdefault(status, []).append(row.name)
+
+    for status, names in byStatus.items():
+        frappe.db.set_value(
+            "Pay Slips",
+            {"name": ["in", names]},
+            {"email_status": status, "emailed_on": now_datetime()},
+            update_modified=False,
+        )
+
+
+def _setEmailStatus(statuses, emailQueues):
+    """Write the email status and Email Queue of every pay slip in one UPDATE."""
+    if not statuses:
+        return
+
+    cases = " ".join(["WHEN %s THEN %s"] * len(statuses))
+    values = []
+    for name, status in statuses.items():
+        values.extend((name, status))
+    for name in statuses:
+        values.extend((name, emailQueues.get(name)))
+    values.append(tuple(statuses))
+
+    frappe.db.sql(
+        f"""
+            UPDATE `tabPay Slips`
+            SET
+                email_status = CASE name {cases} END,
+                email_queue = CASE name {cases} END
+            WHERE name IN %s
+        """,
+        values,
+    )
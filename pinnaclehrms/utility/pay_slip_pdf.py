@@ -0,0 +1,131 @@
+"""
+Pay slip PDFs, cached on disk by content.
+
+A pay slip PDF only depends on the Pay Slips document and the pay slip
+template, so it is cached under a hash of (name, modified, template hash) in
+the site's private files. Any change to the slip or the template gives a new
+key; stale entries are never read again and age out. Hits refresh the file's
+mtime, and eviction removes the least recently used PDFs once the cache
+outgrows its size limit.
+
+Site config key:
+    pay_slip_pdf_cache_mb  size limit of the cache in MB (default 1024)
+"""
+
+import frappe
+import hashlib
+import os
+from frappe.utils import cint, get_datetime
+from frappe.utils.pdf import get_pdf
+
+TEMPLATE = "pinnaclehrms/public/templates/pay_slip.html"
+CACHE_FOLDER = "pay_slip_pdfs"
+DEFAULT_CACHE_MB = 1024
+# Share of the limit the cache is trimmed down to when evicting
+EVICT_TO = 0.9
+
+_templateHashes = {}
+
+
+def renderPaySlipPdf(paySlip):
+    """Return the PDF bytes of a Pay Slips document or name, without the cache."""
+    doc = frappe.get_doc("Pay Slips", paySlip) if isinstance(paySlip, str) else paySlip
+    html = frappe.render_template(TEMPLATE, {"doc": doc})
+    return get_pdf(html)
+
+
+def getPaySlipPdf(paySlip):
+    """Return the PDF bytes of a Pay Slips document or name."""
+    with open(getPaySlipPdfPath(paySlip), "rb") as pdf:
+        return pdf.read()
+
+
+def getPaySlipPdfPath(paySlip):
+    """
+    Return the path of the cached PDF of a Pay Slips document or name.
+
+    The PDF is rendered and stored on a miss. Given a name, a hit costs one
+    query for `modified` and no document load.
+    """
+    if isinstance(paySlip, str):
+        modified = frappe.db.get_value("Pay Slips", paySlip, "modified")
+        if modified is None:
+            frappe.throw(f"Pay Slip {paySlip} not found")
+        name = paySlip
+    else:
+        modified = paySlip.modified
+        name = paySlip.name
+
+    path = os.path.join(getCacheDir(), f"{_cacheKey(name, modified)}.pdf")
+    if os.path.exists(path):
+        # Mark as recently used for eviction
+        os.utime(path)
+        return path
+
+    pdf = renderPaySlipPdf(paySlip)
+    tmpPath = f"{path}.{frappe.generate_hash(length=8)}.tmp"
+    with open(tmpPath, "wb") as file:
+        file.write(pdf)
+    os.replace(tmpPath, path)
+    return path
+
+
+def getCacheDir():
+    path = frappe.get_site_path("private", "files", CACHE_FOLDER)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def evictPdfCache(maxBytes=None):
+    """
+    Delete the least recently used PDFs while the cache exceeds its limit.
+
+    Runs hourly; returns the number of files deleted.
+    """
+    if maxBytes is None:
+        maxBytes = (
+            (cint(frappe.conf.get("pay_slip_pdf_cache_mb")) or DEFAULT_CACHE_MB)
+            * 1024
+            * 1024
+        )
+
+    entries = []
+    total = 0
+    with os.scandir(getCacheDir()) as scan:
+        for entry in scan:
+            if entry.is_file() and entry.name.endswith(".pdf"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+    if total <= maxBytes:
+        return 0
+
+    deleted = 0
+    for _, size, path in sorted(entries):
+        if total <= maxBytes * EVICT_TO:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        deleted += 1
+    return deleted
+
+
+def _cacheKey(name, modified):
+    key = f"{name}\0{get_datetime(modified).isoformat()}\0{_templateHash()}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _templateHash():
+    """Return the hash of the pay slip template, recomputed when it changes."""
+    path = frappe.get_app_path("pinnaclehrms", "public", "templates", "pay_slip.html")
+    mtime = os.path.getmtime(path)
+    cached = _templateHashes.get(path)
+    if not cached or cached[0] != mtime:
+        with open(path, "rb") as template:
+            cached = (mtime, hashlib.sha256(template.read()).hexdigest())
+        _templateHashes[path] = cached
+    return cached[1]
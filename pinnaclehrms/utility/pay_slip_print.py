@@ -0,0 +1,150 @@
+"""
+Background bulk printing of pay slips into a ZIP of PDFs.
+
+PDFs are taken from the pay slip PDF cache, rendering the missing ones in a
+bounded pool of worker processes, each connected to the site. The job
+streams every PDF from disk into a ZIP saved as a private File, so memory
+stays flat however many slips are printed. The user is notified with a download link when the
+ZIP is ready.
+
+Site config key:
+    pay_slip_print_workers  number of rendering processes (0 or 1 renders serially)
+"""
+
+import frappe
+import calendar
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pinnaclehrms.utility.pay_slip_pdf import evictPdfCache, getPaySlipPdfPath
+
+READY_EVENT = "pay_slip_print_ready"
+DEFAULT_WORKERS = 4
+
+
+def getPrintWorkers(paySlipCount):
+    """Return the number of rendering processes for `paySlipCount` pay slips."""
+    workers = frappe.conf.get("pay_slip_print_workers")
+    if workers is None:
+        workers = min(DEFAULT_WORKERS, os.cpu_count() or 1)
+    return max(1, min(frappe.utils.cint(workers), paySlipCount))
+
+
+def enqueuePaySlipPrint(paySlips, year, month):
+    """Queue a ZIP of the `paySlips` PDFs and return the job id."""
+    jobId = f"pay_slip_print::{frappe.session.user}::{frappe.generate_hash(length=8)}"
+    frappe.enqueue(
+        runPaySlipPrint,
+        queue="long",
+        timeout=3600,
+        job_id=jobId,
+        paySlips=list(paySlips),
+        year=year,
+        month=month,
+    )
+    return jobId
+
+
+def runPaySlipPrint(paySlips, year, month):
+    """Render `paySlips` into a private ZIP File and notify the user."""
+    labels = {
+        paySlip.name: paySlip
+        for paySlip in frappe.get_all(
+            "Pay Slips",
+            filters={"name": ["in", paySlips]},
+            fields=["name", "employee", "employee_name", "month", "year"],
+        )
+    }
+    names = [name for name in paySlips if name in labels]
+
+    fileName = (
+        f"{calendar.month_name[int(month)]}_{year}_pay_slips_"
+        f"{frappe.generate_hash(length=6)}.zip"
+    )
+    zipPath = frappe.get_site_path("private", "files", fileName)
+
+    try:
+        entries = set()
+        with zipfile.ZipFile(
+            zipPath, mode="w", compression=zipfile.ZIP_DEFLATED
+        ) as zipf:
+            for done, (name, pdfPath) in enumerate(
+                _renderPdfs(names, getPrintWorkers(len(names))), start=1
+            ):
+                zipf.write(pdfPath, _entryName(labels[name], entries))
+                frappe.publish_progress(
+                    int(done * 100 / len(names)),
+                    title="Printing Pay Slips",
+                    description=f"Printed {done} of {len(names)} pay slips",
+                )
+
+        file = frappe.get_doc(
+            {
+                "doctype": "File",
+                "file_name": fileName,
+                "file_url": f"/private/files/{fileName}",
+                "is_private": 1,
+            }
+        ).insert(ignore_permissions=True)
+    except Exception:
+        if os.path.exists(zipPath):
+            os.remove(zipPath)
+        frappe.publish_realtime(READY_EVENT, {"error": True}, user=frappe.session.user)
+        raise
+
+    evictPdfCache()
+
+    frappe.publish_realtime(
+        READY_EVENT,
+        {"file_url": file.file_url, "count": len(names)},
+        user=frappe.session.user,
+    )
+    return file.file_url
+
+
+def _entryName(paySlip, entries):
+    """Return a unique ZIP entry name, by employee ID when names clash."""
+    name = f"{paySlip.employee_name}_{paySlip.month}_{paySlip.year}.pdf"
+    if name in entries:
+        name = f"{paySlip.employee}_{paySlip.month}_{paySlip.year}.pdf"
+    entries.add(name)
+    return name
+
+
+def _renderPdfs(names, workers):
+    """Yield (name, cached pdf path) as each pay slip is ready, in completion order."""
+    if workers <= 1:
+        for name in names:
+            yield _pdfPath(name)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_connectWorker,
+        initargs=(frappe.local.site, frappe.local.sites_path, frappe.session.user),
+    ) as executor:
+        queued = iter(names)
+        pending = set()
+        while True:
+            # At most two slips per worker are in flight at any time
+            for name in queued:
+                pending.add(executor.submit(_pdfPath, name))
+                if len(pending) >= workers * 2:
+                    break
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def _pdfPath(name):
+    return name, getPaySlipPdfPath(name)
+
+
+def _connectWorker(site, sitesPath, user):
+    frappe.init(site=site, sites_path=sitesPath)
+    frappe.connect()
+    frappe.set_user(user)
@@ -0,0 +1,140 @@
+import frappe
+from collections import defaultdict
+from frappe.model.document import Document
+from frappe.utils import create_batch, now
+from pinnaclehrms.utility.payroll_register import paySlipRegisterRow, writeRegisterRows
+
+DEFAULT_CHUNK_SIZE = 200
+
+# Documents linked from Other Earnings rows and the status they get once paid
+EARNING_REFERENCES = {
+    "Recurring Salary Component": "Cleared",
+    "Pinnacle Leave Encashment": "Paid",
+}
+
+
+def insertPaySlips(paySlips, chunkSize=DEFAULT_CHUNK_SIZE, commit=False):
+    """
+    Insert Pay Slips with their child rows using multi-row INSERTs.
+
+    `paySlips` are new Pay Slips documents, or dicts as accepted by
+    `frappe.get_doc`. Each chunk costs one INSERT per table and one UPDATE
+    per linked doctype instead of one round-trip per row. It is written under
+    a savepoint and committed when `commit` is set. Skipping `insert()` skips
+    no validation: the Pay Slips controller only writes the Payroll Register
+    row on update, which is done here for the whole chunk. Returns the names
+    of the inserted Pay Slips.
+    """
+    names = []
+
+    for chunk in create_batch(paySlips, chunkSize):
+        frappe.db.savepoint("pay_slip_chunk")
+        try:
+            names.extend(_insertChunk(chunk))
+        except Exception:
+            frappe.db.rollback(save_point="pay_slip_chunk")
+            raise
+
+        if commit:
+            frappe.db.commit()
+
+    return names
+
+
+def _insertChunk(paySlips):
+    timestamp = now()
+    user = frappe.session.user
+
+    rowsByDoctype = defaultdict(list)
+    paidEarnings = defaultdict(dict)
+    names = []
+    registerRows = []
+
+    for paySlip in paySlips:
+        doc = paySlip if isinstance(paySlip, Document) else frappe.get_doc(paySlip)
+        doc.set_new_name()
+        doc.set_parent_in_children()
+
+        for d in [doc, *doc.get_all_children()]:
+            d.owner = d.modified_by = user
+            d.creation = d.modified = timestamp
+            rowsByDoctype[d.doctype].append(d.get_valid_dict(convert_dates_to_str=True))
+
+        for earning in doc.get("other_earnings"):
+            if earning.component_reference in EARNING_REFERENCES:
+                paidEarnings[earning.component_reference][
+                    earning.reference_name
+                ] = doc.name
+
+        registerRows.append(paySlipRegisterRow(doc))
+        names.append(doc.name)
+
+    for doctype, rows in rowsByDoctype.items():
+        fields = list(rows[0])
+        frappe.db.bulk_insert(
+            doctype, fields, [tuple(row.get(field) for field in fields) for row in rows]
+        )
+
+    for doctype, paySlipByReference in paidEarnings.items():
+        _markPaid(doctype, paySlipByReference)
+
+    writeRegisterRows(registerRows)
+
+    return names
+
+
+def _markPaid(doctype, paySlipByReference):
+    """
+    Set the status and Pay Slip of every linked document in one UPDATE.
+
+    `modified` is left alone: it is compared with the pay slip's
+    `generated_on` to detect changed inputs, and being paid is not one.
+    """
+    references = [name for name in paySlipByReference if name]
+    if not references:
+        return
+
+    cases = " ".join(["WHEN %s THEN %s"] * len(references))
+    values = [EARNING_REFERENCES[doctype]]
+    for name in references:
+        values.extend((name, paySlipByReference[name]))
+    values.append(tuple(references))
+
+    frappe.db.sql(
+        f"""
+            UPDATE `tab{doctype}`
+            SET
+                status = %s,
+                pay_slip = CASE name {cases} END
+            WHERE name IN %s
+        """,
+        values,
+    )
+
+
+def syncChildRows(doc, fieldname, rows, key):
+    """
+    Set the child table `fieldname` of `doc` to `rows`, matched on `key`.
+
+    Existing rows with the same `key` are updated in place and keep their
+    names; rows no longer present are dropped by the next save. Returns True
+    when any row was added, removed or changed.
+    """
+    existing = {row.get(key): row for row in doc.get(fieldname)}
+    changed = len(rows) != len(doc.get(fieldname))
+
+    children = []
+    for values in rows:
+        row = existing.pop(values.get(key), None)
+        if row is None:
+            changed = True
+            row = values
+        elif any(row.get(field) != value for field, value in values.items()):
+            changed = True
+            row.update(values)
+        children.append(row)
+
+    doc.set(fieldname, [])
+    for row in children:
+        doc.append(fieldname, row)
+    return changed or bool(existing)
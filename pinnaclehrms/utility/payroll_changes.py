@@ -0,0 +1,127 @@
+"""
+Change tracking for incremental pay slip regeneration.
+
+A Pay Slip records in `generated_on` when its inputs were read. An employee
+needs recomputing when any payroll input of the month was modified after
+that watermark. Deleted rows leave no `modified` behind and are not seen.
+"""
+
+import frappe
+import calendar
+from datetime import date
+from dateutil.relativedelta import relativedelta
+
+ATTENDANCE_CHANGES = """
+    SELECT employee, MAX(modified)
+    FROM `tabAttendance`
+    WHERE
+        employee IN %(employees)s
+        AND attendance_date >= %(month_start)s
+        AND attendance_date < %(next_month_start)s
+        AND modified > %(since)s
+    GROUP BY employee
+"""
+
+# Saving an Assign Salary updates its own modified with its Salary History
+SALARY_HISTORY_CHANGES = """
+    SELECT employee_id, MAX(modified)
+    FROM `tabAssign Salary`
+    WHERE
+        employee_id IN %(employees)s
+        AND modified > %(since)s
+    GROUP BY employee_id
+"""
+
+RECURRING_COMPONENT_CHANGES = """
+    SELECT employee, MAX(modified)
+    FROM `tabRecurring Salary Component`
+    WHERE
+        employee IN %(employees)s
+        AND due_date = %(due_date)s
+        AND modified > %(since)s
+    GROUP BY employee
+"""
+
+LEAVE_ENCASHMENT_CHANGES = """
+    SELECT employee, MAX(modified)
+    FROM `tabPinnacle Leave Encashment`
+    WHERE
+        employee IN %(employees)s
+        AND to_date >= %(month_start)s
+        AND to_date < %(next_month_start)s
+        AND modified > %(since)s
+    GROUP BY employee
+"""
+
+SHIFT_VARIATION_CHANGES = """
+    SELECT sv.company, sfe.employee, MAX(sv.modified)
+    FROM `tabShift Variation` AS sv
+    LEFT JOIN `tabShift for employee` AS sfe ON sv.name = sfe.parent
+    WHERE
+        sv.shift_date >= %(month_start)s
+        AND sv.shift_date < %(next_month_start)s
+        AND sv.modified > %(since)s
+    GROUP BY sv.company, sfe.employee
+"""
+
+
+def getChangedEmployees(employeeData, year, month, generatedOnByEmployee):
+    """
+    Return the employees of `employeeData` whose payroll inputs changed.
+
+    `generatedOnByEmployee` maps employees to the watermark of their Pay
+    Slip. Employees without a watermark are always returned. Each input
+    doctype is read in one grouped query from the oldest watermark on.
+    """
+    employees = list(employeeData)
+    changed = {emp_id for emp_id in employees if not generatedOnByEmployee.get(emp_id)}
+    tracked = [emp_id for emp_id in employees if emp_id not in changed]
+    if not tracked:
+        return changed
+    trackedSet = set(tracked)
+
+    year = int(year)
+    month = int(month)
+    monthStart = date(year, month, 1)
+    values = {
+        "employees": tuple(tracked),
+        "since": min(generatedOnByEmployee[emp_id] for emp_id in tracked),
+        "month_start": monthStart,
+        "next_month_start": monthStart + relativedelta(months=1),
+        "due_date": date(year, month, calendar.monthrange(year, month)[1]),
+    }
+
+    lastModified = {}
+
+    def collect(employee, modified):
+        if employee in trackedSet and modified:
+            lastModified[employee] = max(modified, lastModified.get(employee, modified))
+
+    for query in (
+        ATTENDANCE_CHANGES,
+        SALARY_HISTORY_CHANGES,
+        RECURRING_COMPONENT_CHANGES,
+        LEAVE_ENCASHMENT_CHANGES,
+    ):
+        for employee, modified in frappe.db.sql(query, values):
+            collect(employee, modified)
+
+    # Variations without employees apply to every employee of the company
+    companyEmployees = {}
+    for emp_id in tracked:
+        companyEmployees.setdefault(employeeData[emp_id].get("company"), []).append(
+            emp_id
+        )
+    for company, employee, modified in frappe.db.sql(SHIFT_VARIATION_CHANGES, values):
+        if employee:
+            collect(employee, modified)
+        else:
+            for emp_id in companyEmployees.get(company, []):
+                collect(emp_id, modified)
+
+    changed.update(
+        emp_id
+        for emp_id, modified in lastModified.items()
+        if modified > generatedOnByEmployee[emp_id]
+    )
+    return changed
@@ -0,0 +1,177 @@
+"""
+Database reads that feed `pinnaclehrms.utility.payroll_kernel`.
+"""
+
+import frappe
+import calendar
+from datetime import date
+from dateutil.relativedelta import relativedelta
+from pinnaclehrms.pinnacle_hr.helpers.shift_type_cache import get_shift_types
+from pinnaclehrms.utility.shift_variation_index import ShiftVariationIndex
+
+
+def loadPayrollInputs(employeeData, year, month):
+    """Return the keyword inputs of `payroll_kernel.calculateMonthlySalary`."""
+    year = int(year)
+    month = int(month)
+
+    return {
+        "shiftTypes": get_shift_types(),
+        "shiftVariations": loadShiftVariations(year, month),
+        "otherEarningsByEmployee": loadOtherEarnings(employeeData, year, month),
+    }
+
+
+def loadExistingPaySlips(employees, year, month):
+    """Return {employee: Pay Slip name} for the employees' slips of the month."""
+    employees = list(employees)
+    if not employees:
+        return {}
+
+    return {
+        paySlip.employee: paySlip.name
+        for paySlip in frappe.get_all(
+            "Pay Slips",
+            filters={
+                "employee": ["in", employees],
+                "month_num": int(month),
+                "year": year,
+            },
+            fields=["name", "employee"],
+        )
+    }
+
+
+def loadShiftVariations(year, month):
+    """Return the Shift Variations of every company for the month, indexed."""
+    monthStart = date(int(year), int(month), 1)
+    nextMonthStart = monthStart + relativedelta(months=1)
+
+    rows = frappe.db.sql(
+        """
+            SELECT
+                sv.company,
+                sv.shift_date,
+                sv.shift_start,
+                sv.shift_end,
+                sfe.employee
+            FROM
+                `tabShift Variation` AS sv
+            LEFT JOIN
+                `tabShift for employee` AS sfe ON sv.name = sfe.parent
+            WHERE
+                sv.shift_date >= %s
+                AND sv.shift_date < %s
+            ORDER BY
+                sv.shift_date, sv.creation
+        """,
+        (monthStart, nextMonthStart),
+        as_dict=True,
+    )
+    return ShiftVariationIndex(rows)
+
+
+def loadOtherEarnings(employees, year, month, paySlipByEmployee=None):
+    """
+    Return the other earnings of the month for each employee.
+
+    Loads the submitted Recurring Salary Components due on the last day of the
+    month and the latest Pinnacle Leave Encashment ending in the month for all
+    `employees` in two queries. Without `paySlipByEmployee` only components
+    still Due are returned. When regenerating, `paySlipByEmployee` maps
+    employees to their existing Pay Slip; components already linked to that
+    Pay Slip are returned together with the due ones not linked to any.
+    """
+    year = int(year)
+    month = int(month)
+    employees = list(employees)
+    otherEarningsByEmployee = {emp_id: {} for emp_id in employees}
+    if not employees:
+        return otherEarningsByEmployee
+
+    monthStart = date(year, month, 1)
+    nextMonthStart = monthStart + relativedelta(months=1)
+    dueDate = date(year, month, calendar.monthrange(year, month)[1])
+
+    if paySlipByEmployee is None:
+        condition = "rsc.due_date = %(due_date)s AND rsc.status = 'Due'"
+        linkedPaySlips = ("",)
+    else:
+        condition = """(
+                    rsc.pay_slip IN %(pay_slips)s
+                    OR (rsc.due_date = %(due_date)s AND IFNULL(rsc.pay_slip, '') = '')
+                )"""
+        linkedPaySlips = tuple(name for name in paySlipByEmployee.values() if name)
+        linkedPaySlips = linkedPaySlips or ("",)
+
+    components = frappe.db.sql(
+        f"""
+            SELECT
+                rsc.name,
+                rsc.employee,
+                rsc.component,
+                rsc.type,
+                rsc.amount,
+                rsc.pay_slip
+            FROM
+                `tabRecurring Salary Component` AS rsc
+            WHERE
+                rsc.docstatus = 1
+                AND rsc.employee IN %(employees)s
+                AND {condition}
+            ORDER BY
+                rsc.modified DESC
+        """,
+        {
+            "employees": tuple(employees),
+            "due_date": dueDate,
+            "pay_slips": linkedPaySlips,
+        },
+        as_dict=True,
+    )
+
+    for rsc in components:
+        if rsc.pay_slip and paySlipByEmployee is not None:
+            if rsc.pay_slip != paySlipByEmployee.get(rsc.employee):
+                continue
+        otherEarningsByEmployee[rsc.employee][rsc.component] = {
+            "type": rsc.type,
+            "amount": float(rsc.amount) if rsc.amount else 0.0,
+            "doc_no": rsc.name,
+        }
+
+    encashments = frappe.db.sql(
+        """
+            SELECT
+                name,
+                employee,
+                amount
+            FROM
+                `tabPinnacle Leave Encashment`
+            WHERE
+                employee IN %s
+                AND to_date >= %s
+                AND to_date < %s
+            ORDER BY
+                to_date DESC, creation DESC
+        """,
+        (tuple(employees), monthStart, nextMonthStart),
+        as_dict=True,
+    )
+
+    latestEncashment = {}
+    for encashment in encashments:
+        latestEncashment.setdefault(encashment.employee, encashment)
+
+    for emp_id, encashment in latestEncashment.items():
+        otherEarningsByEmployee[emp_id]["Leave Encashment"] = {
+            "type": "Earning",
+            "amount": float(encashment.get("amount", 0)),
+            "doc_no": encashment.get("name"),
+        }
+
+    return otherEarningsByEmployee
+
+
+def getOtherEarnings(empID, year, month):
+    return loadOtherEarnings([empID], year, month)[empID]
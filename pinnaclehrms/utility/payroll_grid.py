@@ -0,0 +1,466 @@
+"""
+Vectorised drop-in for `payroll_kernel.calculateMonthlySalary`.
+
+The month is laid out as employees x days arrays (check-in / check-out and
+ideal shift times as microseconds since midnight, holiday and Sunday masks),
+and deductions, day classifications, overtime and per-day salaries are
+evaluated with NumPy. Per-employee totals match the scalar kernel exactly:
+per-day salaries come from per-employee tables rounded with Python's `round`,
+and running totals are accumulated day by day with `cumsum`, in the order of
+the scalar day loop.
+
+NumPy is optional; select this engine with `"payroll_engine": "numpy"` in the
+site config.
+"""
+
+import numpy as np
+from datetime import date, time, timedelta
+from pinnaclehrms.utility.deduction_slabs import (
+    CHECK_IN_SLABS,
+    CHECK_OUT_SLABS,
+    getSlabTable,
+)
+from pinnaclehrms.utility.payroll_kernel import (
+    getAttendance,
+    getEmployeeHolidays,
+    getShiftDetails,
+)
+
+MICROSECOND = timedelta(microseconds=1)
+
+# Longest working time, in microseconds, that still rounds to 3.0 hours
+MIN_WORKING_TIME = 10818 * 10**6
+OVERTIME_THRESHOLD = (19 * 3600 + 30 * 60) * 10**6
+
+# Deduction of slab code k is RATES[k]; code 0 means no slab applies
+CHECK_IN_RATES = [0.0] + [rate for _, rate in CHECK_IN_SLABS]
+CHECK_OUT_RATES = [0.0] + [rate for _, rate in CHECK_OUT_SLABS]
+
+# Day classifications
+NO_ENTRY = 0
+ABSENT = 1
+SUNDAY = 2
+FULL_DAY = 3
+LATE = 4
+LATE_AS_FULL_DAY = 5
+THREE_FOUR = 6
+HALF_DAY = 7
+OTHERS = 8
+
+STATUS = {
+    SUNDAY: "Sunday",
+    FULL_DAY: "Full Day",
+    LATE: "Late",
+    LATE_AS_FULL_DAY: "Full Day",
+    THREE_FOUR: "3/4",
+    HALF_DAY: "Half Day",
+    OTHERS: "Others",
+}
+
+
+class AttendanceGrid:
+    """Attendance of a month as employees x days arrays."""
+
+    def __init__(self, employeeData, year, month, shiftTypes, shiftVariations):
+        self.employees = list(employeeData)
+        self.totalWorkingDays = [
+            employeeData[emp_id].get("total_working_days") for emp_id in self.employees
+        ]
+        self.days = max(self.totalWorkingDays)
+
+        # Ideal times and sorted slab boundaries of every shift, in microseconds
+        self.shifts = {}
+        self.shiftCheckIns = []
+        self.shiftCheckOuts = []
+        self.checkInBounds = []
+        self.checkOutBounds = []
+
+        # Flat (row * days + column) indices and values of the checked days
+        self.checkedDays = []
+        self.checkInTimes = []
+        self.checkOutTimes = []
+        self.checkedShifts = []
+        self.holidayDays = []
+
+        self.holidays = []
+        self.records = []
+
+        for row, emp_id in enumerate(self.employees):
+            self._addEmployee(
+                row,
+                emp_id,
+                employeeData[emp_id],
+                year,
+                month,
+                shiftTypes,
+                shiftVariations,
+            )
+
+        if not self.shifts:
+            self.shiftCheckIns.append(0)
+            self.shiftCheckOuts.append(0)
+            self.checkInBounds.append([0] * len(CHECK_IN_RATES))
+            self.checkOutBounds.append([0] * len(CHECK_OUT_RATES))
+
+        shape = (len(self.employees), self.days)
+        columns = np.arange(self.days)
+
+        self.isSunday = np.array(
+            [date(year, month, day).weekday() == 6 for day in range(1, self.days + 1)]
+        )
+        self.inMonth = columns < np.array(self.totalWorkingDays)[:, None]
+        self.isHoliday = _fill(shape, self.holidayDays, True, bool)
+        self.isChecked = _fill(shape, self.checkedDays, True, bool)
+        self.checkIn = _fill(shape, self.checkedDays, self.checkInTimes, np.int64)
+        self.checkOut = _fill(shape, self.checkedDays, self.checkOutTimes, np.int64)
+        self.shiftIds = _fill(shape, self.checkedDays, self.checkedShifts, np.int64)
+        self.idealCheckIn = np.array(self.shiftCheckIns, dtype=np.int64)[self.shiftIds]
+        self.idealCheckOut = np.array(self.shiftCheckOuts, dtype=np.int64)[
+            self.shiftIds
+        ]
+
+    def _addEmployee(self, row, emp_id, data, year, month, shiftTypes, shiftVariations):
+        company = data.get("company")
+        holidays = getEmployeeHolidays(data, month)
+        holidayDates = {holiday.get("holiday_date") for holiday in holidays}
+
+        attendanceByDate = {}
+        for record in data.get("attendance_records", []):
+            attendanceByDate.setdefault(record["attendance_date"], record)
+
+        records = {}
+        offset = row * self.days
+        for day in range(1, self.totalWorkingDays[row] + 1):
+            today = date(year, month, day)
+            column = day - 1
+
+            if today in holidayDates:
+                self.holidayDays.append(offset + column)
+
+            record = attendanceByDate.get(today)
+            if not record:
+                continue
+            records[column] = record
+
+            attendanceDate = record["attendance_date"]
+            inTime = record["in_time"]
+            outTime = record["out_time"]
+
+            shiftId = self._getShift(attendanceDate, record, shiftTypes)
+
+            if not (
+                inTime
+                and outTime
+                and (inTime != "00:00:00" and outTime != "00:00:00")
+                and (outTime > inTime)
+            ):
+                continue
+
+            shiftVariation = shiftVariations.get(company, attendanceDate, emp_id)
+            if shiftVariation:
+                attendance = getAttendance(
+                    emp_id,
+                    shiftVariation,
+                    attendanceDate,
+                    record,
+                    getShiftDetails(attendanceDate, record, shiftTypes),
+                )
+                inTime = attendance.get("in_time")
+                outTime = attendance.get("out_time")
+
+            self.checkedDays.append(offset + column)
+            self.checkInTimes.append(_timeOfDay(inTime.time()))
+            self.checkOutTimes.append(_timeOfDay(outTime.time()))
+            self.checkedShifts.append(shiftId)
+
+        self.holidays.append(holidays)
+        self.records.append(records)
+
+    def _getShift(self, attendanceDate, record, shiftTypes):
+        shift = record.get("shift")
+        if shift not in self.shifts:
+            # Raises for missing shifts exactly like the scalar kernel
+            shiftDetails = getShiftDetails(attendanceDate, record, shiftTypes)
+            idealCheckIn = shiftDetails.get("idealCheckInTime")
+            idealCheckOut = shiftDetails.get("idealCheckOutTime")
+            midnight = idealCheckIn.replace(hour=0, minute=0, second=0, microsecond=0)
+
+            slabTable = getSlabTable(
+                (idealCheckOut - idealCheckIn).total_seconds() / 60
+            )
+            self.shifts[shift] = len(self.shifts)
+            self.shiftCheckIns.append((idealCheckIn - midnight) // MICROSECOND)
+            self.shiftCheckOuts.append((idealCheckOut - midnight) // MICROSECOND)
+            self.checkInBounds.append(
+                [bound // MICROSECOND for bound in slabTable.checkInBounds]
+            )
+            self.checkOutBounds.append(
+                [bound // MICROSECOND for bound in slabTable.checkOutBounds]
+            )
+        return self.shifts[shift]
+
+    def getSlabCodes(self):
+        """Return the check-in and check-out slab code of every day."""
+        checkInBounds = np.array(self.checkInBounds, dtype=np.int64)[self.shiftIds]
+        checkOutBounds = np.array(self.checkOutBounds, dtype=np.int64)[self.shiftIds]
+
+        # Same as bisect_left / bisect_right in SlabTable
+        lateBy = (self.checkIn - self.idealCheckIn)[..., None]
+        checkInCodes = (checkInBounds < lateBy).sum(axis=-1)
+        checkInCodes[checkInCodes == len(CHECK_IN_RATES)] = 0
+
+        leftBy = (self.checkOut - self.idealCheckOut)[..., None]
+        checkOutCodes = (checkOutBounds <= leftBy).sum(axis=-1)
+        checkOutCodes[checkOutCodes == len(CHECK_OUT_RATES)] = 0
+
+        checkInCodes[~self.isChecked] = 0
+        checkOutCodes[~self.isChecked] = 0
+        return checkInCodes, checkOutCodes
+
+
+def calculateMonthlySalary(
+    employeeData, year, month, shiftTypes, shiftVariations, otherEarningsByEmployee
+):
+    """Same contract as `payroll_kernel.calculateMonthlySalary`."""
+    month = int(month)
+    year = int(year)
+
+    if not employeeData:
+        return employeeData
+
+    grid = AttendanceGrid(employeeData, year, month, shiftTypes, shiftVariations)
+    employees = grid.employees
+
+    basicSalaries = [
+        round(employeeData[emp_id].get("basic_salary", 0), 2) for emp_id in employees
+    ]
+    perDaySalaries = [
+        round(basicSalary / totalWorkingDays, 2)
+        for basicSalary, totalWorkingDays in zip(basicSalaries, grid.totalWorkingDays)
+    ]
+    allowedLates = np.array(
+        [employeeData[emp_id].get("lates") for emp_id in employees], dtype=np.int64
+    )[:, None]
+    isOvertime = np.array(
+        [bool(employeeData[emp_id].get("is_overtime")) for emp_id in employees]
+    )[:, None]
+
+    # Deductions
+    checkInCodes, checkOutCodes = grid.getSlabCodes()
+    deductions = (
+        np.array(CHECK_IN_RATES)[checkInCodes]
+        + np.array(CHECK_OUT_RATES)[checkOutCodes]
+    )
+
+    # Per-day salary of each (check-in, check-out) slab pair, per employee
+    salaryTable = np.array(
+        [
+            [
+                [
+                    round(perDaySalary * (1 - (checkInRate + checkOutRate)), 2)
+                    for checkOutRate in CHECK_OUT_RATES
+                ]
+                for checkInRate in CHECK_IN_RATES
+            ]
+            for perDaySalary in perDaySalaries
+        ]
+    )
+    rows = np.arange(len(employees))[:, None]
+    salaries = salaryTable[rows, checkInCodes, checkOutCodes]
+
+    # Day classification
+    present = grid.isChecked & (grid.checkOut - grid.checkIn > MIN_WORKING_TIME)
+    weekdays = present & ~grid.isSunday
+    isFull = deductions == 0
+    isLate = deductions == 0.1
+    isThreeFour = deductions == 0.25
+    isHalf = deductions == 0.5
+
+    lateDays = weekdays & isLate
+    lateRank = np.cumsum(lateDays, axis=1)
+    lateAsFullDays = lateDays & np.where(
+        allowedLates > 0, lateRank <= allowedLates, allowedLates < 0
+    )
+
+    classes = np.full(present.shape, NO_ENTRY, dtype=np.int8)
+    classes[grid.inMonth & ~grid.isHoliday & ~present] = ABSENT
+    classes[present & grid.isSunday] = SUNDAY
+    classes[weekdays & isFull] = FULL_DAY
+    classes[lateDays & ~lateAsFullDays] = LATE
+    classes[lateAsFullDays] = LATE_AS_FULL_DAY
+    classes[weekdays & isThreeFour] = THREE_FOUR
+    classes[weekdays & isHalf] = HALF_DAY
+    classes[weekdays & ~(isFull | isLate | isThreeFour | isHalf)] = OTHERS
+
+    # Running totals, summed day by day as in the scalar loop
+    roundedPerDaySalaries = np.array(
+        [round(perDaySalary, 2) for perDaySalary in perDaySalaries]
+    )[:, None]
+    paidSalaries = np.where(
+        np.isin(classes, (FULL_DAY, LATE, THREE_FOUR, HALF_DAY)), salaries, 0.0
+    )
+    paidSalaries = np.where(
+        classes == LATE_AS_FULL_DAY, roundedPerDaySalaries, paidSalaries
+    )
+    totalSalaries = np.cumsum(paidSalaries, axis=1)[:, -1].tolist()
+    sundaysSalaries = np.cumsum(np.where(classes == SUNDAY, salaries, 0.0), axis=1)[
+        :, -1
+    ].tolist()
+    othersDaySalaries = np.cumsum(np.where(classes == OTHERS, salaries, 0.0), axis=1)[
+        :, -1
+    ].tolist()
+
+    # Overtime of the last day checked out after the threshold
+    overtimeDays = present & isOvertime & (grid.checkOut > OVERTIME_THRESHOLD)
+    hasOvertime = overtimeDays.any(axis=1).tolist()
+    lastOvertimeDays = (
+        overtimeDays.shape[1] - 1 - np.argmax(overtimeDays[:, ::-1], axis=1)
+    ).tolist()
+    overtimes = (grid.checkOut - grid.idealCheckOut).tolist()
+
+    counts = {
+        dayClass: np.count_nonzero(classes == dayClass, axis=1).tolist()
+        for dayClass in (
+            ABSENT,
+            SUNDAY,
+            FULL_DAY,
+            LATE,
+            LATE_AS_FULL_DAY,
+            THREE_FOUR,
+            HALF_DAY,
+            OTHERS,
+        )
+    }
+    actualWorkingDays = np.count_nonzero(present, axis=1).tolist()
+
+    classes = classes.tolist()
+    deductions = deductions.tolist()
+    salaries = salaries.tolist()
+
+    for row, emp_id in enumerate(employees):
+        data = employeeData[emp_id]
+        perDaySalary = perDaySalaries[row]
+        holidays = grid.holidays[row]
+
+        overtimeSalary = 0.0
+        if hasOvertime[row]:
+            overtime = (overtimes[row][lastOvertimeDays[row]] / 10**6) / 60
+            overtimeSalary = overtime * (perDaySalary / 540)
+
+        othersDay = counts[OTHERS][row]
+        othersDaySalary = othersDaySalaries[row] if othersDay else 0
+        sundaysSalary = sundaysSalaries[row]
+        totalSalary = totalSalaries[row]
+        holidayAmount = perDaySalary * len(holidays)
+
+        if actualWorkingDays[row] > 0:
+            totalSalary += (
+                overtimeSalary + holidayAmount + sundaysSalary + othersDaySalary
+            )
+            otherEarnings = otherEarningsByEmployee.get(emp_id, {})
+
+            for earning in otherEarnings:
+                earning = otherEarnings.get(earning)
+                if earning.get("type") == "Earning":
+                    totalSalary += earning.get("amount")
+                else:
+                    totalSalary -= earning.get("amount")
+        else:
+            holidayAmount = 0
+            otherEarnings = {}
+            totalSalary += overtimeSalary
+
+        data["attendance_records"] = _getAttendanceRecords(
+            year,
+            month,
+            grid.records[row],
+            classes[row],
+            deductions[row],
+            salaries[row],
+            round(perDaySalary, 2),
+        )
+
+        data["salary_information"] = {
+            "basic_salary": basicSalaries[row],
+            "per_day_salary": perDaySalary,
+            "standard_working_days": grid.totalWorkingDays[row],
+            "actual_working_days": actualWorkingDays[row],
+            "full_days": counts[FULL_DAY][row]
+            + counts[LATE_AS_FULL_DAY][row]
+            + len(holidays),
+            "half_days": counts[HALF_DAY][row],
+            "quarter_days": 0,
+            "three_four_quarter_days": counts[THREE_FOUR][row],
+            "sundays_working_days": counts[SUNDAY][row],
+            "early_checkout_days": 0,
+            "others_day": othersDay,
+            "others_day_salary": othersDaySalary,
+            "sundays_salary": sundaysSalary,
+            "total_salary": round(totalSalary, 2),
+            "total_late_deductions": 0.0,
+            "absent": counts[ABSENT][row],
+            "lates": counts[LATE][row],
+            "overtime": round((overtimeSalary), 2),
+            "holidays": holidayAmount,
+            "other_earnings": otherEarnings,
+        }
+
+    return employeeData
+
+
+def _getAttendanceRecords(
+    year, month, records, classes, deductions, salaries, roundedPerDaySalary
+):
+    attendanceRecords = []
+
+    for column, dayClass in enumerate(classes):
+        if dayClass == NO_ENTRY:
+            continue
+
+        record = records.get(column)
+        if not record:
+            attendanceRecords.append(
+                {
+                    "date": date(year, month, column + 1),
+                    "deductionPercentage": 1,
+                    "salary": 0,
+                    "status": "Absent",
+                    "check_in": time(0, 0, 0),
+                    "check_out": time(0, 0, 0),
+                }
+            )
+            continue
+
+        inTime = record["in_time"]
+        outTime = record["out_time"]
+        attendanceRecord = {
+            "date": record["attendance_date"],
+            "deductionPercentage": deductions[column],
+            "salary": salaries[column],
+            "status": STATUS.get(dayClass),
+            "check_in": inTime.time() if inTime else inTime,
+            "check_out": outTime.time() if outTime else outTime,
+        }
+        if dayClass == ABSENT:
+            attendanceRecord.update(
+                {"deductionPercentage": 1, "salary": 0, "status": "Absent"}
+            )
+        elif dayClass == LATE_AS_FULL_DAY:
+            attendanceRecord.update(
+                {"deductionPercentage": 0.0, "salary": roundedPerDaySalary}
+            )
+        attendanceRecords.append(attendanceRecord)
+
+    return attendanceRecords
+
+
+def _fill(shape, indices, values, dtype):
+    array = np.zeros(shape[0] * shape[1], dtype=dtype)
+    array[np.array(indices, dtype=np.int64)] = values
+    return array.reshape(shape)
+
+
+def _timeOfDay(value):
+    return (
+        value.hour * 3600 + value.minute * 60 + value.second
+    ) * 10**6 + value.microsecond
@@ -0,0 +1,671 @@
+"""
+Monthly salary calculation for Pay Slips.
+
+Nothing in this module reads from or writes to the database, so it can run in
+worker processes and offline benchmarks. The inputs are loaded by
+`pinnaclehrms.utility.payroll_data`.
+"""
+
+from datetime import datetime, time, timedelta
+from pinnaclehrms.utility.deduction_slabs import calculateDeduction
+
+
+def calculateShiftTimes(attendanceDate, shiftStart, shiftEnd):
+    # Extract hours and minutes from shift start and end
+    if isinstance(shiftStart, datetime) or isinstance(shiftEnd, datetime):
+        # Convert to time object
+        if isinstance(shiftStart, datetime):
+            shiftStart = shiftStart.time()
+        if isinstance(shiftEnd, datetime):
+            shiftEnd = shiftEnd.time()
+
+        # Now convert time to timedelta
+        shiftStart = timedelta(
+            hours=shiftStart.hour, minutes=shiftStart.minute, seconds=shiftStart.second
+        )
+        shiftEnd = timedelta(
+            hours=shiftEnd.hour, minutes=shiftEnd.minute, seconds=shiftEnd.second
+        )
+    startHours, remainder = divmod(shiftStart.seconds, 3600)
+    startMinutes, _ = divmod(remainder, 60)
+    endHours, remainder = divmod(shiftEnd.seconds, 3600)
+    endMinutes, _ = divmod(remainder, 60)
+
+    # Calculate ideal check-in/out times
+    idealCheckInTime = datetime.combine(attendanceDate, time(startHours, startMinutes))
+    idealCheckOutTime = datetime.combine(attendanceDate, time(endHours, endMinutes))
+
+    # Define overtime threshold (example: 7:30 PM)
+    overtimeThreshold = datetime.combine(attendanceDate, time(19, 30))
+
+    # Calculate ideal working hours
+    idealWorkingTime = idealCheckOutTime - idealCheckInTime
+    idealWorkingHours = idealWorkingTime.total_seconds() / 3600
+
+    return {
+        "idealCheckInTime": idealCheckInTime,
+        "idealCheckOutTime": idealCheckOutTime,
+        "overtimeThreshold": overtimeThreshold,
+        "idealWorkingHours": idealWorkingHours,
+    }
+
+
+def calculateFinalAmount(perDaySalary, deductionPercentage):
+
+    return round(perDaySalary * (1 - deductionPercentage), 2)
+
+
+def calculateMonthlySalary(
+    employeeData, year, month, shiftTypes, shiftVariations, otherEarningsByEmployee
+):
+    """
+    Calculate `salary_information` and the day-wise attendance record of each
+    employee from plain inputs, without touching the database.
+
+    `shiftTypes` maps Shift Type names to their `start_time` / `end_time`,
+    `shiftVariations` is a `ShiftVariationIndex` of the month and
+    `otherEarningsByEmployee` maps employees to their other earnings.
+    """
+
+    month = int(month)
+    year = int(year)
+
+    if month >= 4:
+        # Financial year starts in the current year and ends in the next year
+        startYear = year
+        endYear = year + 1
+    else:
+        # Financial year starts in the previous year and ends in the current year
+        startYear = year - 1
+        endYear = year
+
+    # Define start and end dates of the financial year
+    startDate = datetime(startYear, 4, 1)
+    endDate = datetime(endYear, 3, 31)
+
+    for emp_id, data in employeeData.items():
+        totalSalary = 0.0
+        totalLateDeductions = 0.0
+        fullDays = 0
+        halfDays = 0
+        quarterDays = 0
+        threeFourQuarterDays = 0
+        totalAbsents = 0
+        lates = 0
+        sundays = 0
+        othersDay = 0
+        othersDaySalary = 0
+        sundaysSalary = 0.0
+        overtimeSalary = 0.0
+        actualWorkingDays = 0
+        earlyCheckOutDays = 0
+        holidayAmount = 0
+        empAttendance = {
+            "date": None,
+            "deductionPercentage": None,
+            "salary": None,
+            "status": None,
+        }
+        empAttendanceRecord = []
+
+        basicSalary = round(data.get("basic_salary", 0), 2)
+        attendanceRecords = data.get("attendance_records", [])
+        isOvertime = data.get("is_overtime")
+        autoCalculateLeaveEncashment = data.get("auto_calculate_leave_encashment")
+        allowedLates = data.get("lates")
+        totalWorkingDays = data.get("total_working_days")
+        company = data.get("company")
+
+        holidays = getEmployeeHolidays(data, month)
+
+        # frappe.throw(str(holidays))
+        perDaySalary = round(basicSalary / totalWorkingDays, 2)
+        holidayAmount = perDaySalary * len(holidays)
+
+        # Index the month by date so each day is a single lookup
+        holidayDates = {holiday.get("holiday_date") for holiday in holidays}
+        attendanceByDate = {}
+        for record in attendanceRecords:
+            attendanceByDate.setdefault(record["attendance_date"], record)
+
+        # for holidayDate in holidays:
+        #     holiday = holidayDate["holiday_date"]
+
+        #     dayBeforeHoliday = holiday - timedelta(days=1)
+        #     dayAfterHoliday = holiday + timedelta(days=1)
+
+        #     # Check if attendance exists before and after the holiday
+        #     attendanceBefore = any(
+        #         attendanceRecord["attendance_date"] == dayBeforeHoliday for attendanceRecord in attendanceRecords
+        #     )
+        #     attendanceAfter = any(
+        #         attendanceRecord["attendance_date"] == dayAfterHoliday for attendanceRecord in attendanceRecords
+        #     )
+
+        #     # Check if the days before and after are also holidays
+        #     isHolidayBefore = any(
+        #         h["holiday_date"] == dayBeforeHoliday for h in holidays
+        #     )
+        #     isHolidayAfter = any(
+        #         h["holiday_date"] == dayAfterHoliday for h in holidays
+        #     )
+
+        #     # Credit holiday amount if conditions are met
+        #     if attendanceBefore or attendanceAfter or (isHolidayBefore and isHolidayAfter):
+        #         holidayAmount += perDaySalary
+        #         print(holidayDate)
+        #         print(holidayAmount)
+
+        for day in range(1, totalWorkingDays + 1):
+            today = datetime(year, month, day).date()
+
+            attendanceRecord = attendanceByDate.get(today)
+
+            attendanceDate = today
+            salary = 0
+
+            perDaySalary = round(basicSalary / totalWorkingDays, 2)
+
+            if attendanceRecord:
+                attendanceDate = attendanceRecord["attendance_date"]
+                inTime = attendanceRecord["in_time"]
+                outTime = attendanceRecord["out_time"]
+
+                shiftDetails = getShiftDetails(
+                    attendanceDate, attendanceRecord, shiftTypes
+                )
+
+                idealCheckInTime = shiftDetails.get("idealCheckInTime")
+                idealCheckOutTime = shiftDetails.get("idealCheckOutTime")
+                overtimeThreshold = shiftDetails.get("overtimeThreshold")
+
+                if (
+                    inTime
+                    and outTime
+                    and (inTime != "00:00:00" and outTime != "00:00:00")
+                    and (outTime > inTime)
+                ):
+
+                    actCheckIn = inTime
+                    actCheckOut = outTime
+                    attendance = getAttendance(
+                        emp_id,
+                        shiftVariations.get(company, attendanceDate, emp_id),
+                        attendanceDate,
+                        attendanceRecord,
+                        shiftDetails,
+                    )
+
+                    inTime = attendance.get("in_time")
+                    outTime = attendance.get("out_time")
+
+                    checkIn = datetime.combine(attendanceDate, inTime.time())
+                    checkOut = datetime.combine(attendanceDate, outTime.time())
+                    status = ""
+
+                    totalWorkingTime = checkOut - checkIn
+                    totalWorkingHours = round(
+                        (totalWorkingTime.total_seconds() / 3600), 2
+                    )
+
+                    if totalWorkingHours > 3:
+
+                        deductionPercentage = calculateDeduction(
+                            checkIn, checkOut, idealCheckInTime, idealCheckOutTime
+                        )
+                        salary = calculateFinalAmount(
+                            perDaySalary, deductionPercentage
+                        )  # call getBasicSaly inside this
+
+                        # if checkIn > idealCheckInTime and (
+                        #     deductionPercentage == 0.1 or deductionPercentage == 0.2
+                        # ):
+                        #     if lates < allowedLates:
+                        #         totalSalary += perDaySalary * 0.1
+
+                        # overtime salary calculation if marked is eligible
+                        if isOvertime and checkOut > overtimeThreshold:
+                            extraTime = checkOut - idealCheckOutTime
+                            overtime = extraTime.total_seconds() / 60
+                            minOvertimeSalary = perDaySalary / 540
+                            overtimeSalary = overtime * minOvertimeSalary
+
+                        if deductionPercentage == 0:
+                            if attendanceDate.weekday() == 6:
+                                sundays += 1
+                                actualWorkingDays += 1
+                                status = "Sunday"
+                                sundaysSalary += salary
+                                empAttendanceRecord.append(
+                                    {
+                                        "date": attendanceDate,
+                                        "deductionPercentage": deductionPercentage,
+                                        "salary": round(salary, 2),
+                                        "status": status,
+                                        "check_in": actCheckIn.time(),
+                                        "check_out": actCheckOut.time(),
+                                    }
+                                )
+                            else:
+                                fullDays += 1
+                                actualWorkingDays += 1
+                                status = "Full Day"
+                                empAttendanceRecord.append(
+                                    {
+                                        "date": attendanceDate,
+                                        "deductionPercentage": deductionPercentage,
+                                        "salary": round(salary, 2),
+                                        "status": status,
+                                        "check_in": actCheckIn.time(),
+                                        "check_out": actCheckOut.time(),
+                                    }
+                                )
+                                totalSalary += salary
+                        elif deductionPercentage == 0.1:
+                            if attendanceDate.weekday() == 6:
+                                sundays += 1
+                                actualWorkingDays += 1
+                                status = "Sunday"
+                                sundaysSalary += salary
+                                empAttendanceRecord.append(
+                                    {
+                                        "date": attendanceDate,
+                                        "deductionPercentage": deductionPercentage,
+                                        "salary": round(salary, 2),
+                                        "status": status,
+                                        "check_in": actCheckIn.time(),
+                                        "check_out": actCheckOut.time(),
+                                    }
+                                )
+                            else:
+                                if allowedLates == 0:
+                                    lates += 1
+                                    actualWorkingDays += 1
+                                    status = "Late"
+                                    empAttendanceRecord.append(
+                                        {
+                                            "date": attendanceDate,
+                                            "deductionPercentage": deductionPercentage,
+                                            "salary": round(salary, 2),
+                                            "status": status,
+                                            "check_in": actCheckIn.time(),
+                                            "check_out": actCheckOut.time(),
+                                        }
+                                    )
+                                    totalSalary += salary
+                                elif (
+                                    checkOut < idealCheckOutTime
+                                    and (
+                                        checkIn < idealCheckInTime
+                                        or checkIn == idealCheckInTime
+                                    )
+                                    and allowedLates == 0
+                                ):
+                                    actualWorkingDays += 1
+                                    lates += 1
+                                    status = "Early Check Out"
+                                    empAttendanceRecord.append(
+                                        {
+                                            "date": attendanceDate,
+                                            "deductionPercentage": deductionPercentage,
+                                            "salary": round(salary, 2),
+                                            "status": status,
+                                            "check_in": actCheckIn.time(),
+                                            "check_out": actCheckOut.time(),
+                                        }
+                                    )
+                                    totalSalary += salary
+                                else:
+                                    allowedLates -= 1
+
+                                    totalSalary += round(perDaySalary, 2)
+                                    actualWorkingDays += 1
+                                    fullDays += 1
+                                    status = "Full Day"
+                                    empAttendanceRecord.append(
+                                        {
+                                            "date": attendanceDate,
+                                            "deductionPercentage": 0.0,
+                                            "salary": round(perDaySalary, 2),
+                                            "status": status,
+                                            "check_in": actCheckIn.time(),
+                                            "check_out": actCheckOut.time(),
+                                        }
+                                    )
+                        elif deductionPercentage == 0.25:
+                            if attendanceDate.weekday() == 6:
+                                sundays += 1
+                                actualWorkingDays += 1
+                                status = "Sunday"
+                                sundaysSalary += salary
+                                empAttendanceRecord.append(
+                                    {
+                                        "date": attendanceDate,
+                                        "deductionPercentage": deductionPercentage,
+                                        "salary": round(salary, 2),
+                                        "status": status,
+                                        "check_in": actCheckIn.time(),
+                                        "check_out": actCheckOut.time(),
+                                    }
+                                )
+                            else:
+                                threeFourQuarterDays += 1
+                                actualWorkingDays += 1
+                                status = "3/4"
+                                empAttendanceRecord.append(
+                                    {
+                                        "date": attendanceDate,
+                                        "deductionPercentage": deductionPercentage,
+                                        "salary": round(salary, 2),
+                                        "status": status,
+                                        "check_in": actCheckIn.time(),
+                                        "check_out": actCheckOut.time(),
+                                    }
+                                )
+                                totalSalary += salary
+                        elif deductionPercentage == 0.5:
+                            if attendanceDate.weekday() == 6:
+                                sundays += 1
+                                actualWorkingDays += 1
+                                status = "Sunday"
+                                sundaysSalary += salary
+                                empAttendanceRecord.append(
+                                    {
+                                        "date": attendanceDate,
+                                        "deductionPercentage": deductionPercentage,
+                                        "salary": round(salary, 2),
+                                        "status": status,
+                                        "check_in": actCheckIn.time(),
+                                        "check_out": actCheckOut.time(),
+                                    }
+                                )
+                            else:
+                                halfDays += 1
+                                actualWorkingDays += 1
+                                status = "Half Day"
+                                empAttendanceRecord.append(
+                                    {
+                                        "date": attendanceDate,
+                                        "deductionPercentage": deductionPercentage,
+                                        "salary": round(salary, 2),
+                                        "status": status,
+                                        "check_in": actCheckIn.time(),
+                                        "check_out": actCheckOut.time(),
+                                    }
+                                )
+                                totalSalary += salary
+                        elif deductionPercentage == 0.25:
+                            if attendanceDate.weekday() == 6:
+                                sundays += 1
+                                actualWorkingDays += 1
+                                status = "Sunday"
+                                sundaysSalary += salary
+                                empAttendanceRecord.append(
+                                    {
+                                        "date": attendanceDate,
+                                        "deductionPercentage": deductionPercentage,
+                                        "salary": round(salary, 2),
+                                        "status": status,
+                                        "check_in": actCheckIn.time(),
+                                        "check_out": actCheckOut.time(),
+                                    }
+                                )
+                            else:
+                                quarterDays += 1
+                                actualWorkingDays += 1
+                                status = "Quarter"
+                                empAttendanceRecord.append(
+                                    {
+                                        "date": attendanceDate,
+                                        "deductionPercentage": deductionPercentage,
+                                        "salary": round(salary, 2),
+                                        "status": status,
+                                        "check_in": actCheckIn.time(),
+                                        "check_out": actCheckOut.time(),
+                                    }
+                                )
+                                totalSalary += salary
+                        else:
+                            if attendanceDate.weekday() == 6:
+                                sundays += 1
+                                actualWorkingDays += 1
+                                status = "Sunday"
+                                sundaysSalary += salary
+                                empAttendanceRecord.append(
+                                    {
+                                        "date": attendanceDate,
+                                        "deductionPercentage": deductionPercentage,
+                                        "salary": round(salary, 2),
+                                        "status": status,
+                                        "check_in": actCheckIn.time(),
+                                        "check_out": actCheckOut.time(),
+                                    }
+                                )
+                            else:
+                                othersDay += 1
+                                actualWorkingDays += 1
+                                status = "Others"
+                                empAttendanceRecord.append(
+                                    {
+                                        "date": attendanceDate,
+                                        "deductionPercentage": deductionPercentage,
+                                        "salary": round(salary, 2),
+                                        "status": status,
+                                        "check_in": actCheckIn.time(),
+                                        "check_out": actCheckOut.time(),
+                                    }
+                                )
+                                othersDaySalary += salary
+                    else:
+                        deductionPercentage = 1
+                        if today in holidayDates:
+                            pass
+                        else:
+                            totalAbsents += 1
+                            status = "Absent"
+                            empAttendanceRecord.append(
+                                {
+                                    "date": attendanceDate,
+                                    "deductionPercentage": 1,
+                                    "salary": round(salary, 2),
+                                    "status": status,
+                                    "check_in": actCheckIn.time(),
+                                    "check_out": actCheckOut.time(),
+                                }
+                            )
+                    # print(today, deductionPercentage, salary, status,totalSalary)
+                else:
+                    if today in holidayDates:
+                        pass
+                    else:
+                        if inTime:
+                            inTime = inTime.time()
+                        if outTime:
+                            outTime = outTime.time()
+                        totalAbsents += 1
+                        status = "Absent"
+                        empAttendanceRecord.append(
+                            {
+                                "date": attendanceDate,
+                                "deductionPercentage": 1,
+                                "salary": round(salary, 2),
+                                "status": status,
+                                "check_in": inTime,
+                                "check_out": outTime,
+                            }
+                        )
+            else:
+                if today in holidayDates:
+                    pass
+                else:
+                    checkIn = time(0, 0, 0)
+                    checkOut = time(0, 0, 0)
+                    totalAbsents += 1
+                    status = "Absent"
+                    empAttendanceRecord.append(
+                        {
+                            "date": attendanceDate,
+                            "deductionPercentage": 1,
+                            "salary": round(salary, 2),
+                            "status": status,
+                            "check_in": checkIn,
+                            "check_out": checkOut,
+                        }
+                    )
+
+        if actualWorkingDays > 0:
+            totalSalary += (
+                overtimeSalary + holidayAmount + sundaysSalary + othersDaySalary
+            )
+            otherEarnings = otherEarningsByEmployee.get(emp_id, {})
+
+            for earning in otherEarnings:
+                earning = otherEarnings.get(earning)
+                if earning.get("type") == "Earning":
+                    totalSalary += earning.get("amount")
+                else:
+                    totalSalary -= earning.get("amount")
+            pass
+        else:
+            holidayAmount = 0
+            otherEarnings = {}
+            totalSalary += overtimeSalary
+
+        data["attendance_records"] = empAttendanceRecord
+
+        data["salary_information"] = {
+            "basic_salary": basicSalary,
+            "per_day_salary": perDaySalary,
+            "standard_working_days": totalWorkingDays,
+            "actual_working_days": actualWorkingDays,
+            "full_days": fullDays + len(holidays),
+            "half_days": halfDays,
+            "quarter_days": quarterDays,
+            "three_four_quarter_days": threeFourQuarterDays,
+            "sundays_working_days": sundays,
+            "early_checkout_days": earlyCheckOutDays,
+            "others_day": othersDay,
+            "others_day_salary": othersDaySalary,
+            "sundays_salary": sundaysSalary,
+            "total_salary": round(totalSalary, 2),
+            "total_late_deductions": totalLateDeductions,
+            "absent": totalAbsents,
+            "lates": lates,
+            "overtime": round((overtimeSalary), 2),
+            "holidays": holidayAmount,
+            "other_earnings": otherEarnings,
+        }
+
+    return employeeData
+
+
+def getEmployeeHolidays(data, month):
+    """Return the holidays of the month that fall within the employment period."""
+    holidays = data.get("holidays")
+
+    dojStr = data.get("date_of_joining")
+    doj = datetime.strptime(dojStr, "%Y-%m-%d") if isinstance(dojStr, str) else dojStr
+
+    if doj.month == month:
+        filterdHolidays = []
+        for day in holidays:
+            if day.get("holiday_date") >= doj:
+                filterdHolidays.append({"holiday_date": day.get("holiday_date")})
+        holidays = filterdHolidays
+
+    if data.get("relieving_date"):
+
+        filterdHolidays = []
+        for day in holidays:
+            if day.get("holiday_date") <= data.get("relieving_date"):
+                filterdHolidays.append({"holiday_date": day.get("holiday_date")})
+
+        holidays = filterdHolidays
+
+    return holidays
+
+
+# new logic to get shift deta
+def getShiftDetails(attendanceDate, attendanceRecord, shiftTypes):
+    # Fetch shift details directly from attendanceRecord
+    shift = attendanceRecord.get("shift")
+    if not shift:
+        raise ValueError("Shift is missing in attendance record")
+
+    shiftType = shiftTypes.get(shift) or {}
+    shiftStart = shiftType.get("start_time")
+    shiftEnd = shiftType.get("end_time")
+    if shiftStart is None or shiftEnd is None:
+        raise ValueError(f"Shift details missing for shift {shift}")
+    return calculateShiftTimes(attendanceDate, shiftStart, shiftEnd)
+
+
+# provide checkIn and checkOut
+def getAttendance(
+    empId, shiftVariation, attendanceDate, attendanceRecord, shiftDetails
+):
+    def to_datetime(att_date, t_obj):
+        if isinstance(t_obj, datetime):
+            return t_obj
+        return datetime.combine(att_date, t_obj)
+
+    idealCheckInTime = shiftDetails.get("idealCheckInTime")
+    idealCheckOutTime = shiftDetails.get("idealCheckOutTime")
+
+    actInTime = attendanceRecord.get("in_time")
+    actOutTime = attendanceRecord.get("out_time")
+
+    if not actInTime or not actOutTime:
+        raise ValueError("Actual in_time or out_time is missing in attendance record")
+
+    # Normalize attendanceDate
+    if isinstance(attendanceDate, datetime):
+        attendanceDateObj = attendanceDate.date()
+    elif isinstance(attendanceDate, str):
+        attendanceDateObj = datetime.strptime(attendanceDate, "%Y-%m-%d").date()
+    else:
+        attendanceDateObj = attendanceDate
+
+    # Convert to datetime
+    idealIn = to_datetime(attendanceDateObj, idealCheckInTime)
+    idealOut = to_datetime(attendanceDateObj, idealCheckOutTime)
+    actualIn = to_datetime(attendanceDateObj, actInTime)
+    actualOut = to_datetime(attendanceDateObj, actOutTime)
+
+    # Apply shift variation if applicable
+    if shiftVariation:
+        shiftStart, shiftEnd = shiftVariation
+
+        if not shiftStart or not shiftEnd:
+            raise ValueError(
+                f"Shift times missing for attendance date {attendanceDateObj}"
+            )
+
+        shiftStartDt = to_datetime(attendanceDateObj, shiftStart)
+        shiftEndDt = to_datetime(attendanceDateObj, shiftEnd)
+
+        if actualIn > shiftStartDt:
+            diffIn = abs(actualIn - shiftStartDt)
+            hours = diffIn.seconds // 3600
+            minutes = (diffIn.seconds % 3600) // 60
+            seconds = diffIn.seconds % 60
+
+            actInTime = idealCheckInTime
+            if hours:
+                actInTime += timedelta(hours=hours)
+            if minutes:
+                actInTime += timedelta(minutes=minutes)
+            if seconds:
+                actInTime += timedelta(seconds=seconds)
+        else:
+            actInTime = idealCheckInTime
+
+        if actualOut >= shiftEndDt:
+            diffOut = abs(shiftEndDt - idealOut)
+            hours = diffOut.seconds // 3600
+            minutes = (diffOut.seconds % 3600) // 60
+            seconds = diffOut.seconds % 60
+
+            actOutTime = idealCheckOutTime
+
+    return {"in_time": actInTime, "out_time": actOutTime}
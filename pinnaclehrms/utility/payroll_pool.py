@@ -0,0 +1,72 @@
+import frappe
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Site config keys:
+#   payroll_workers             number of worker processes (0 or 1 runs serially)
+#   payroll_parallel_threshold  smallest number of employees worth a pool
+DEFAULT_PARALLEL_THRESHOLD = 200
+
+
+def getPayrollWorkers(employeeCount):
+    """Return the number of worker processes to use for `employeeCount` employees."""
+    workers = frappe.utils.cint(frappe.conf.get("payroll_workers"))
+    threshold = frappe.utils.cint(
+        frappe.conf.get("payroll_parallel_threshold") or DEFAULT_PARALLEL_THRESHOLD
+    )
+    if workers <= 1 or employeeCount < threshold:
+        return 1
+    return min(workers, employeeCount)
+
+
+def partitionEmployees(employeeData, workers):
+    """
+    Split employees into `workers` partitions of similar size.
+
+    Employees are dealt round-robin after sorting by the number of attendance
+    records, largest first, so no partition gets all the heavy employees.
+    """
+    employees = sorted(
+        employeeData,
+        key=lambda emp_id: (
+            -len(employeeData[emp_id].get("attendance_records") or []),
+            emp_id,
+        ),
+    )
+    partitions = [{} for _ in range(workers)]
+    for index, emp_id in enumerate(employees):
+        partitions[index % workers][emp_id] = employeeData[emp_id]
+    return [partition for partition in partitions if partition]
+
+
+def calculateInParallel(calculate, employeeData, year, month, workers):
+    """
+    Run `calculate(employeeData, year, month)` over partitions of employees in
+    worker processes and merge the results in the original employee order.
+
+    `calculate` must be picklable, e.g. a module level function or a partial
+    of one. It should not need the database, as workers are not connected to
+    the site.
+    """
+    partitions = partitionEmployees(employeeData, workers)
+
+    results = {}
+    with ProcessPoolExecutor(
+        max_workers=len(partitions),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        futures = [
+            executor.submit(_calculatePartition, calculate, partition, year, month)
+            for partition in partitions
+        ]
+        for future in futures:
+            results.update(future.result())
+
+    for emp_id in employeeData:
+        employeeData[emp_id] = results[emp_id]
+    return employeeData
+
+
+def _calculatePartition(calculate, partition, year, month):
+    return dict(calculate(partition, year, month))
@@ -0,0 +1,415 @@
+"""
+Payroll Register: one flat row per Pay Slip or Salary Slip.
+
+Monthly reports read the register with a single range scan on
+(reference_doctype, company, start_date) instead of loading every slip with
+its child tables. Salary calculation particulars are pivoted into
+`salary_info` as {particulars: {"days", "amount"}} and other earnings into
+`other_earnings` as {component: amount}; both sets are open-ended, so they
+are JSON columns of the row. Rows are rewritten whenever their slip is
+inserted, updated, cancelled, renamed or deleted.
+"""
+
+import frappe
+import calendar
+import json
+from datetime import date
+from frappe.utils import cint, create_batch, flt, getdate, now
+
+REGISTER = "Payroll Register"
+PAY_SLIPS = "Pay Slips"
+SALARY_SLIP = "Salary Slip"
+
+CHUNK_SIZE = 500
+
+REGISTER_FIELDS = (
+    "reference_doctype",
+    "reference_name",
+    "status",
+    "year",
+    "month",
+    "start_date",
+    "end_date",
+    "company",
+    "employee",
+    "employee_name",
+    "email",
+    "designation",
+    "department",
+    "pan_number",
+    "date_of_joining",
+    "standard_working_days",
+    "actual_working_days",
+    "absent",
+    "basic_salary",
+    "per_day_salary",
+    "total",
+    "other_earnings_total",
+    "net_payable_amount",
+    "salary_info",
+    "other_earnings",
+)
+
+
+def paySlipRegisterRow(paySlip):
+    """Return the register row of a Pay Slips document or dict with children."""
+    year = cint(paySlip.get("year"))
+    month = cint(paySlip.get("month_num"))
+
+    return {
+        "reference_doctype": PAY_SLIPS,
+        "reference_name": paySlip.get("name"),
+        "status": None,
+        "year": year,
+        "month": month,
+        "start_date": date(year, month, 1),
+        "end_date": date(year, month, calendar.monthrange(year, month)[1]),
+        "company": paySlip.get("company"),
+        "employee": paySlip.get("employee"),
+        "employee_name": paySlip.get("employee_name"),
+        "email": paySlip.get("email"),
+        "designation": paySlip.get("designation"),
+        "department": paySlip.get("department"),
+        "pan_number": paySlip.get("pan_number"),
+        "date_of_joining": paySlip.get("date_of_joining"),
+        "standard_working_days": paySlip.get("standard_working_days"),
+        "actual_working_days": paySlip.get("actual_working_days"),
+        "absent": paySlip.get("absent"),
+        "basic_salary": paySlip.get("basic_salary"),
+        "per_day_salary": paySlip.get("per_day_salary"),
+        "total": paySlip.get("total"),
+        "other_earnings_total": paySlip.get("other_earnings_total"),
+        "net_payable_amount": paySlip.get("net_payble_amount"),
+        "salary_info": _salaryInfo(paySlip.get("salary_calculation") or []),
+        "other_earnings": _otherEarnings(
+            (earning.get("component"), earning.get("amount"))
+            for earning in paySlip.get("other_earnings") or []
+        ),
+    }
+
+
+def salarySlipRegisterRow(salarySlip, employee=None):
+    """
+    Return the register row of a Salary Slip document or dict with children.
+
+    `employee` holds the company_email, pan_number and date_of_joining of
+    the slip's employee.
+    """
+    employee = employee or {}
+    startDate = getdate(salarySlip.get("start_date"))
+    earnings = salarySlip.get("earnings") or []
+    basicSalary = sum(
+        flt(earning.get("amount"))
+        for earning in earnings
+        if earning.get("salary_component") == "Basic"
+    )
+    otherEarnings = [
+        (earning.get("salary_component"), earning.get("amount"))
+        for earning in earnings
+        if earning.get("salary_component") != "Basic"
+    ]
+    workingDays = salarySlip.get("total_working_days")
+
+    return {
+        "reference_doctype": SALARY_SLIP,
+        "reference_name": salarySlip.get("name"),
+        "status": salarySlip.get("status"),
+        "year": startDate.year,
+        "month": startDate.month,
+        "start_date": startDate,
+        "end_date": salarySlip.get("end_date"),
+        "company": salarySlip.get("company"),
+        "employee": salarySlip.get("employee"),
+        "employee_name": salarySlip.get("employee_name"),
+        "email": employee.get("company_email"),
+        "designation": salarySlip.get("designation"),
+        "department": salarySlip.get("department"),
+        "pan_number": employee.get("pan_number"),
+        "date_of_joining": employee.get("date_of_joining"),
+        "standard_working_days": workingDays,
+        "actual_working_days": salarySlip.get("payment_days"),
+        "absent": salarySlip.get("absent_days"),
+        "basic_salary": basicSalary,
+        "per_day_salary": basicSalary / workingDays if workingDays else 0,
+        "total": salarySlip.get("gross_pay"),
+        "other_earnings_total": sum(flt(amount) for _, amount in otherEarnings),
+        "net_payable_amount": salarySlip.get("net_pay"),
+        "salary_info": _salaryInfo(salarySlip.get("salary_breakup") or []),
+        "other_earnings": _otherEarnings(otherEarnings),
+    }
+
+
+def writeRegisterRows(rows):
+    """Replace the register rows of the rows' slips with `rows`."""
+    if not rows:
+        return
+
+    timestamp = now()
+    user = frappe.session.user
+    references = {}
+    for row in rows:
+        references.setdefault(row["reference_doctype"], []).append(
+            row["reference_name"]
+        )
+    for doctype, names in references.items():
+        removeRegisterRows(doctype, names)
+
+    fields = ["name", *REGISTER_FIELDS, "owner", "modified_by", "creation", "modified"]
+    values = [
+        (
+            frappe.generate_hash(length=10),
+            *(
+                (
+                    json.dumps(row.get(field), default=str)
+                    if field in ("salary_info", "other_earnings")
+                    else row.get(field)
+                )
+                for field in REGISTER_FIELDS
+            ),
+            user,
+            user,
+            timestamp,
+            timestamp,
+        )
+        for row in rows
+    ]
+    frappe.db.bulk_insert(REGISTER, fields, values, chunk_size=CHUNK_SIZE)
+
+
+def removeRegisterRows(doctype, names):
+    names = [name for name in names if name]
+    if names:
+        frappe.db.delete(
+            REGISTER, {"reference_doctype": doctype, "reference_name": ["in", names]}
+        )
+
+
+def syncPayrollRegister(doc, method=None):
+    """Write the register row of a saved, submitted or cancelled slip."""
+    if doc.doctype == SALARY_SLIP:
+        employee = frappe.db.get_value(
+            "Employee",
+            doc.employee,
+            ["company_email", "pan_number", "date_of_joining"],
+            as_dict=True,
+        )
+        writeRegisterRows([salarySlipRegisterRow(doc, employee)])
+    else:
+        writeRegisterRows([paySlipRegisterRow(doc)])
+
+
+def removeFromPayrollRegister(doc, method=None):
+    removeRegisterRows(doc.doctype, [doc.name])
+
+
+def renameInPayrollRegister(doc, method=None, old=None, new=None, merge=False):
+    if merge:
+        removeRegisterRows(doc.doctype, [old])
+        return
+    frappe.db.set_value(
+        REGISTER,
+        {"reference_doctype": doc.doctype, "reference_name": old},
+        "reference_name",
+        new,
+        update_modified=False,
+    )
+
+
+def getRegisterRows(doctype, year, month, company=None, employee=None):
+    """
+    Return the register rows of `doctype` for the month.
+
+    Slips are included when they lie within the month, as the reports did
+    when filtering Salary Slips on start_date and end_date. `salary_info` and
+    `other_earnings` are returned as dicts.
+    """
+    year = int(year)
+    month = int(month)
+    conditions = [
+        "reference_doctype = %(doctype)s",
+        "start_date >= %(start_date)s",
+        "end_date <= %(end_date)s",
+    ]
+    values = {
+        "doctype": doctype,
+        "start_date": date(year, month, 1),
+        "end_date": date(year, month, calendar.monthrange(year, month)[1]),
+    }
+    if company:
+        conditions.append("company = %(company)s")
+        values["company"] = company
+    if employee:
+        conditions.append("employee = %(employee)s")
+        values["employee"] = employee
+
+    rows = frappe.db.sql(
+        f"""
+            SELECT {", ".join(REGISTER_FIELDS)}
+            FROM `tabPayroll Register`
+            WHERE {" AND ".join(conditions)}
+            ORDER BY employee
+        """,
+        values,
+        as_dict=True,
+    )
+    for row in rows:
+        row.salary_info = frappe.parse_json(row.salary_info) or {}
+        row.other_earnings = frappe.parse_json(row.other_earnings) or {}
+    return rows
+
+
+def rebuildPayrollRegister(doctype=PAY_SLIPS, year=None, month=None):
+    """
+    Rewrite the register rows of every `doctype` slip, optionally of a month.
+
+    Slips are read in chunks with one query per table. Returns the number of
+    rows written.
+    """
+    if not frappe.db.table_exists(doctype):
+        return 0
+
+    filters = {}
+    if year and month:
+        if doctype == PAY_SLIPS:
+            filters = {"year": year, "month_num": int(month)}
+        else:
+            year = int(year)
+            month = int(month)
+            filters = {
+                "start_date": [">=", date(year, month, 1)],
+                "end_date": [
+                    "<=",
+                    date(year, month, calendar.monthrange(year, month)[1]),
+                ],
+            }
+
+    names = frappe.get_all(doctype, filters=filters, pluck="name", order_by="name")
+    load = _loadPaySlips if doctype == PAY_SLIPS else _loadSalarySlips
+
+    written = 0
+    for chunk in create_batch(names, CHUNK_SIZE):
+        rows = load(chunk)
+        writeRegisterRows(rows)
+        written += len(rows)
+    return written
+
+
+def _loadPaySlips(names):
+    paySlips = frappe.get_all(
+        PAY_SLIPS,
+        filters={"name": ["in", names]},
+        fields=[
+            "name",
+            "year",
+            "month_num",
+            "company",
+            "employee",
+            "employee_name",
+            "email",
+            "designation",
+            "department",
+            "pan_number",
+            "date_of_joining",
+            "standard_working_days",
+            "actual_working_days",
+            "absent",
+            "basic_salary",
+            "per_day_salary",
+            "total",
+            "other_earnings_total",
+            "net_payble_amount",
+        ],
+    )
+    attachChildRows(
+        paySlips,
+        PAY_SLIPS,
+        {
+            "salary_calculation": (
+                "Salary Calculation",
+                ["particulars", "days", "amount"],
+            ),
+            "other_earnings": ("Other Earnings", ["component", "amount"]),
+        },
+    )
+    return [paySlipRegisterRow(paySlip) for paySlip in paySlips]
+
+
+def _loadSalarySlips(names):
+    salarySlips = frappe.get_all(
+        SALARY_SLIP,
+        filters={"name": ["in", names]},
+        fields=[
+            "name",
+            "status",
+            "start_date",
+            "end_date",
+            "company",
+            "employee",
+            "employee_name",
+            "designation",
+            "department",
+            "total_working_days",
+            "payment_days",
+            "absent_days",
+            "gross_pay",
+            "net_pay",
+        ],
+    )
+    attachChildRows(
+        salarySlips,
+        SALARY_SLIP,
+        {
+            "earnings": ("Salary Detail", ["salary_component", "amount"]),
+            "salary_breakup": ("Salary Breakdown", ["particulars", "days", "amount"]),
+        },
+    )
+    employees = {
+        employee.name: employee
+        for employee in frappe.get_all(
+            "Employee",
+            filters={"name": ["in", list({slip.employee for slip in salarySlips})]},
+            fields=["name", "company_email", "pan_number", "date_of_joining"],
+        )
+    }
+    return [
+        salarySlipRegisterRow(salarySlip, employees.get(salarySlip.employee))
+        for salarySlip in salarySlips
+    ]
+
+
+def attachChildRows(parents, parenttype, tables):
+    """Set each child table of `tables` on `parents` with one query per table."""
+    if not parents:
+        return
+
+    byName = {parent.name: parent for parent in parents}
+    for parentfield, (doctype, fields) in tables.items():
+        for parent in parents:
+            parent[parentfield] = []
+        for row in frappe.get_all(
+            doctype,
+            filters={
+                "parent": ["in", list(byName)],
+                "parenttype": parenttype,
+                "parentfield": parentfield,
+            },
+            fields=["parent", *fields],
+            order_by="idx asc",
+        ):
+            byName[row.parent][parentfield].append(row)
+
+
+def _salaryInfo(rows):
+    return {
+        row.get("particulars"): {"days": row.get("days"), "amount": row.get("amount")}
+        for row in rows
+        if row.get("particulars")
+    }
+
+
+def _otherEarnings(components):
+    earnings = {}
+    for component, amount in components:
+        if component:
+            earnings[component] = earnings.get(component, 0) + flt(amount)
+    return earnings
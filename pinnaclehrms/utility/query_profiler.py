@@ -0,0 +1,175 @@
+"""
+Opt-in query profiler for payroll and report endpoints.
+
+Wrap an endpoint with `profileQueries` to record every query it sends
+through `frappe.db.sql`: normalized SQL, call site, duration and row count.
+Profiling is off unless the site config sets `query_profiler`, or a System
+Manager sends the request with an `X-Profile-Queries: 1` header. The summary
+is always written to the `query_profiler` log. It is returned as
+`query_profile` in JSON responses only to System Managers, because it exposes
+SQL and source locations. A normalized statement run more than
+`query_profiler_n_plus_one_threshold` times (default 10) is flagged as a
+likely N+1 pattern.
+"""
+
+import frappe
+import functools
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+from time import perf_counter
+
+HEADER = "X-Profile-Queries"
+PROFILER_ROLE = "System Manager"
+DEFAULT_N_PLUS_ONE_THRESHOLD = 10
+TOP_STATEMENTS = 20
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+_THIS_FILE = os.path.abspath(__file__)
+_APP_PATH = os.path.dirname(os.path.dirname(_THIS_FILE))
+
+
+def normalizeQuery(query):
+    """Return `query` with literals, placeholders and IN lists replaced by ?."""
+    query = _STRING.sub("?", str(query))
+    query = _PLACEHOLDER.sub("?", query)
+    query = _NUMBER.sub("?", query)
+    query = _LIST.sub("(...)", query)
+    return _SPACE.sub(" ", query).strip()
+
+
+def isProfilingEnabled():
+    if frappe.conf.get("query_profiler"):
+        return True
+    request = getattr(frappe.local, "request", None)
+    return bool(
+        request and request.headers.get(HEADER) in ("1", "true") and canViewProfile()
+    )
+
+
+def canViewProfile():
+    """Return True when the session user may see query profiles."""
+    return PROFILER_ROLE in frappe.get_roles()
+
+
+class QueryProfiler:
+    """Record the queries sent through `frappe.db.sql` while active."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __enter__(self):
+        sql = frappe.db.sql
+
+        def profiledSql(query, *args, **kwargs):
+            start = perf_counter()
+            result = sql(query, *args, **kwargs)
+            self.queries.append(
+                {
+                    "query": normalizeQuery(query),
+                    "call_site": _callSite(),
+                    "seconds": perf_counter() - start,
+                    "rows": len(result) if isinstance(result, (list, tuple)) else 0,
+                }
+            )
+            return result
+
+        frappe.db.sql = profiledSql
+        return self
+
+    def __exit__(self, *exc):
+        del frappe.db.sql
+
+    def summary(self, threshold=DEFAULT_N_PLUS_ONE_THRESHOLD):
+        """Return totals and the statements that took the most time."""
+        statements = defaultdict(
+            lambda: {"count": 0, "seconds": 0.0, "rows": 0, "call_sites": set()}
+        )
+        for query in self.queries:
+            statement = statements[query["query"]]
+            statement["count"] += 1
+            statement["seconds"] += query["seconds"]
+            statement["rows"] += query["rows"]
+            statement["call_sites"].add(query["call_site"])
+
+        ranked = sorted(
+            statements.items(), key=lambda item: item[1]["seconds"], reverse=True
+        )
+        return {
+            "queries": len(self.queries),
+            "seconds": round(sum(query["seconds"] for query in self.queries), 4),
+            "statements": [
+                {
+                    "query": query,
+                    "count": statement["count"],
+                    "seconds": round(statement["seconds"], 4),
+                    "rows": statement["rows"],
+                    "call_sites": sorted(statement["call_sites"]),
+                }
+                for query, statement in ranked[:TOP_STATEMENTS]
+            ],
+            "n_plus_one": [
+                {
+                    "query": query,
+                    "count": statement["count"],
+                    "call_sites": sorted(statement["call_sites"]),
+                }
+                for query, statement in ranked
+                if statement["count"] > threshold
+            ],
+        }
+
+
+def profileQueries(function):
+    """Profile the queries of `function` when profiling is enabled."""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if getattr(frappe.local, "query_profiler", None) or not isProfilingEnabled():
+            return function(*args, **kwargs)
+
+        profiler = frappe.local.query_profiler = QueryProfiler()
+        start = perf_counter()
+        try:
+            with profiler:
+                return function(*args, **kwargs)
+        finally:
+            frappe.local.query_profiler = None
+            _report(function, profiler, perf_counter() - start)
+
+    return wrapper
+
+
+def _report(function, profiler, seconds):
+    threshold = (
+        frappe.utils.cint(frappe.conf.get("query_profiler_n_plus_one_threshold"))
+        or DEFAULT_N_PLUS_ONE_THRESHOLD
+    )
+    summary = profiler.summary(threshold)
+    summary["endpoint"] = f"{function.__module__}.{function.__qualname__}"
+    summary["wall_seconds"] = round(seconds, 4)
+
+    frappe.logger("query_profiler").info(json.dumps(summary))
+    if frappe.response.get("type") not in ("binary", "download") and canViewProfile():
+        frappe.response["query_profile"] = summary
+
+
+def _callSite():
+    """Return file:line function of the innermost app frame outside this module."""
+    frame = sys._getframe(2)
+    while frame:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_PATH) and filename != _THIS_FILE:
+            return (
+                f"{os.path.relpath(filename, _APP_PATH)}:{frame.f_lineno} "
+                f"{frame.f_code.co_name}"
+            )
+        frame = frame.f_back
+    return "unknown"
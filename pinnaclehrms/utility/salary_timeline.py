@@ -0,0 +1,149 @@
+import frappe
+import calendar
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date
+from dateutil.relativedelta import relativedelta
+from frappe.utils.caching import request_cache
+
+
+class SalaryTimeline:
+    """
+    Salary History of employees indexed by effective date.
+
+    Rows of every employee are kept sorted by `from_date`, so the salary in
+    effect on a day or during a month is found with a binary search instead of
+    a `ORDER BY from_date DESC LIMIT 1` query.
+    """
+
+    def __init__(self, rows):
+        self.fromDates = defaultdict(list)
+        self.entries = defaultdict(list)
+
+        for row in sorted(rows, key=lambda row: (row.employee, row.from_date)):
+            self.fromDates[row.employee].append(row.from_date)
+            self.entries[row.employee].append(row)
+
+    @classmethod
+    def load(cls, employees=None):
+        query = """
+            SELECT
+                tas.employee_id AS employee,
+                tsh.from_date,
+                tsh.salary,
+                tas.eligible_for_overtime_salary
+            FROM
+                `tabSalary History` AS tsh
+            JOIN
+                `tabAssign Salary` AS tas
+            ON
+                tsh.parent = tas.name
+            WHERE
+                tsh.from_date IS NOT NULL
+        """
+        values = []
+        if employees is not None:
+            if not employees:
+                return cls([])
+            query += " AND tas.employee_id IN %s"
+            values.append(tuple(employees))
+
+        return cls(frappe.db.sql(query, values, as_dict=True))
+
+    def salaryOn(self, employee, day):
+        """Return the Salary History row in effect on `day`, or None."""
+        index = bisect_right(self.fromDates.get(employee, []), day)
+        if not index:
+            return None
+        return self.entries[employee][index - 1]
+
+    def getSalaryStructure(self, employee, fromDate, toDate):
+        """
+        Return {effective date: salary} for the period, starting with the
+        salary in effect on `fromDate` followed by every change up to `toDate`.
+        """
+        fromDates = self.fromDates.get(employee, [])
+        entries = self.entries.get(employee, [])
+
+        current = self.salaryOn(employee, fromDate)
+        salaryStructure = {fromDate: (current.salary if current else 0) or 0}
+
+        start = bisect_right(fromDates, fromDate)
+        end = bisect_right(fromDates, toDate)
+        for row in entries[start:end]:
+            salaryStructure[row.from_date] = row.salary
+
+        return salaryStructure
+
+    def getSalaryDetails(self, employee, year, month):
+        """
+        Return the basic salary and overtime eligibility for the month.
+
+        Increments effective on any day after the 1st are pro-rated by the
+        number of days each salary was in effect. Days before the first
+        increment are paid at the previous salary, or at the first increment
+        when the employee has no earlier salary.
+        """
+        salaryDetails = {"basicSalary": 0.0, "overtimeEligibility": 1}
+
+        fromDates = self.fromDates.get(employee, [])
+        entries = self.entries.get(employee, [])
+
+        monthStart = date(year, month, 1)
+        nextMonthStart = monthStart + relativedelta(months=1)
+        start = bisect_left(fromDates, monthStart)
+        end = bisect_left(fromDates, nextMonthStart)
+
+        increments = entries[start:end]
+        previousSalary = entries[start - 1] if start else None
+
+        if not increments:
+            if previousSalary:
+                salaryDetails["basicSalary"] = previousSalary.salary
+                salaryDetails["overtimeEligibility"] = (
+                    previousSalary.eligible_for_overtime_salary
+                )
+            else:
+                salaryDetails["basicSalary"] = 0.0
+                salaryDetails["overtimeEligibility"] = 0
+            return salaryDetails
+
+        totalWorkingDays = calendar.monthrange(year, month)[1]
+
+        # (first day, salary) for each salary in effect during the month
+        segments = []
+        if previousSalary and increments[0].from_date.day != 1:
+            segments.append((1, previousSalary.salary))
+        for row in increments:
+            if segments and segments[-1][0] == row.from_date.day:
+                segments[-1] = (row.from_date.day, row.salary)
+            elif segments:
+                segments.append((row.from_date.day, row.salary))
+            else:
+                segments.append((1, row.salary))
+
+        if len(segments) == 1:
+            basicSalary = segments[0][1]
+        else:
+            basicSalary = 0
+            for index, (firstDay, salary) in enumerate(segments):
+                lastDay = (
+                    segments[index + 1][0] - 1
+                    if index + 1 < len(segments)
+                    else totalWorkingDays
+                )
+                basicSalary += ((lastDay - firstDay) + 1) * (salary / totalWorkingDays)
+
+        salaryDetails["basicSalary"] = basicSalary
+        salaryDetails["overtimeEligibility"] = increments[-1].eligible_for_overtime_salary
+        return salaryDetails
+
+
+@request_cache
+def getSalaryTimeline(employees):
+    """
+    Return the salary timeline of `employees`, built once per request.
+
+    `employees` is a tuple, so that the same set of employees hits the cache.
+    """
+    return SalaryTimeline.load(employees)
@@ -0,0 +1,25 @@
+class ShiftVariationIndex:
+    """
+    Shift Variations of a month indexed for per-day lookups.
+
+    Variations listing employees are keyed by (date, employee). Variations
+    without employees apply to the whole company and are keyed by
+    (company, date); an employee-specific variation wins over those.
+    """
+
+    def __init__(self, rows):
+        self.byEmployee = {}
+        self.byCompany = {}
+
+        for row in rows:
+            timings = (row["shift_start"], row["shift_end"])
+            if row.get("employee"):
+                self.byEmployee[(row["shift_date"], row["employee"])] = timings
+            else:
+                self.byCompany[(row["company"], row["shift_date"])] = timings
+
+    def get(self, company, attendanceDate, employee):
+        """Return (shift_start, shift_end) of the variation for the day, or None."""
+        return self.byEmployee.get(
+            (attendanceDate, employee)
+        ) or self.byCompany.get((company, attendanceDate))
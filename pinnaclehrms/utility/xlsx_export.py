@@ -0,0 +1,115 @@
+"""
+Streaming XLSX engine for payroll exports.
+
+Workbooks are created in openpyxl's write_only mode: rows are written to
+disk as they are appended instead of being kept as cell objects, and the
+finished file goes through a temporary file. Cell formats are registered
+once per workbook as named styles and shared by every cell. Query results
+can be streamed straight from a server-side cursor with `iterQuery`, so an
+export holds one row at a time.
+
+Columns are dicts with a `header`, an optional `width` and an optional
+`style`, one of STYLES.
+"""
+
+import frappe
+import os
+import tempfile
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle
+from openpyxl.utils import get_column_letter
+
+HEADER = "payroll_header"
+TEXT = "payroll_text"
+LEFT = "payroll_left"
+AMOUNT = "payroll_amount"
+AMOUNT_2DP = "payroll_amount_2dp"
+
+STYLES = {
+    HEADER: {
+        "font": Font(bold=True),
+        "alignment": Alignment(horizontal="center", vertical="center"),
+    },
+    TEXT: {"number_format": "@", "alignment": Alignment(horizontal="left")},
+    LEFT: {"alignment": Alignment(horizontal="left")},
+    AMOUNT: {"alignment": Alignment(horizontal="right")},
+    AMOUNT_2DP: {"number_format": "0.00", "alignment": Alignment(horizontal="right")},
+}
+
+# Longest sheet title Excel accepts
+MAX_TITLE = 31
+
+
+def newWorkbook():
+    """Return a write-only workbook with the export styles registered."""
+    workbook = Workbook(write_only=True)
+    for name, style in STYLES.items():
+        workbook.add_named_style(NamedStyle(name=name, **style))
+    return workbook
+
+
+def writeSheet(workbook, title, columns, rows, headerRows=None, merges=()):
+    """
+    Add a sheet of `rows` under header rows and return it.
+
+    `headerRows` defaults to one row of the column headers. `merges` are
+    ranges such as "A1:A2" merged in the header.
+    """
+    sheet = workbook.create_sheet(title[:MAX_TITLE])
+
+    for index, column in enumerate(columns, start=1):
+        if column.get("width"):
+            sheet.column_dimensions[get_column_letter(index)].width = column["width"]
+    for merge in merges:
+        sheet.merged_cells.add(merge)
+
+    if headerRows is None:
+        headerRows = [[column["header"] for column in columns]]
+    for headerRow in headerRows:
+        sheet.append([_cell(sheet, value, HEADER) for value in headerRow])
+
+    styles = [column.get("style") for column in columns]
+    for row in rows:
+        sheet.append(
+            [
+                (
+                    _cell(sheet, value, styles[index])
+                    if index < len(styles) and styles[index]
+                    else value
+                )
+                for index, value in enumerate(row)
+            ]
+        )
+    return sheet
+
+
+def sendXlsx(workbook, filename):
+    """Save `workbook` through a temporary file as the binary response."""
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook.save(path)
+        with open(path, "rb") as xlsx:
+            frappe.response.filecontent = xlsx.read()
+    finally:
+        os.remove(path)
+
+    frappe.response.filename = filename
+    frappe.response.type = "binary"
+
+
+def iterQuery(query, values=None):
+    """
+    Yield the rows of `query` as dicts from a server-side cursor.
+
+    No other query may run on the connection until the rows are consumed.
+    """
+    with frappe.db.unbuffered_cursor():
+        yield from frappe.db.sql(query, values, as_dict=True, as_iterator=True)
+
+
+def _cell(sheet, value, style):
+    cell = WriteOnlyCell(sheet, value=value)
+    cell.style = style
+    return cell